@@ -0,0 +1,210 @@
+# external modules import
+import random
+import itertools
+from typing import List, Tuple
+from Levenshtein import distance
+
+# internal modules import
+from modules import (
+    Planet, LicenseName, LicenseCode, LogicalOperator, TechniqueCategory, TechniqueSubcategory, Order, AugmentedDish,
+    Restaurant, Chef, License, LicensesList, Ingredient, IngredientsList, Technique, TechniquesList, Dish, Question,
+    QuestionLogics
+)
+
+
+# class definition
+class SyntheticKBGenerator:
+    """
+    This class generates synthetic Knowledge Bases of any size, together with question workloads phrased like the test
+    questions, whose parsed Question and QuestionLogics objects are known in advance so that the LLM can be stubbed out.
+    Vocabularies grow sub-linearly with the number of dishes and ingredients follow a Zipf-like popularity, as in the
+    real menus.
+    """
+
+    # names building blocks
+    INGREDIENTS_NOUNS = [
+        'Farina', 'Essenza', 'Polvere', 'Foglie', 'Radici', 'Uova', 'Latte', 'Sale', 'Spezie', 'Carne', 'Alghe',
+        'Funghi', 'Cristalli', 'Nettare', 'Semi', 'Gocce', 'Petali', 'Scaglie', 'Lacrime', 'Frutti'
+    ]
+    INGREDIENTS_ORIGINS = [
+        'Nettuno', 'Fenice', 'Drago', 'Nebulosa', 'Cassandra', 'Tachioni', 'Idra', 'Cerbero', 'Pegaso', 'Orione',
+        'Unicorno', 'Mandragora', 'Kraken', 'Sirio', 'Vega', 'Basilisco', 'Chimera', 'Titano', 'Crononite', 'Stellarion'
+    ]
+    ADJECTIVES = [
+        'Lunare', 'Stellare', 'Quantica', 'Astrale', 'Cosmica', 'Eterea', 'Oscura', 'Vibrante', 'Sincronica',
+        'Olografica', 'Gravitazionale', 'Risonante', 'Entropica', 'Psionica', 'Temporale'
+    ]
+    TECHNIQUES_NOUNS = [
+        ('Marinatura', TechniqueCategory.PREPARATION, TechniqueSubcategory.MARINATURA),
+        ('Affumicatura', TechniqueCategory.PREPARATION, TechniqueSubcategory.AFFUMICATURA),
+        ('Fermentazione', TechniqueCategory.PREPARATION, TechniqueSubcategory.FERMENTAZIONE),
+        ('Impasto', TechniqueCategory.PREPARATION, TechniqueSubcategory.TECNICHE_DI_IMPASTO),
+        ('Surgelamento', TechniqueCategory.PREPARATION, TechniqueSubcategory.SURGELAMENTO),
+        ('Taglio', TechniqueCategory.PREPARATION, TechniqueSubcategory.TECNICHE_DI_TAGLIO),
+        ('Bollitura', TechniqueCategory.COOKING, TechniqueSubcategory.BOLLITURA),
+        ('Grigliatura', TechniqueCategory.COOKING, TechniqueSubcategory.GRIGLIARE),
+        ('Cottura al Forno', TechniqueCategory.COOKING, TechniqueSubcategory.FORNO),
+        ('Cottura a Vapore', TechniqueCategory.COOKING, TechniqueSubcategory.VAPORE),
+        ('Cottura Sottovuoto', TechniqueCategory.COOKING, TechniqueSubcategory.SOTTOVUOTO),
+        ('Saltatura in Padella', TechniqueCategory.COOKING, TechniqueSubcategory.SALTARE_IN_PADELLA),
+        ('Decostruzione', TechniqueCategory.ADVANCED, TechniqueSubcategory.DECOSTRUZIONE),
+        ('Sferificazione', TechniqueCategory.ADVANCED, TechniqueSubcategory.SFERIFICAZIONE)
+    ]
+    TECHNIQUES_QUALIFIERS = [
+        'Armonizzata', 'Sincronizzata', 'Inversa', 'Vorticosa', 'Biometrica', 'Molecolare', 'Multirealità', 'Isoarmonica',
+        'Rigenerativa', 'Filamentare', 'Simbiotica', 'Collassante', 'Bilanciata', 'Interdimensionale', 'Ecodinamica'
+    ]
+    RESTAURANTS_WORDS = ['Taverna', 'Locanda', 'Osteria', 'Trattoria', 'Bistrot', 'Cantina', 'Rifugio', 'Approdo']
+    ORDERS_NAMES = {Order.ANDROMEDA: 'Andromeda', Order.ARMONISTI: 'Armonisti', Order.NATURALISTI: 'Naturalisti'}
+
+    # constructor
+    def __init__(self, seed: int = 0):
+
+        # initialize random generator
+        self.random = random.Random(seed)
+
+    # non-public methods
+    def _build_ingredients(self, ingredients_number: int) -> List[Ingredient]:
+        names = [f'{n} di {o}' for n, o in itertools.product(self.INGREDIENTS_NOUNS, self.INGREDIENTS_ORIGINS)]
+        names += [f'{n} {a} di {o}' for n, a, o in itertools.product(self.INGREDIENTS_NOUNS, self.ADJECTIVES, self.INGREDIENTS_ORIGINS)]
+        self.random.shuffle(names)
+
+        return [Ingredient.model_construct(name=n) for n in names[:ingredients_number]]
+
+    def _build_techniques(self, techniques_number: int) -> List[Technique]:
+        techniques = [
+            (f'{n} {a} {q}', c, s)
+            for (n, c, s), a, q in itertools.product(self.TECHNIQUES_NOUNS, self.ADJECTIVES, self.TECHNIQUES_QUALIFIERS)
+        ]
+        self.random.shuffle(techniques)
+
+        return [Technique.model_construct(name=n, category=c, subcategory=s) for n, c, s in techniques[:techniques_number]]
+
+    def _build_restaurants(self, restaurants_number: int) -> List[Tuple[Restaurant, Chef]]:
+
+        # pick names far enough from each other not to be confused by the restaurants fuzzy matching, as the real ones
+        names = [f'{w} {a} di {o}' for w, a, o in itertools.product(self.RESTAURANTS_WORDS, self.ADJECTIVES, self.INGREDIENTS_ORIGINS)]
+        self.random.shuffle(names)
+        selected_names = []
+        for name in names:
+            if all(distance(name, n) > 6 for n in selected_names):
+                selected_names.append(name)
+                if len(selected_names) == restaurants_number:
+                    break
+
+        # assign planets and chefs
+        planets = [p for p in Planet if p != Planet.UNDISCLOSED]
+        restaurants = []
+        for restaurant_id, name in enumerate(selected_names):
+            licenses = [
+                License.model_construct(name=ln, code=LicenseCode[ln.name], level=self.random.randint(0, 6))
+                for ln in self.random.sample(list(LicenseName), self.random.randint(1, 3))
+            ]
+            restaurants.append(
+                (
+                    Restaurant.model_construct(
+                        name=name,
+                        planet=self.random.choice(planets)
+                    ),
+                    Chef.model_construct(name=f'Chef {restaurant_id}', licenses=LicensesList.model_construct(items=licenses))
+                )
+            )
+
+        return restaurants
+
+    def _sample_distinct(self, population: List, cumulative_weights: List[float], k: int) -> List:
+        samples = {}
+        while len(samples) < k:
+            for s in self.random.choices(population, cum_weights=cumulative_weights, k=k):
+                samples.setdefault(id(s), s)
+
+        return list(samples.values())[:k]
+
+    # public methods
+    def generate_knowledge_base(self, dishes_number: int) -> List[AugmentedDish]:
+
+        # build vocabularies, growing sub-linearly with the number of dishes
+        ingredients = self._build_ingredients(ingredients_number=min(5000, max(100, dishes_number // 20)))
+        techniques = self._build_techniques(techniques_number=min(2000, max(50, dishes_number // 50)))
+        restaurants = self._build_restaurants(restaurants_number=min(300, max(10, dishes_number // 100)))
+        ingredients_weights = list(itertools.accumulate(1 / (rank + 1) for rank in range(len(ingredients))))
+        techniques_weights = list(itertools.accumulate(1 / (rank + 1) for rank in range(len(techniques))))
+
+        # build dishes with distinct ingredients and techniques, sharing entities objects as the Knowledge Base loaders do
+        knowledge_base = []
+        for code in range(dishes_number):
+            restaurant, chef = self.random.choice(restaurants)
+            knowledge_base.append(
+                AugmentedDish.model_construct(
+                    restaurant=restaurant,
+                    chef=chef,
+                    dish=Dish.model_construct(
+                        code=code,
+                        name=f'Piatto {code}',
+                        ingredients=IngredientsList.model_construct(
+                            items=self._sample_distinct(ingredients, ingredients_weights, self.random.randint(3, 8))
+                        ),
+                        techniques=TechniquesList.model_construct(
+                            items=self._sample_distinct(techniques, techniques_weights, self.random.randint(1, 4))
+                        ),
+                        andromeda_flag=self.random.random() < 0.2,
+                        armonisti_flag=self.random.random() < 0.2,
+                        naturalisti_flag=self.random.random() < 0.2
+                    )
+                )
+            )
+
+        return knowledge_base
+
+    def generate_questions(self, knowledge_base: List[AugmentedDish], questions_number: int) -> List[Tuple[str, Question, QuestionLogics]]:
+        questions = []
+        for _ in range(questions_number):
+
+            # pick a dish, so that most questions have at least one answer
+            ad = self.random.choice(knowledge_base)
+            i1, i2 = self.random.sample(ad.dish.ingredients.items, 2)
+            other = self.random.choice(self.random.choice(knowledge_base).dish.ingredients.items)
+            t1 = self.random.choice(ad.dish.techniques.items)
+            license_ = self.random.choice(ad.chef.licenses.items)
+            order = self.random.choice(list(Order))
+
+            # phrase the question according to one of the templates
+            template_id = self.random.randrange(9)
+            logics = QuestionLogics()
+            if template_id == 0:
+                text, fields = f'Quali sono i piatti che includono {i1.name}?', {'desired_ingredients': [i1]}
+            elif template_id == 1:
+                text, fields = f'Quali piatti includono {i1.name} e {i2.name}?', {'desired_ingredients': [i1, i2]}
+                logics = QuestionLogics(desired_ingredients_lo=LogicalOperator.AND)
+            elif template_id == 2:
+                text, fields = f'Quali piatti contengono {i1.name} o {other.name}?', {'desired_ingredients': [i1, other]}
+                logics = QuestionLogics(desired_ingredients_lo=LogicalOperator.OR)
+            elif template_id == 3:
+                text, fields = f'Quali piatti sono preparati con la tecnica {t1.name}?', {'desired_techniques': [t1]}
+            elif template_id == 4:
+                text = f'Quali piatti includono {i1.name}, ma non contengono {other.name}?'
+                fields = {'desired_ingredients': [i1], 'disallowed_ingredients': [other]}
+            elif template_id == 5:
+                text = f'Quali piatti usano la tecnica {t1.name} senza impiegare {other.name}?'
+                fields = {'desired_techniques': [t1], 'disallowed_ingredients': [other]}
+            elif template_id == 6:
+                text, fields = f'Quali piatti su {ad.restaurant.planet.value} includono {i1.name}?', {'desired_ingredients': [i1], 'planets': [ad.restaurant.planet]}
+            elif template_id == 7:
+                text = f'Quali piatti del ristorante {ad.restaurant.name} sono preparati con {t1.name}?'
+                fields = {'desired_techniques': [t1], 'restaurants': [ad.restaurant]}
+            else:
+                text = (
+                    f'Quali piatti adatti all\'Ordine {self.ORDERS_NAMES[order]} includono {i1.name} e sono cucinati da uno chef con '
+                    f'licenza {license_.name.value} di grado {license_.level} o superiore?'
+                )
+                fields = {
+                    'desired_ingredients': [i1],
+                    'chef_licenses': [license_],
+                    f'{order.name.lower()}_flag': True
+                }
+            question_object = Question(
+                **{'planets': [], 'restaurants': [], 'chef_licenses': [], 'andromeda_flag': False, 'armonisti_flag': False, 'naturalisti_flag': False, **fields}
+            )
+            questions.append((text, question_object, logics))
+
+        return questions
@@ -0,0 +1,99 @@
+# external modules import
+import re
+import sys
+import json
+import argparse
+import subprocess
+from pathlib import Path
+from loguru import logger
+from typing import List, Dict
+
+
+# constants definition
+ENTRY_POINTS = ['query_knowledge_base', 'serve_knowledge_base', 'build_knowledge_base', 'benchmarks.benchmark_query_manager']
+HEAVY_MODULES = ['docling_core', 'pdfplumber', 'langchain', 'langchain_core']
+LIGHT_ENTRY_POINTS = ['query_knowledge_base', 'serve_knowledge_base', 'benchmarks.benchmark_query_manager']
+IMPORT_TIME_PATTERN = re.compile(r'^import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s+)(\S+)$')
+
+
+# functions definition
+def measure_entry_point(entry_point: str, repeats: int) -> Dict:
+    # every measure runs in a fresh interpreter, keeping the fastest one so that the disk cache is warm
+    measures = []
+    for _ in range(repeats):
+        process = subprocess.run(
+            [sys.executable, '-X', 'importtime', '-c', f'import {entry_point}'],
+            cwd=Path(__file__).parent.parent, capture_output=True, text=True
+        )
+        if process.returncode != 0:
+            return {'entry_point': entry_point, 'error': process.stderr.strip().splitlines()[-1]}
+        modules, children = {}, {}
+        for line in process.stderr.splitlines():
+            if (match := IMPORT_TIME_PATTERN.match(line)) is None:
+                continue
+            name, cumulative_us, depth = match.group(4), int(match.group(2)), len(match.group(3))
+            modules[name] = cumulative_us
+
+            # children are listed before their parent, so the direct imports of every top-level one are collected until
+            # it shows up, grouping them by package except for the internal modules
+            if depth == 1 and name != entry_point:
+                children = {}
+            elif depth == 3:
+                package = name if name.startswith('modules.') else name.split('.')[0]
+                children[package] = children.get(package, 0) + cumulative_us
+            elif depth == 1:
+                break
+        measures.append((modules, children))
+    modules, children = min(measures, key=lambda m: m[0][entry_point])
+
+    return {
+        'entry_point': entry_point,
+        'import_ms': round(modules[entry_point] / 1000, 1),
+        'modules_number': len(modules),
+        'heavy_modules': sorted({m.split('.')[0] for m in modules if m.split('.')[0] in HEAVY_MODULES}),
+        'top_packages_ms': {n: round(t / 1000, 1) for n, t in sorted(children.items(), key=lambda c: -c[1])[:5]}
+    }
+
+
+def find_regressions(results: List[Dict], baseline_results: List[Dict], tolerance: float) -> List[str]:
+    regressions = []
+    baseline_results = {r['entry_point']: r for r in baseline_results if 'error' not in r}
+    for r in results:
+        if 'error' in r:
+            regressions.append(f"{r['entry_point']}: {r['error']}")
+            continue
+        if r['entry_point'] in LIGHT_ENTRY_POINTS and len(r['heavy_modules']) > 0:
+            regressions.append(f"{r['entry_point']}: imports {', '.join(r['heavy_modules'])}")
+        if r['entry_point'] in baseline_results and r['import_ms'] > baseline_results[r['entry_point']]['import_ms'] * (1 + tolerance):
+            regressions.append(f"{r['entry_point']}: import_ms {baseline_results[r['entry_point']]['import_ms']} -> {r['import_ms']}")
+
+    return regressions
+
+
+# main-like execution
+if __name__ == '__main__':
+
+    # parse command line arguments
+    parser = argparse.ArgumentParser(description='Benchmark the import time of the scripts entry points.')
+    parser.add_argument('--entry-points', type=str, nargs='+', default=ENTRY_POINTS)
+    parser.add_argument('--repeats', type=int, default=5)
+    parser.add_argument('--output', type=Path, default=None)
+    parser.add_argument('--baseline', type=Path, default=None)
+    parser.add_argument('--tolerance', type=float, default=0.2)
+    args = parser.parse_args()
+
+    # measure entry points, checking that the light ones do not import heavy dependencies and comparing them against
+    # the baseline ones if provided
+    results_ = [measure_entry_point(entry_point=ep, repeats=args.repeats) for ep in args.entry_points]
+    print(f"{'entry_point':>36} {'import_ms':>10} {'modules':>8}  top packages (ms)")
+    for r in results_:
+        if 'error' in r:
+            print(f"{r['entry_point']:>36} {r['error']}")
+            continue
+        print(f"{r['entry_point']:>36} {r['import_ms']:>10} {r['modules_number']:>8}  {', '.join(f'{n}={t}' for n, t in r['top_packages_ms'].items())}")
+    if args.output is not None:
+        args.output.write_text(json.dumps(results_, indent=4))
+    regressions_ = find_regressions(results=results_, baseline_results=json.loads(args.baseline.read_text()) if args.baseline is not None else [], tolerance=args.tolerance)
+    for regression in regressions_:
+        logger.error(f'Regression: {regression}')
+    sys.exit(1 if regressions_ else 0)
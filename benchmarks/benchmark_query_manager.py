@@ -0,0 +1,196 @@
+# external modules import
+import gc
+import sys
+import json
+import time
+import argparse
+import resource
+import tracemalloc
+import statistics
+import subprocess
+from pathlib import Path
+from loguru import logger
+from typing import List, Dict
+
+# internal modules import
+from modules import QueryAgent, QMConfig, QueryManager, KBSnapshot, BaseQuestion, LicensesList, QuestionLogics
+from benchmarks.SyntheticKBGenerator import SyntheticKBGenerator
+
+
+# class definition
+class StubQueryAgent:
+    """
+    This class replaces the LLM-based query agent, answering with the parsed objects known in advance for every question
+    of the workload, while the rule-based capabilities are the actual ones.
+    """
+
+    # rule-based capabilities
+    find_planets = staticmethod(QueryAgent.find_planets)
+    find_restaurants = staticmethod(QueryAgent.find_restaurants)
+    find_orders = staticmethod(QueryAgent.find_orders)
+
+    # constructor
+    def __init__(self, workload: Dict[str, Dict]):
+
+        # initialize parsed questions lookup table
+        self.workload = workload
+
+    # public methods
+    def build_base_question_object(self, question: str, **kwargs) -> BaseQuestion:
+        return BaseQuestion(**self.workload[question]['question_object'])
+
+    def find_licenses(self, question: str, **kwargs) -> LicensesList:
+        return LicensesList(items=self.workload[question]['question_object']['chef_licenses'])
+
+    def understand_operators(self, question: str, **kwargs) -> QuestionLogics:
+        return QuestionLogics(**self.workload[question]['question_logics'])
+
+
+# functions definition
+def generate_workload(dishes_number: int, questions_number: int, work_path: Path, seed: int) -> None:
+    generator = SyntheticKBGenerator(seed=seed)
+    knowledge_base = generator.generate_knowledge_base(dishes_number=dishes_number)
+    questions = generator.generate_questions(knowledge_base=knowledge_base, questions_number=questions_number)
+    KBSnapshot.write(work_path / f'kb_{dishes_number}_{seed}.kbs', knowledge_base)
+    with open(work_path / f'questions_{dishes_number}_{questions_number}_{seed}.jsonl', 'w', encoding='utf-8') as f:
+        for question, question_object, question_logics in questions:
+            f.write(json.dumps({'question': question, 'question_object': question_object.model_dump(mode='json'), 'question_logics': question_logics.model_dump(mode='json')}) + '\n')
+
+    return
+
+
+def measure_workload(dishes_number: int, questions_number: int, work_path: Path, seed: int) -> Dict:
+    with open(work_path / f'questions_{dishes_number}_{questions_number}_{seed}.jsonl', 'r', encoding='utf-8') as f:
+        workload = {r['question']: r for r in map(json.loads, f)}
+    gc.collect()
+    baseline_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+    # measure loading time and memory, with the knowledge base read from its snapshot and no answers cache, so that
+    # every question goes through the filters
+    start_time = time.perf_counter()
+    query_manager = QueryManager(
+        config=QMConfig(
+            kb_path=work_path,
+            planet_distances_path=Path(__file__).parent.parent / 'data' / 'planets_distances.csv',
+            snapshot_path=work_path / f'kb_{dishes_number}_{seed}.kbs',
+            answers_cache_size=None
+        ),
+        query_agent=StubQueryAgent(workload=workload)
+    )
+    load_time = time.perf_counter() - start_time
+    load_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+    # measure answering latency, which includes everything but the llm calls
+    latencies, answers_sizes = [], []
+    for question in workload:
+        start_time = time.perf_counter()
+        answer = query_manager.answer_question(question=question)
+        latencies.append(time.perf_counter() - start_time)
+        answers_sizes.append(len(answer.dishes_codes))
+    latencies.sort()
+    peak_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+    # measure the memory held by the knowledge base alone, in the compact representation used at query time
+    tracemalloc.start()
+    with KBSnapshot(work_path / f'kb_{dishes_number}_{seed}.kbs') as snapshot:
+        knowledge_base = snapshot.load_store()
+    kb_bytes = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del knowledge_base
+
+    return {
+        'dishes': dishes_number,
+        'load_s': round(load_time, 3),
+        'peak_rss_mb': round(peak_rss / 1024, 1),
+        'kb_rss_bytes_per_dish': round((load_rss - baseline_rss) * 1024 / dishes_number),
+        'kb_bytes_per_dish': round(kb_bytes / dishes_number),
+        'p50_ms': round(1000 * latencies[len(latencies) // 2], 3),
+        'p99_ms': round(1000 * latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))], 3),
+        'mean_answer_size': round(statistics.mean(answers_sizes), 1),
+        'fast_path_hit_rate': round(query_manager.fast_path_stats()['hit_rate'], 3)
+    }
+
+
+def run_benchmarks(sizes: List[int], questions_number: int, work_path: Path, seed: int) -> List[Dict]:
+    # every size is generated and measured in its own process, so that peak memory only accounts for the query manager
+    results = []
+    work_path.mkdir(parents=True, exist_ok=True)
+    for dishes_number in sizes:
+        if not (work_path / f'kb_{dishes_number}_{seed}.kbs').exists() or not (work_path / f'questions_{dishes_number}_{questions_number}_{seed}.jsonl').exists():
+            logger.info(f'Generating Synthetic Knowledge Base With {dishes_number} Dishes.')
+            subprocess.run(
+                [sys.executable, '-m', 'benchmarks.benchmark_query_manager', '--generate', str(dishes_number), '--questions', str(questions_number), '--work-path', str(work_path), '--seed', str(seed)],
+                check=True
+            )
+        logger.info(f'Measuring Query Manager With {dishes_number} Dishes.')
+        process = subprocess.run(
+            [sys.executable, '-m', 'benchmarks.benchmark_query_manager', '--measure', str(dishes_number), '--questions', str(questions_number), '--work-path', str(work_path), '--seed', str(seed)],
+            capture_output=True, text=True
+        )
+        if process.returncode != 0:
+            logger.error(f'Measurement With {dishes_number} Dishes Failed (exit code {process.returncode}): {process.stderr.strip()[-500:]}')
+            results.append({'dishes': dishes_number, 'error': f'exit code {process.returncode}'})
+            continue
+        results.append(json.loads(process.stdout.strip().splitlines()[-1]))
+        logger.info(f'Results: {results[-1]}')
+
+    return results
+
+
+def find_regressions(results: List[Dict], baseline_results: List[Dict], tolerance: float) -> List[str]:
+    regressions = []
+    baseline_results = {r['dishes']: r for r in baseline_results if 'error' not in r}
+    for r in results:
+        if r['dishes'] not in baseline_results:
+            continue
+        if 'error' in r:
+            regressions.append(f"{r['dishes']} dishes: {r['error']}")
+            continue
+        for metric in ['load_s', 'peak_rss_mb', 'kb_bytes_per_dish', 'p50_ms', 'p99_ms']:
+            if metric in baseline_results[r['dishes']] and r[metric] > baseline_results[r['dishes']][metric] * (1 + tolerance):
+                regressions.append(f"{r['dishes']} dishes: {metric} {baseline_results[r['dishes']][metric]} -> {r[metric]}")
+
+    return regressions
+
+
+# main-like execution
+if __name__ == '__main__':
+
+    # parse command line arguments
+    parser = argparse.ArgumentParser(description='Benchmark the Query Manager over synthetic Knowledge Bases.')
+    parser.add_argument('--sizes', type=int, nargs='+', default=[10_000, 100_000, 1_000_000])
+    parser.add_argument('--questions', type=int, default=1000)
+    parser.add_argument('--work-path', type=Path, default=Path(__file__).parent.parent / 'data' / 'benchmarks')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--output', type=Path, default=None)
+    parser.add_argument('--baseline', type=Path, default=None)
+    parser.add_argument('--tolerance', type=float, default=0.2)
+    parser.add_argument('--generate', type=int, default=None, help=argparse.SUPPRESS)
+    parser.add_argument('--measure', type=int, default=None, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    logger.remove()
+    logger.add(sys.stderr, level='WARNING' if args.measure is not None else 'INFO')
+
+    # execute a single step, when run as a worker process
+    if args.generate is not None:
+        generate_workload(dishes_number=args.generate, questions_number=args.questions, work_path=args.work_path, seed=args.seed)
+        sys.exit(0)
+    if args.measure is not None:
+        print(json.dumps(measure_workload(dishes_number=args.measure, questions_number=args.questions, work_path=args.work_path, seed=args.seed)))
+        sys.exit(0)
+
+    # execute benchmarks, comparing them against the baseline ones if provided
+    results_ = run_benchmarks(sizes=args.sizes, questions_number=args.questions, work_path=args.work_path, seed=args.seed)
+    print(f"{'dishes':>10} {'load_s':>8} {'peak_rss_mb':>12} {'B/dish':>8} {'KB B/dish':>9} {'p50_ms':>8} {'p99_ms':>8} {'fast_path':>9}")
+    for r in results_:
+        if 'error' in r:
+            print(f"{r['dishes']:>10} {r['error']}")
+            continue
+        print(f"{r['dishes']:>10} {r['load_s']:>8} {r['peak_rss_mb']:>12} {r['kb_rss_bytes_per_dish']:>8} {r['kb_bytes_per_dish']:>9} {r['p50_ms']:>8} {r['p99_ms']:>8} {r['fast_path_hit_rate']:>9}")
+    if args.output is not None:
+        args.output.write_text(json.dumps(results_, indent=4))
+    if args.baseline is not None:
+        regressions_ = find_regressions(results=results_, baseline_results=json.loads(args.baseline.read_text()), tolerance=args.tolerance)
+        for regression in regressions_:
+            logger.error(f'Regression: {regression}')
+        sys.exit(1 if regressions_ else 0)
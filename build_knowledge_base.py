@@ -1,18 +1,36 @@
 # external modules import
 import os
 from pathlib import Path
+from loguru import logger
 from dotenv import load_dotenv
 
 # internal modules import
-from modules import LBPConfig, LLMBasedParser, KBMConfig, KnowledgeBaseManager
+from modules import LBPConfig, LLMBasedParser, KBMConfig, KnowledgeBaseManager, LCConfig, LLMCache, OCConfig, OllamaClient, tracer
 
 
 # function definition
-def build_knowledge_base(kb_manager: KnowledgeBaseManager, menus_path: Path) -> None:
-    for menu_path in menus_path.glob('*.pkl'):
-        kb_manager.memorize_dishes(augmented_dishes=(adl := kb_manager.process_menu(menu_path=menu_path)))
-        if len(adl):
-            menu_path.rename(menu_path.parent / 'done' / menu_path.name)
+def build_knowledge_base(kb_manager: KnowledgeBaseManager, menus_path: Path, max_workers: int = 1, max_llm_workers: int = 1) -> None:
+    menus_paths = sorted(menus_path.glob('*.pkl'))
+    if kb_manager.manifest is not None:
+        menus_paths = kb_manager.select_menus(menus_paths=menus_paths + sorted((menus_path / 'done').glob('*.pkl')), menus_path=menus_path)
+    for menu_path, adl in kb_manager.process_menus(
+            menus_paths=menus_paths,
+            max_workers=max_workers,
+            max_llm_workers=max_llm_workers
+    ):
+        # menus whose processing failed are left where they are, to be retried by the next run
+        if adl is None:
+            continue
+        # menus without any dish (e.g., skipped or unparseable ones) are recorded, but left where they are to be checked
+        kb_manager.memorize_dishes(augmented_dishes=adl)
+        if len(adl) == 0:
+            logger.warning(f'{menu_path.name} Produced No Dish, Leaving It In {menu_path.parent}')
+        elif menu_path.parent == menus_path:
+            menu_path = menu_path.rename(menu_path.parent / 'done' / menu_path.name)
+        if kb_manager.manifest is not None:
+            kb_manager.memorize_menu(menu_path=menu_path, menus_path=menus_path, augmented_dishes=adl)
+    if kb_manager.snapshot_path is not None:
+        kb_manager.memorize_snapshot()
 
     return
 
@@ -24,21 +42,63 @@ if __name__ == '__main__':
     os.environ['HF_HOME'] = './ data / cache'
     load_dotenv()
 
+    # enable tracing, when any of its outputs is requested
+    trace_path_ = Path(os.environ['TRACE_PATH']) if os.getenv('TRACE_PATH') else None
+    prometheus_path_ = Path(os.environ['TRACE_PROMETHEUS_PATH']) if os.getenv('TRACE_PROMETHEUS_PATH') else None
+    if trace_path_ is not None or prometheus_path_ is not None:
+        tracer.enable(jsonl_path=trace_path_)
+
+    # create llm cache object
+    llm_cache_ = LLMCache(
+        config=LCConfig(
+            cache_path=Path(__file__).parent / 'data' / 'cache' / 'llm_cache.sqlite',
+            bypass=os.getenv('LLM_CACHE_BYPASS', 'false').lower() == 'true'
+        )
+    )
+
+    # create shared ollama client object
+    ollama_client_ = OllamaClient(
+        config=OCConfig(
+            ollama_server_uri=os.getenv('OLLAMA_SERVER_URI'),
+            max_concurrency=int(os.getenv('OLLAMA_MAX_CONCURRENCY', 4))
+        )
+    )
+
     # create knowledge base manager object
     kb_manager_ = KnowledgeBaseManager(
         config=KBMConfig(
             manual_path=Path(__file__).parent / 'data' / 'raw' / 'Manuale di Cucina.pdf',
             code_path=Path(__file__).parent / 'data' / 'raw' / 'Codice Galattico.pdf',
             dishes_codes_path=Path(__file__).parent / 'data' / 'dish_mapping.json',
-            kb_path=Path(__file__).parent / 'data' / 'processed' / 'dishes'
+            kb_path=Path(__file__).parent / 'data' / 'processed' / 'dishes',
+            snapshot_path=Path(__file__).parent / 'data' / 'processed' / 'dishes' / 'knowledge_base.kbs',
+            manifest_path=Path(__file__).parent / 'data' / 'processed' / 'manifest.json',
+            info_cache_path=Path(__file__).parent / 'data' / 'cache' / 'kbm_info.json'
         ),
         llm_based_parser=LLMBasedParser(
             config=LBPConfig(
                 ollama_server_uri=os.getenv('OLLAMA_SERVER_URI'),
                 ollama_model_name=os.getenv('LBP_MODEL_NAME')
-            )
+            ),
+            llm_cache=llm_cache_,
+            ollama_client=ollama_client_
         )
     )
 
     # execute knowledge base building pipeline
-    build_knowledge_base(kb_manager=kb_manager_, menus_path=Path(__file__).parent / 'data' / 'processed' / 'menus')
+    build_knowledge_base(
+        kb_manager=kb_manager_,
+        menus_path=Path(__file__).parent / 'data' / 'processed' / 'menus',
+        max_workers=int(os.getenv('BUILD_MAX_WORKERS', 1)),
+        max_llm_workers=int(os.getenv('BUILD_MAX_LLM_WORKERS', 1))
+    )
+    logger.info(f'LLM Cache Stats: {llm_cache_.stats()}')
+    logger.info(f'Ollama Client Stats: {ollama_client_.stats()}')
+    ollama_client_.close()
+
+    # export tracing metrics
+    if trace_path_ is not None:
+        tracer.write_jsonl(trace_path_)
+    if prometheus_path_ is not None:
+        tracer.write_prometheus(prometheus_path_)
+    tracer.disable()
@@ -5,17 +5,20 @@ import pickle
 import pdfplumber
 from pathlib import Path
 from loguru import logger
-from pdfplumber.pdf import PDF
 from Levenshtein import distance
-from typing import List, Tuple, Dict
+from typing import List, Tuple, Dict, Iterator
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, wait, FIRST_COMPLETED
 from langchain_core.exceptions import OutputParserException
 from docling_core.types.doc.document import DoclingDocument, DocItem, DocItemLabel
 
 # internal modules import
 from .configs import KBMConfig
 from .enums import Planet, Order
+from .indexes import BKTree
+from .storage import KBSnapshot, KBManifest, KBMInfoCache
+from .telemetry import tracer
 from .parsers import RuleBasedParser, LLMBasedParser
-from .templates import KBMInfo, Restaurant, Chef, Dish, AugmentedDish
+from .templates import KBMInfo, Restaurant, Chef, Dish, AugmentedDish, IngredientsList
 
 
 # class definition
@@ -24,81 +27,115 @@ class KnowledgeBaseManager:
     This class implements all the capabilities to populate the Knowledge Base.
     """
 
+    # version of the menu processing logic, to be increased whenever it changes in a way that affects the extracted dishes
+    PARSER_VERSION = 1
+
     # constructor
     def __init__(self, config: KBMConfig, llm_based_parser: LLMBasedParser):
 
         # initialize llm object and knowledge base path
         self.llm_based_parser = llm_based_parser
         self.kb_path = config.kb_path
+        self.snapshot_path = config.snapshot_path
 
-        # load cooking manual content
-        manual = self._load_document(config.manual_path)
-        logger.info('The Cooking Manual has been loaded.')
+        # initialize build manifest and parser version
+        self.manifest = KBManifest(config.manifest_path) if config.manifest_path is not None else None
+        self.parser_version = f'{self.PARSER_VERSION}-' + KBManifest.hash_files(
+            [config.dishes_codes_path, config.manual_path, config.code_path]
+        )
 
-        # load code of conduct content
-        code = self._load_document(config.code_path)
-        logger.info('The Galactic Code of Conduct has been loaded.')
+        # load support info from cache, reading the cooking manual and the code of conduct only when they changed
+        info_cache = KBMInfoCache(config.info_cache_path) if config.info_cache_path is not None else None
+        info_key = f'{self.PARSER_VERSION}-' + KBManifest.hash_files([config.manual_path, config.code_path])
+        documents_info = info_cache.lookup(info_key) if info_cache is not None else None
+        if documents_info is None:
+            documents_info = self._extract_documents_info(config.manual_path, config.code_path)
+            if info_cache is not None:
+                info_cache.update(info_key, documents_info)
+        else:
+            logger.info('The Cooking Manual and the Galactic Code of Conduct info have been loaded from cache.')
 
         # initialize supporting info object
         self.info = KBMInfo(
             planets_names=[x.value for x in Planet],
-            licenses_info=self._extract_licenses_info(manual),
-            techniques_info=self._extract_techniques_info(manual),
-            techniques_reqs=self._extract_techniques_reqs(code),                # not used at the moment
+            licenses_info=documents_info['licenses_info'],
+            techniques_info={k: tuple(v) for k, v in documents_info['techniques_info'].items()},
+            techniques_reqs=documents_info['techniques_reqs'],                  # not used at the moment
             dishes_codes=self._load_dishes_codes(config.dishes_codes_path)
         )
 
-        # free memory
-        del code, manual
+        # build dishes names fuzzy index
+        self.dishes_names_tree = BKTree()
+        for d_name in self.info.dishes_codes.keys():
+            self.dishes_names_tree.add(word=d_name.lower(), value=d_name)
+
+    # serialization methods
+    def __getstate__(self) -> Dict:
+        # menu preprocessing workers only need the rule-based capabilities, so the llm-based parser is not shipped
+        return {**self.__dict__, 'llm_based_parser': None}
 
     # non-public methods
-    @ staticmethod
-    def _load_document(file_path: Path) -> PDF:
-        return pdfplumber.open(file_path)
+    @staticmethod
+    def _read_document(file_path: Path, extract_lines: bool = False) -> Tuple[str, List[Tuple[str, float]]]:
+        # every page is parsed once into its lines, whose texts also make up the text of the page
+        document_text, document_lines = '', []
+        with pdfplumber.open(file_path) as document:
+            for page in document.pages:
+                page_lines = page.extract_text_lines()
+                document_text += '\n'.join(line['text'] for line in page_lines)
+                if extract_lines:
+                    for line in page_lines:
+                        document_lines.append((line['text'], line['chars'][3]['size'] if len(line['chars']) > 3 else 0.0))
+                page.close()
+
+        return document_text, document_lines
 
     @staticmethod
-    def _extract_licenses_info(document: PDF) -> str:
-        document_content = ''
-        for page in document.pages:
-            if page_content := page.extract_text():
-                document_content += page_content
-        output_text = document_content.split('Capitolo 1:')[1].split('Capitolo 2')[0]
+    def _extract_licenses_info(document_text: str) -> str:
+        output_text = document_text.split('Capitolo 1:')[1].split('Capitolo 2')[0]
         output_text = re.sub(r'[ \t]+', ' ', output_text)
         output_text = re.sub(r'\n{3,}', '\n\n', output_text).strip()
 
         return output_text
 
     @staticmethod
-    def _extract_techniques_info(document: PDF) -> Dict[str, Tuple[str, str]]:
+    def _extract_techniques_info(document_lines: List[Tuple[str, float]]) -> Dict[str, Tuple[str, str]]:
         extraction_flag, technique_category, technique_subcategory, techniques = False, None, None, {}
-        for page in document.pages:
-            lines = page.extract_text_lines()
-            for line in lines:
-                if 'Capitolo 3:' in line['text']:
-                    extraction_flag = True
-                if extraction_flag:
-                    if line['chars'][3]['size'] > 20:
-                        technique_category = line['text'].split(':')[1].strip()
-                    if 14 <= line['chars'][3]['size'] <= 20:
-                        technique_subcategory = line['text'].strip()
-                    if 12 < line['chars'][3]['size'] < 14:
-                        techniques[line['text']] = (technique_category, technique_subcategory)
+        for line_text, line_size in document_lines:
+            if 'Capitolo 3:' in line_text:
+                extraction_flag = True
+            if extraction_flag:
+                if line_size > 20:
+                    technique_category = line_text.split(':')[1].strip()
+                if 14 <= line_size <= 20:
+                    technique_subcategory = line_text.strip()
+                if 12 < line_size < 14:
+                    techniques[line_text] = (technique_category, technique_subcategory)
 
         return techniques
 
     @staticmethod
-    def _extract_techniques_reqs(document: PDF) -> str:
-        document_content = ''
-        for page in document.pages:
-            if page_content := page.extract_text():
-                document_content += page_content
-        output_text = document_content.split('4 Licenze e Tecniche di Preparazione')[1].split('5 Sanzioni e Pene')[0]
+    def _extract_techniques_reqs(document_text: str) -> str:
+        output_text = document_text.split('4 Licenze e Tecniche di Preparazione')[1].split('5 Sanzioni e Pene')[0]
         output_text = re.sub(r'[ \t]+', ' ', output_text)
         output_text = re.sub(r'\n{3,}', '\n\n', output_text)
         output_text = re.sub(r'789/\d{5} \d+° Giorno del Ciclo Cosmico 789', "", output_text).strip()
 
         return output_text
 
+    @classmethod
+    def _extract_documents_info(cls, manual_path: Path, code_path: Path) -> Dict:
+        manual_text, manual_lines = cls._read_document(manual_path, extract_lines=True)
+        logger.info('The Cooking Manual has been loaded.')
+        code_text, _ = cls._read_document(code_path)
+        logger.info('The Galactic Code of Conduct has been loaded.')
+
+        return {
+            'licenses_info': cls._extract_licenses_info(manual_text),
+            'techniques_info': cls._extract_techniques_info(manual_lines),
+            'techniques_reqs': cls._extract_techniques_reqs(code_text)
+        }
+
     @staticmethod
     def _load_dishes_codes(file_path: Path) -> Dict:
         with open(file_path, 'r') as file:
@@ -124,7 +161,7 @@ class KnowledgeBaseManager:
         for t in dishes_texts:
             if distance(t.text.lower(), 'legenda ordini professionali gastronomici') <= 3:
                 break
-            if any([distance(t.text.lower(), dish_name.lower()) <= 2 for dish_name in self.info.dishes_codes.keys()]):
+            if self.dishes_names_tree.search(word=t.text.lower(), max_distance=2):
                 if len(current_dish_info) > 0:
                     dishes_info.append(current_dish_info)
                     dishes_flags.append(all([ingredients_flag, techniques_flag]))
@@ -172,15 +209,14 @@ class KnowledgeBaseManager:
 
     def _populate_dish(self, dishes_info: List[str], dishes_flag: bool) -> Dish:
         dish_code, dish_name = -1, ''
-        for d_name, d_code in self.info.dishes_codes.items():
-            if dishes_info[0].lower() == d_name.lower():
-                dish_code, dish_name = d_code, d_name
-                break
+        for d_name in self.dishes_names_tree.search(word=dishes_info[0].lower(), max_distance=0):
+            dish_code, dish_name = self.info.dishes_codes[d_name], d_name
+            break
         if dish_code == -1:
             logger.warning('Dish Name Exact Match Failed, Trying with Fuzzy Match')
-            for d_name, d_code in self.info.dishes_codes.items():
+            for d_name in self.dishes_names_tree.search(word=dishes_info[0].lower(), max_distance=2):
                 if distance(dishes_info[0], d_name) <= 2:
-                    dish_code, dish_name = d_code, d_name
+                    dish_code, dish_name = self.info.dishes_codes[d_name], d_name
                     break
         if dishes_flag:
             dish_ingredients = RuleBasedParser.extract_dish_ingredients(
@@ -191,9 +227,8 @@ class KnowledgeBaseManager:
                 additional_info=self.info.techniques_info
             )
         else:
-            dish_ingredients = self.llm_based_parser.extract_dish_ingredients(
-                input_text='\n'.join(dishes_info)
-            )
+            # ingredients are extracted afterward by the llm-based parser (see _complete_menu)
+            dish_ingredients = IngredientsList(items=[])
             dish_techniques = RuleBasedParser.extract_dish_techniques_v2(
                 input_text=dishes_info,
                 additional_info=self.info.techniques_info
@@ -209,50 +244,167 @@ class KnowledgeBaseManager:
             naturalisti_flag = True if Order.NATURALISTI.value in dishes_info[0] else False
         )
 
-    # public methods
-    def process_menu(self, menu_path: Path) -> List[AugmentedDish]:
-
-        # initialize output
-        augmented_dishes = []
+    @tracer.traced('kbm.preprocess_menu')
+    def _preprocess_menu(self, menu_path: Path) -> Tuple[List[str], Restaurant, List[List[str]], List[bool], List[Dish]] | None:
 
         # load document
-        with open(menu_path, 'rb') as f:
+        with tracer.span('kbm.load_menu', menu=menu_path.name), open(menu_path, 'rb') as f:
             menu: DoclingDocument = pickle.load(f)
 
         # extract dishes information
         menu_keyword_position = self._find_menu_keyword(menu=menu)
         if menu_keyword_position == -1:
             logger.warning('Skipped Current Menu')
-            return []
+            tracer.count('kbm.skipped_menus')
+            return None
 
         # preprocess document content
-        restaurant_info = self._extract_restaurant_info(restaurant_texts=menu.texts[0:menu_keyword_position])
-        dishes_info, dishes_flags = self._extract_dishes_info(dishes_texts=menu.texts[(menu_keyword_position + 1):])
+        with tracer.span('kbm.extract_dishes_info', menu=menu_path.name):
+            restaurant_info = self._extract_restaurant_info(restaurant_texts=menu.texts[0:menu_keyword_position])
+            dishes_info, dishes_flags = self._extract_dishes_info(dishes_texts=menu.texts[(menu_keyword_position + 1):])
 
         # extract restaurant
         restaurant = self._populate_restaurant(restaurant_info=restaurant_info)
         logger.info(f'Currently Processing {restaurant.name}')
 
-        # extract chef info
-        chef = self._populate_chef(restaurant_info=restaurant_info)
-        logger.info(f' - Chef Extracted: {chef.name}')
+        # extract rule-based information for each dish
+        with tracer.span('kbm.populate_dishes', menu=menu_path.name):
+            dishes = [self._populate_dish(dishes_info=di, dishes_flag=df) for di, df in zip(dishes_info, dishes_flags)]
+        tracer.observe('kbm.menu_dishes', len(dishes))
+
+        return restaurant_info, restaurant, dishes_info, dishes_flags, dishes
 
-        # extract ingredients and techniques for each dish
-        for current_dish_info, current_dish_flag in zip(dishes_info, dishes_flags):
+    @tracer.traced('kbm.complete_menu')
+    def _complete_menu(self, preprocessed_menu: Tuple[List[str], Restaurant, List[List[str]], List[bool], List[Dish]] | None) -> List[AugmentedDish]:
+
+        # initialize output
+        augmented_dishes = []
+        if preprocessed_menu is None:
+            return []
+        restaurant_info, restaurant, dishes_info, dishes_flags, dishes = preprocessed_menu
+
+        # extract chef info
+        with tracer.span('kbm.populate_chef', restaurant=restaurant.name):
+            chef = self._populate_chef(restaurant_info=restaurant_info)
+        logger.info(f' - Chef Extracted: {chef.name} ({restaurant.name})')
+
+        # extract llm-based information for each dish
+        for current_dish_info, current_dish_flag, current_dish in zip(dishes_info, dishes_flags, dishes):
+            tracer.count('kbm.dishes', ingredients_source='rules' if current_dish_flag else 'llm')
+            if not current_dish_flag:
+                current_dish.ingredients = self.llm_based_parser.extract_dish_ingredients(
+                    input_text='\n'.join(current_dish_info)
+                )
             augmented_dishes.append(
                 AugmentedDish(
                     restaurant=restaurant,
                     chef=chef,
-                    dish=self._populate_dish(dishes_info=current_dish_info, dishes_flag=current_dish_flag)
+                    dish=current_dish
                 )
             )
             logger.info(f' - Dish Extracted: {augmented_dishes[-1].dish.name}')
 
         return augmented_dishes
 
+    # public methods
+    def process_menu(self, menu_path: Path) -> List[AugmentedDish]:
+        return self._complete_menu(preprocessed_menu=self._preprocess_menu(menu_path=menu_path))
+
+    def process_menus(self, menus_paths: List[Path], max_workers: int = 1, max_llm_workers: int = 1) -> Iterator[Tuple[Path, List[AugmentedDish] | None]]:
+
+        # process menus sequentially, yielding None instead of the dishes of the menus whose processing failed
+        if max_workers == 1 and max_llm_workers == 1:
+            for menu_path in menus_paths:
+                try:
+                    augmented_dishes = self.process_menu(menu_path=menu_path)
+                except Exception as e:
+                    logger.error(f'{menu_path.name} Processing Failed: {e!r}')
+                    augmented_dishes = None
+                yield menu_path, augmented_dishes
+            return
+
+        # preprocess menus in a process pool, and complete them with a bounded number of concurrent llm calls, yielding
+        # every menu as soon as it is completed rather than after all the menus have been preprocessed
+        with ProcessPoolExecutor(max_workers=max_workers) as cpu_executor, ThreadPoolExecutor(max_workers=max_llm_workers) as llm_executor:
+            cpu_futures = {cpu_executor.submit(tracer.bind(self._preprocess_menu), menu_path=mp): mp for mp in menus_paths}
+            llm_futures = {}
+            while cpu_futures or llm_futures:
+                done_futures, _ = wait(list(cpu_futures) + list(llm_futures), return_when=FIRST_COMPLETED)
+                for future in done_futures:
+                    if future in cpu_futures:
+                        menu_path = cpu_futures.pop(future)
+                        try:
+                            llm_futures[llm_executor.submit(tracer.bind(self._complete_menu), preprocessed_menu=future.result())] = menu_path
+                        except Exception as e:
+                            logger.error(f'{menu_path.name} Preprocessing Failed: {e!r}')
+                            yield menu_path, None
+                    else:
+                        menu_path = llm_futures.pop(future)
+                        try:
+                            augmented_dishes = future.result()
+                        except Exception as e:
+                            logger.error(f'{menu_path.name} Processing Failed: {e!r}')
+                            augmented_dishes = None
+                        yield menu_path, augmented_dishes
+
+        return
+
     def memorize_dishes(self, augmented_dishes: List[AugmentedDish]) -> None:
         for ad in augmented_dishes:
-            with open(self.kb_path / (str(ad.dish.code) + '.json'), 'w', encoding='utf-8') as f:
+            dish_path = self.kb_path / (str(ad.dish.code) + '.json')
+            # write through a temporary file, so that readers never see partially written dishes
+            tmp_path = dish_path.with_name(dish_path.name + '.tmp')
+            with open(tmp_path, 'w', encoding='utf-8') as f:
                 f.write(ad.model_dump_json(indent=4))
+            tmp_path.replace(dish_path)
+
+        return
+
+    def forget_dishes(self, dishes_codes: List[int]) -> None:
+        for dish_code in dishes_codes:
+            (self.kb_path / (str(dish_code) + '.json')).unlink(missing_ok=True)
+
+        return
+
+    def select_menus(self, menus_paths: List[Path], menus_path: Path) -> List[Path]:
+
+        # forget menus that do not exist anymore, together with their dishes
+        menus_names = {mp.relative_to(menus_path).as_posix() for mp in menus_paths}
+        for menu_name in [mn for mn in self.manifest.menus if mn not in menus_names]:
+            self.forget_dishes(dishes_codes=[dc for dc in self.manifest.remove(menu_name) if not self.manifest.owners(dc)])
+            logger.info(f'{menu_name} Removed from the Knowledge Base')
+        self.manifest.memorize()
+
+        # select new, changed or invalidated menus
+        selected_menus_paths = [
+            mp for mp in menus_paths
+            if not self.manifest.is_valid(mp.relative_to(menus_path).as_posix(), KBManifest.hash_files([mp]), self.parser_version)
+        ]
+        logger.info(f'{len(selected_menus_paths)} Menus to Process, {len(menus_paths) - len(selected_menus_paths)} Up to Date')
+        selected_menus_names = {mp.relative_to(menus_path).as_posix() for mp in selected_menus_paths}
+        empty_menus_names = [mn for mn, me in self.manifest.menus.items() if len(me['dishes_codes']) == 0 and mn not in selected_menus_names]
+        if len(empty_menus_names) > 0:
+            logger.warning(f'{len(empty_menus_names)} Up to Date Menus Produced No Dish: {empty_menus_names}')
+
+        return selected_menus_paths
+
+    def memorize_menu(self, menu_path: Path, menus_path: Path, augmented_dishes: List[AugmentedDish]) -> None:
+        # menus are recorded by their path relative to the menus folder, so that those in the 'done' folder are told apart
+        menu_name = menu_path.relative_to(menus_path).as_posix()
+        dishes_codes = [ad.dish.code for ad in augmented_dishes]
+        stale_dishes_codes = [dc for dc in self.manifest.remove(menu_name) if dc not in dishes_codes]
+        self.forget_dishes(dishes_codes=[dc for dc in stale_dishes_codes if not self.manifest.owners(dc)])
+        self.manifest.update(menu_name, KBManifest.hash_files([menu_path]), self.parser_version, dishes_codes)
+        self.manifest.memorize()
+
+        return
+
+    def memorize_snapshot(self) -> None:
+        knowledge_base = []
+        for dish_path in self.kb_path.glob('*.json'):
+            with open(dish_path, 'r', encoding='utf-8') as f:
+                knowledge_base.append(AugmentedDish(**json.load(f)))
+        KBSnapshot.write(file_path=self.snapshot_path, knowledge_base=knowledge_base)
+        logger.info(f'Knowledge Base Snapshot Saved ({len(knowledge_base)} Dishes).')
 
         return
@@ -0,0 +1,44 @@
+# external modules import
+import sys
+import importlib
+from types import ModuleType
+from typing import Dict, Any
+
+
+# class definition
+class LazyPackage(ModuleType):
+    """
+    This class implements a package whose exported names are only imported when first accessed (see PEP 562), so that
+    heavy dependencies are only loaded by the code paths that need them. Since every class lives in a module named after
+    it, the binding of such a module to the package attribute, which the import system performs, is ignored in favour of
+    the class itself.
+    """
+
+    # public methods
+    @staticmethod
+    def install(module_name: str, exports: Dict[str, str]) -> None:
+        package = sys.modules[module_name]
+        package.__exports__ = exports
+        package.__all__ = list(exports)
+        package.__class__ = LazyPackage
+
+        return
+
+    def __getattr__(self, name: str) -> Any:
+        exports = self.__dict__.get('__exports__', {})
+        if name not in exports:
+            raise AttributeError(f'module {self.__name__!r} has no attribute {name!r}')
+        value = getattr(importlib.import_module(exports[name], self.__name__), name)
+        ModuleType.__setattr__(self, name, value)
+
+        return value
+
+    def __setattr__(self, name: str, value: Any) -> None:
+        if isinstance(value, ModuleType) and name in self.__dict__.get('__exports__', {}):
+            return
+        ModuleType.__setattr__(self, name, value)
+
+        return
+
+    def __dir__(self):
+        return sorted(set(ModuleType.__dir__(self)) | set(self.__dict__.get('__exports__', {})))
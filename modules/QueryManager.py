@@ -1,17 +1,24 @@
 # external modules import
 import csv
-import copy
 import json
+import time
+import threading
 from pathlib import Path
+from collections import Counter
 from loguru import logger
-from Levenshtein import distance
 from typing import List, Dict, Tuple
+from concurrent.futures import ThreadPoolExecutor
 
 # internal modules import
 from .configs import QMConfig
 from .agents import QueryAgent
-from .enums import Planet, LicenseName, LicenseCode, LogicalOperator
-from .templates import QMInfo, AugmentedDish, Restaurant, License, Ingredient, IngredientsList, Technique, TechniquesList, Question, QuestionLogics, Answer
+from .parsers import TemplateQuestionParser
+from .indexes import BitmapIndex, EntityMatcher, NGramIndex, Vocabulary
+from .planners import QueryPlanner
+from .storage import KBSnapshot, KBStore, KBManifest, AnswersCache
+from .telemetry import tracer
+from .enums import Planet, LicenseName, LicenseCode, Order, EntityType
+from .templates import QMInfo, AugmentedDish, Restaurant, IngredientsList, TechniquesList, Question, QuestionLogics, Answer
 
 
 # class definition
@@ -26,8 +33,18 @@ class QueryManager:
         # initialize query agent object
         self.query_agent = query_agent
 
-        # load knowledge base into memory
-        self.knowledge_base = self._load_knowledge_base(config.kb_path)
+        # load knowledge base into memory, in its compact representation, together with its version
+        with tracer.span('query.load_knowledge_base'):
+            self.knowledge_base, self.kb_version = self._load_knowledge_base(config.kb_path, config.snapshot_path)
+
+        # build ingredients and techniques vocabularies over the names of the entries shared by the dishes
+        with tracer.span('query.build_vocabularies'):
+            self.ingredients_vocabulary, self.techniques_vocabulary = self._build_vocabularies()
+        logger.info(
+            f'Vocabularies Built: {len(self.ingredients_vocabulary.entries)} ingredients '
+            f'({len(set(self.ingredients_vocabulary.clusters))} clusters), {len(self.techniques_vocabulary.entries)} '
+            f'techniques ({len(set(self.techniques_vocabulary.clusters))} clusters).'
+        )
 
         # initialize supporting info object
         self.info = QMInfo(
@@ -38,6 +55,42 @@ class QueryManager:
             restaurants_list=self._extract_restaurants()
         )
 
+        # build bitmap index over the knowledge base, and the planner scheduling the constraints over it
+        with tracer.span('query.build_index'):
+            self.dishes_index = BitmapIndex(knowledge_base=self.knowledge_base)
+        self.query_planner = QueryPlanner(dishes_index=self.dishes_index)
+
+        # build entities matcher over the known entities names
+        self.entity_matcher = EntityMatcher(
+            entities={
+                EntityType.RESTAURANT: [r.name for r in self.info.restaurants_list],
+                EntityType.PLANET: [p.value for p in self.info.planets_distances.keys()],
+                EntityType.ORDER: [o.name for o in Order],
+                EntityType.INGREDIENT: [i.name for i in self.info.ingredients_list.items],
+                EntityType.TECHNIQUE: [t.name for t in self.info.techniques_list.items]
+            },
+            max_distances={EntityType.RESTAURANT: 3}
+        )
+
+        # build candidates retrieval indexes over the vocabularies
+        self.candidates_number = config.candidates_number
+        self.ingredients_index = NGramIndex(names=[i.name for i in self.ingredients_vocabulary.entries])
+        self.techniques_index = NGramIndex(names=[t.name for t in self.techniques_vocabulary.entries])
+
+        # initialize template-based question parser and its counters
+        self.question_parser = TemplateQuestionParser(techniques=self.info.techniques_list)
+        self.fast_path_threshold = config.fast_path_threshold
+        self.fast_path_lock = threading.Lock()
+        self.fast_path_hits, self.fast_path_misses = 0, 0
+
+        # initialize answers cache, scoped to the current knowledge base version
+        self.answers_cache = AnswersCache(max_size=config.answers_cache_size) if config.answers_cache_size else None
+        if self.answers_cache is not None:
+            self.answers_cache.set_version(version=self.kb_version)
+
+        # initialize the thread pool running the llm calls that are independent of the calling thread ones
+        self.llm_executor = ThreadPoolExecutor(max_workers=config.max_llm_workers, thread_name_prefix='qm-llm')
+
     # non-public methods
     @staticmethod
     def _load_questions_templates(file_path: Path) -> Dict[str, int]:
@@ -47,13 +100,22 @@ class QueryManager:
         return questions_templates
 
     @staticmethod
-    def _load_knowledge_base(file_path: Path) -> List[AugmentedDish]:
+    def _load_knowledge_base(file_path: Path, snapshot_path: Path | None = None) -> Tuple[KBStore, str]:
+        dishes_paths = sorted(file_path.glob('*.json'))
+        if snapshot_path is not None and snapshot_path.exists():
+            try:
+                with KBSnapshot(snapshot_path) as snapshot:
+                    if not snapshot.is_stale(descriptors_paths=dishes_paths):
+                        return snapshot.load_store(), snapshot.version
+                    logger.warning(f'{snapshot_path} Is Older Than The JSON Descriptors, Loading Them Instead.')
+            except ValueError as e:
+                logger.warning(f'{e} Loading the JSON descriptors instead.')
         knowledge_base = []
-        for dish_path in file_path.glob('*.json'):
+        for dish_path in dishes_paths:
             with open(dish_path, 'r', encoding='utf-8') as file:
                 knowledge_base.append(AugmentedDish(**json.load(file)))
 
-        return knowledge_base
+        return KBStore.from_dishes(knowledge_base), KBManifest.hash_files(dishes_paths)
 
     @staticmethod
     def _load_planets_distances(file_path: Path) -> Dict[Planet, Dict[Planet, int]]:
@@ -67,244 +129,200 @@ class QueryManager:
 
         return planets_distances
 
-    def _extract_ingredients_list(self) -> IngredientsList:
-        ingredients = []
-        for ad in self.knowledge_base:
-            ingredients.extend(ad.dish.ingredients.items)
+    def _build_vocabularies(self) -> Tuple[Vocabulary, Vocabulary]:
+        # every ingredient and technique is stored once, and counted as many times as the dishes reference it; the
+        # vocabularies are keyed by name, while techniques sharing a name may differ in category, so the store entries
+        # are left untouched
+        ingredients_vocabulary, techniques_vocabulary = Vocabulary(), Vocabulary()
+        ingredients_counts = Counter(self.knowledge_base.ingredients_references)
+        techniques_counts = Counter(self.knowledge_base.techniques_references)
+        for ingredient_id, i in enumerate(self.knowledge_base.ingredients):
+            ingredients_vocabulary.add(entry=i, count=ingredients_counts[ingredient_id])
+        for technique_id, t in enumerate(self.knowledge_base.techniques):
+            techniques_vocabulary.add(entry=t, count=techniques_counts[technique_id])
+        ingredients_vocabulary.cluster(max_distance=2)
+        techniques_vocabulary.cluster(max_distance=2)
+
+        return ingredients_vocabulary, techniques_vocabulary
 
-        return IngredientsList(items=ingredients)
+    def _extract_ingredients_list(self) -> IngredientsList:
+        return IngredientsList(items=self.ingredients_vocabulary.entries)
 
     def _extract_techniques_list(self) -> TechniquesList:
-        techniques = []
-        for ad in self.knowledge_base:
-            techniques.extend(ad.dish.techniques.items)
-
-        return TechniquesList(items=techniques)
+        return TechniquesList(items=self.techniques_vocabulary.entries)
 
     @staticmethod
     def _load_licenses_list() -> List[Tuple[LicenseName, LicenseCode]]:
         return [(l_name, LicenseCode[l_name.name].value) for l_name in LicenseName]
 
     def _extract_restaurants(self) -> List[Restaurant]:
-        restaurants = []
-        for ad in self.knowledge_base:
-            if ad.restaurant not in restaurants:
-                restaurants.append(ad.restaurant)
-
-        return restaurants
+        return list(self.knowledge_base.restaurants)
 
-    def _understand_question(self, question: str) -> Question:
-        base_question = self.query_agent.build_base_question_object(
-            question=question,
-            ingredients=self.info.ingredients_list,
-            techniques=self.info.techniques_list
+    @staticmethod
+    def _select_candidates(question: str, vocabulary: Vocabulary, index: NGramIndex, candidates_number: int) -> List:
+        # only the best matching variant of every cluster is kept, so that spelling variants do not crowd out other names
+        candidates, clusters = [], set()
+        for entry_id in index.search(text=question, top_k=len(vocabulary.entries)):
+            if vocabulary.clusters[entry_id] not in clusters:
+                clusters.add(vocabulary.clusters[entry_id])
+                candidates.append(vocabulary.entries[entry_id])
+                if len(candidates) == candidates_number:
+                    break
+
+        return candidates
+
+    def _retrieve_candidates(self, question: str) -> Tuple[IngredientsList, TechniquesList]:
+        if self.candidates_number is None:
+            return self.info.ingredients_list, self.info.techniques_list
+
+        return (
+            IngredientsList(items=self._select_candidates(question, self.ingredients_vocabulary, self.ingredients_index, self.candidates_number)),
+            TechniquesList(items=self._select_candidates(question, self.techniques_vocabulary, self.techniques_index, self.candidates_number))
         )
+
+    @tracer.traced('query.understand_question')
+    def _understand_question(self, question: str) -> Tuple[Question, QuestionLogics | None]:
+        with tracer.span('query.match_entities'):
+            entities_hits = self.entity_matcher.search(text=question)
+
+        # try the template-based parser first, falling back to the llm when it is not confident enough
+        with tracer.span('query.template_parser') as span:
+            base_question, licenses, question_logics, confidence = self.question_parser.parse(question=question, entities_hits=entities_hits)
+            span.set(confidence=confidence)
+        fast_path_flag = self.fast_path_threshold is not None and confidence >= self.fast_path_threshold
+        with self.fast_path_lock:
+            if fast_path_flag:
+                self.fast_path_hits += 1
+            else:
+                self.fast_path_misses += 1
+        tracer.count('query.fast_path', result='hit' if fast_path_flag else 'miss')
+        logger.info(f'Template Parser Confidence: {confidence:.2f} ({"fast path" if fast_path_flag else "llm fallback"})')
+
+        # start the licenses llm call in the background, since it does not depend on the base question object
+        licenses_future = None
+        if not fast_path_flag:
+            licenses = []
+            if 'chef' in question.lower():
+                licenses_future = self.llm_executor.submit(tracer.bind(self.query_agent.find_licenses), question=question, licenses=self.info.licenses_list)
+
+        # find the remaining entities while the licenses are being extracted
         planets = self.query_agent.find_planets(
             question=question,
+            entities_hits=entities_hits,
             planets_distances = self.info.planets_distances
         )
         restaurants = self.query_agent.find_restaurants(
-            question=question,
+            entities_hits=entities_hits,
             restaurants=self.info.restaurants_list
         )
-        if 'chef' in question.lower():
-            licenses = self.query_agent.find_licenses(
-                question=question,
-                licenses=self.info.licenses_list
-            ).items
-        else:
-            licenses = []
         orders = self.query_agent.find_orders(
-            question=question
+            entities_hits=entities_hits
         )
 
-        return Question(**base_question.model_dump(), planets=planets, restaurants=restaurants, chef_licenses=licenses, **orders)
-
+        # build the base question object in the calling thread, then wait for the licenses
+        if not fast_path_flag:
+            with tracer.span('query.llm_fallback'):
+                with tracer.span('query.retrieve_candidates'):
+                    ingredients_candidates, techniques_candidates = self._retrieve_candidates(question=question)
+                base_question = self.query_agent.build_base_question_object(
+                    question=question,
+                    ingredients=ingredients_candidates,
+                    techniques=techniques_candidates
+                )
+                if licenses_future is not None:
+                    licenses = licenses_future.result().items
+            question_logics = None
+
+        question_object = Question(**base_question.model_dump(), planets=planets, restaurants=restaurants, chef_licenses=licenses, **orders)
+
+        return question_object, question_logics
+
+    @tracer.traced('query.understand_logical_operators')
     def _understand_logical_operators(self, question: str, question_object: Question) -> QuestionLogics:
         return self.query_agent.understand_operators(question=question, question_object=question_object)
 
-    @staticmethod
-    def _filter_dishes_by_desired_ingredients(
-            input_dishes: List[AugmentedDish],
-            ingredients_list: List[Ingredient],
-            logical_operator: LogicalOperator
-    ) -> List[AugmentedDish]:
-        if len(ingredients_list) == 0:
-            return input_dishes
-        if logical_operator == LogicalOperator.AND:
-            output_dishes = copy.deepcopy(input_dishes)
-            for ingredient in ingredients_list:
-                output_dishes = [ad for ad in output_dishes if any(distance(i.name.lower(), ingredient.name.lower()) <= 2 for i in ad.dish.ingredients.items)]
-        else:
-            output_dishes = []
-            for ingredient in ingredients_list:
-                output_dishes.extend([ad for ad in input_dishes if any(distance(i.name.lower(), ingredient.name.lower()) <= 2 for i in ad.dish.ingredients.items)])
-
-        return output_dishes
-
-    @staticmethod
-    def _filter_dishes_by_disallowed_ingredients(
-            input_dishes: List[AugmentedDish],
-            ingredients_list: List[Ingredient]
-    ) -> List[AugmentedDish]:
-        output_dishes = copy.deepcopy(input_dishes)
-        for ingredient in ingredients_list:
-            output_dishes = [ad for ad in output_dishes if not any(distance(i.name.lower(), ingredient.name.lower()) <= 2 for i in ad.dish.ingredients.items)]
-
-        return output_dishes
-
-    @staticmethod
-    def _filter_dishes_by_desired_techniques(
-            input_dishes: List[AugmentedDish],
-            techniques_list: List[Technique],
-            logical_operator: LogicalOperator
-    ) -> List[AugmentedDish]:
-        if len(techniques_list) == 0:
-            return input_dishes
-        if logical_operator == LogicalOperator.AND:
-            output_dishes = copy.deepcopy(input_dishes)
-            for technique in techniques_list:
-                output_dishes = [ad for ad in output_dishes if any(distance(i.name.lower(), technique.name.lower()) <= 2 for i in ad.dish.techniques.items)]
-        else:
-            output_dishes = []
-            for technique in techniques_list:
-                output_dishes.extend([ad for ad in input_dishes if any(distance(i.name.lower(), technique.name.lower()) <= 2 for i in ad.dish.techniques.items)])
-
-        return output_dishes
-
-    @staticmethod
-    def _filter_dishes_by_disallowed_techniques(
-            input_dishes: List[AugmentedDish],
-            techniques_list: List[Technique]
-    ) -> List[AugmentedDish]:
-        output_dishes = copy.deepcopy(input_dishes)
-        for technique in techniques_list:
-            output_dishes = [ad for ad in output_dishes if not any(distance(i.name, technique.name) <= 2 for i in ad.dish.techniques.items)]
+    def _parse_question(self, question: str) -> Tuple[Question, QuestionLogics]:
 
-        return output_dishes
-
-    @staticmethod
-    def _filter_dishes_by_planets(
-            input_dishes: List[AugmentedDish],
-            planets_list: List[Planet]
-    ) -> List[AugmentedDish]:
-        if len(planets_list) == 0:
-            return input_dishes
-        output_dishes = []
-        for planet in planets_list:
-            output_dishes.extend([ad for ad in input_dishes if planet == ad.restaurant.planet])
-
-        return output_dishes
-
-    @staticmethod
-    def _filter_dishes_by_restaurants(
-            input_dishes: List[AugmentedDish],
-            restaurants_list: List[Restaurant]
-    ) -> List[AugmentedDish]:
-        if len(restaurants_list) == 0:
-            return input_dishes
-        output_dishes = []
-        for restaurant in restaurants_list:
-            output_dishes.extend([ad for ad in input_dishes if restaurant == ad.restaurant])
-
-        return output_dishes
-
-    @staticmethod
-    def _filter_dishes_by_licenses(
-            input_dishes: List[AugmentedDish],
-            licenses_list: List[License]
-    ) -> List[AugmentedDish]:
-        output_dishes = copy.deepcopy(input_dishes)
-        for license_ in licenses_list:
-            output_dishes = [ad for ad in output_dishes if any((i.code == license_.code and i.level >= license_.level) for i in ad.chef.licenses.items)]
-
-        return output_dishes
+        # understand subquestions types and parameters
+        logger.info('Original Question: ' + question.strip('\n'))
+        question_object, relationships_sequence = self._understand_question(question=question)
+        logger.info('Parsed Question: ' + question_object.model_dump_json())
 
-    @staticmethod
-    def _filter_dishes_by_orders(
-            input_dishes: List[AugmentedDish],
-            andromeda_flag: bool,
-            armonisti_flag: bool,
-            naturalisti_flag: bool
-    ) -> List[AugmentedDish]:
-        if not any([andromeda_flag, armonisti_flag, naturalisti_flag]):
-            return input_dishes
-        output_dishes = []
-        if andromeda_flag:
-            output_dishes.extend([ad for ad in input_dishes if ad.dish.andromeda_flag])
-        if armonisti_flag:
-            output_dishes.extend([ad for ad in input_dishes if ad.dish.armonisti_flag])
-        if naturalisti_flag:
-            output_dishes.extend([ad for ad in input_dishes if ad.dish.naturalisti_flag])
-
-        return output_dishes
+        # understand the relationships between subquestions, unless already known from the template-based parser
+        if relationships_sequence is None:
+            if any(
+                    [
+                        len(question_object.desired_ingredients) > 1,
+                        len(question_object.desired_techniques) > 1,
+                        len(question_object.chef_licenses) > 1,
+                    ]
+            ):
+                relationships_sequence = self._understand_logical_operators(question=question, question_object=question_object)
+                logger.info(relationships_sequence)
+            else:
+                relationships_sequence = QuestionLogics()
+
+        return question_object, relationships_sequence
 
     # public methods
+    @tracer.traced('query.answer_question')
     def answer_question(self, question: str) -> Answer:
+        question_object, relationships_sequence = self._parse_question(question=question)
+
+        # skip the filters when equivalent constraints were already answered by the current knowledge base
+        constraints = self.query_planner.canonicalize(question_object=question_object, question_logics=relationships_sequence)
+        if self.answers_cache is not None and (dishes_codes := self.answers_cache.lookup(constraints=constraints)) is not None:
+            tracer.count('query.answers_cache', result='hit')
+            return Answer(dishes_codes=dishes_codes)
+        tracer.count('query.answers_cache', result='miss')
+
+        # intersect the masks produced by every constraint, in the order chosen by the planner
+        with tracer.span('query.filter_dishes'):
+            plan = self.query_planner.plan(question_object=question_object, question_logics=relationships_sequence)
+            output_dishes = self.query_planner.execute(plan=plan)
+        if tracer.enabled:
+            tracer.observe('query.answer_size', output_dishes.bit_count())
+        answer = Answer(dishes_codes=self.dishes_index.decode(bitmap=output_dishes))
+        if self.answers_cache is not None:
+            self.answers_cache.update(constraints=constraints, dishes_codes=answer.dishes_codes)
+
+        return answer
+
+    def explain(self, question: str) -> str:
+        question_object, relationships_sequence = self._parse_question(question=question)
+        plan = self.query_planner.plan(question_object=question_object, question_logics=relationships_sequence)
+        start_time = time.perf_counter()
+        output_dishes = self.query_planner.execute(plan=plan, collect_stats=True)
+        elapsed_ms = 1000 * (time.perf_counter() - start_time)
+
+        return (
+            f'Question: {question.strip()}\n'
+            f'{self.query_planner.explain(plan=plan)}\n'
+            f'Result: {output_dishes.bit_count()} dishes out of {self.dishes_index.size} in {elapsed_ms:.3f} ms'
+        )
 
-        # understand subquestions types and parameters
-        logger.info('Original Question: ' + question.strip('\n'))
-        question_object = self._understand_question(question=question)
-        logger.info('Parsed Question: ' + question_object.model_dump_json())
+    def answers_cache_stats(self) -> Dict[str, float]:
+        return self.answers_cache.stats() if self.answers_cache is not None else {}
 
-        # understand the relationships between subquestions
-        if any(
-                [
-                    len(question_object.desired_ingredients) > 1,
-                    len(question_object.desired_techniques) > 1,
-                    len(question_object.chef_licenses) > 1,
-                ]
-        ):
-            relationships_sequence = self._understand_logical_operators(question=question, question_object=question_object)
-            logger.info(relationships_sequence)
-        else:
-            relationships_sequence = QuestionLogics()
-
-        # execute sequence of queries based on subquestions relationships
-        output_dishes = self._filter_dishes_by_desired_ingredients(
-            input_dishes=self.knowledge_base,
-            ingredients_list=question_object.desired_ingredients,
-            logical_operator=relationships_sequence.desired_ingredients_lo
-        )
-        output_dishes = self._filter_dishes_by_disallowed_ingredients(
-            input_dishes=output_dishes,
-            ingredients_list=question_object.disallowed_ingredients
-        )
-        output_dishes = self._filter_dishes_by_desired_techniques(
-            input_dishes=output_dishes,
-            techniques_list=question_object.desired_techniques,
-            logical_operator=relationships_sequence.desired_techniques_lo
-        )
-        output_dishes = self._filter_dishes_by_disallowed_techniques(
-            input_dishes=output_dishes,
-            techniques_list=question_object.disallowed_techniques
-        )
-        output_dishes = self._filter_dishes_by_planets(
-            input_dishes=output_dishes,
-            planets_list=question_object.planets
-        )
-        output_dishes = self._filter_dishes_by_restaurants(
-            input_dishes=output_dishes,
-            restaurants_list=question_object.restaurants
-        )
-        output_dishes = self._filter_dishes_by_licenses(
-            input_dishes=output_dishes,
-            licenses_list=question_object.chef_licenses
-        )
-        output_dishes = self._filter_dishes_by_orders(
-            input_dishes=output_dishes,
-            andromeda_flag=question_object.andromeda_flag,
-            armonisti_flag=question_object.armonisti_flag,
-            naturalisti_flag=question_object.naturalisti_flag
-        )
+    def fast_path_stats(self) -> Dict[str, float]:
+        with self.fast_path_lock:
+            hits, misses = self.fast_path_hits, self.fast_path_misses
 
-        return Answer(dishes_codes=[x.dish.code for x in output_dishes])
+        return {'hits': hits, 'misses': misses, 'hit_rate': hits / (hits + misses) if hits + misses > 0 else 0.0}
+
+    def close(self) -> None:
+        self.llm_executor.shutdown(wait=True)
+
+        return
 
     @staticmethod
     def memorize_answers(answers: Dict[int, Answer]) -> None:
-        with open(Path(__file__).parent.parent / 'data' / 'test_answers.csv', 'w', encoding='utf-8', newline='') as f:
+        answers_path = Path(__file__).parent.parent / 'data' / 'test_answers.csv'
+        tmp_path = answers_path.with_name(answers_path.name + '.tmp')
+        with open(tmp_path, 'w', encoding='utf-8', newline='') as f:
             f.write('row_id,result\n')
-            for k, v in answers.items():
+            for k, v in sorted(answers.items()):
                 f.write(','.join([str(k), f'\"{",".join([str(c) for c in v.dishes_codes])}\"']) + '\n')
+        tmp_path.replace(answers_path)
 
         return
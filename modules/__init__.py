@@ -1,7 +1,22 @@
-from .enums import *
-from .configs import *
-from .parsers import *
-from .agents import *
-from .templates import *
-from .KnowledgeBaseManager import KnowledgeBaseManager
-from .QueryManager import QueryManager
+# internal modules import
+from .LazyPackage import LazyPackage
+
+# exported names, imported from their subpackages only when first accessed
+LazyPackage.install(
+    module_name=__name__,
+    exports={
+        **dict.fromkeys(['Span', 'Tracer', 'tracer'], '.telemetry'),
+        **dict.fromkeys(['Order', 'Planet', 'LicenseName', 'LicenseCode', 'TechniqueCategory', 'TechniqueSubcategory', 'IngredientCategory', 'LogicalOperator', 'EntityType'], '.enums'),
+        **dict.fromkeys(['LBPConfig', 'KBMConfig', 'QMConfig', 'QAConfig', 'LCConfig', 'OCConfig', 'QSConfig'], '.configs'),
+        **dict.fromkeys(['CircuitBreaker', 'CircuitOpenError', 'OllamaClient', 'OllamaClientLLM'], '.clients'),
+        **dict.fromkeys(['LLMBasedParser', 'RuleBasedParser', 'TemplateQuestionParser'], '.parsers'),
+        **dict.fromkeys(['QueryAgent'], '.agents'),
+        **dict.fromkeys(['KBMInfo', 'Restaurant', 'Ingredient', 'IngredientsList', 'Technique', 'TechniquesList', 'QMInfo', 'License', 'LicensesList', 'Chef', 'Dish', 'AugmentedDish', 'BaseQuestion', 'Question', 'QuestionLogics', 'Answer', 'EntityHit', 'PlanStep'], '.templates'),
+        **dict.fromkeys(['BKTree', 'InvertedIndex', 'BitmapIndex', 'ApproximateMatcher', 'EntityMatcher', 'NGramIndex', 'Vocabulary'], '.indexes'),
+        **dict.fromkeys(['QueryPlanner'], '.planners'),
+        **dict.fromkeys(['KBSnapshot', 'LLMCache', 'KBManifest', 'KBMInfoCache', 'AnswersJournal', 'AnswersCache', 'KBStore'], '.storage'),
+        **dict.fromkeys(['QueryRequestHandler', 'QueryService'], '.services'),
+        'KnowledgeBaseManager': '.KnowledgeBaseManager',
+        'QueryManager': '.QueryManager'
+    }
+)
@@ -1,41 +1,83 @@
 # external modules import
-import re
 import json
-from Levenshtein import distance
-from typing import List, Dict, Tuple
-from langchain_ollama.llms import OllamaLLM
-from langchain.prompts import PromptTemplate
-from langchain_core.exceptions import OutputParserException
-from langchain.output_parsers import PydanticOutputParser, RetryWithErrorOutputParser
+import functools
+from pydantic import BaseModel
+from typing import List, Dict, Tuple, TYPE_CHECKING
 
 # internal modules import
-from ..configs import QAConfig
-from ..enums import Planet, LicenseName, LicenseCode, Order
-from ..templates import QuestionLogics, Question, BaseQuestion, IngredientsList, TechniquesList, Restaurant, LicensesList
+from ..configs import QAConfig, OCConfig
+from ..clients import OllamaClient
+from ..storage import LLMCache
+from ..telemetry import tracer
+from ..enums import Planet, LicenseName, LicenseCode, Order, EntityType
+from ..templates import EntityHit, QuestionLogics, Question, BaseQuestion, IngredientsList, TechniquesList, Restaurant, LicensesList
+
+# langchain is only imported by the llm-based capabilities, so that the rule-based ones (and the template fast path)
+# do not pay for it at start-up
+if TYPE_CHECKING:
+    from langchain_core.prompt_values import PromptValue
+    from langchain.output_parsers import PydanticOutputParser, RetryWithErrorOutputParser
+    from ..clients import OllamaClientLLM
 
 
 # class definition
 class QueryAgent:
 
     # constructor
-    def __init__(self, config: QAConfig):
+    def __init__(self, config: QAConfig, llm_cache: LLMCache | None = None, ollama_client: OllamaClient | None = None):
+
+        # initialize ollama client and cache objects, going through the shared ollama client when provided (otherwise a
+        # private one is created, and closed together with the agent), while the llm object is only built by the first
+        # llm call
+        self.owns_ollama_client = ollama_client is None
+        if ollama_client is None:
+            ollama_client = OllamaClient(config=OCConfig(ollama_server_uri=config.ollama_server_uri))
+        self.ollama_client = ollama_client
+        self.ollama_model_name = config.ollama_model_name
+        self.llm_cache = llm_cache
+
+    # context manager methods
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    # properties
+    @functools.cached_property
+    def model(self) -> 'OllamaClientLLM':
+        from ..clients import OllamaClientLLM
 
-        # initialize llm object
-        self.model = OllamaLLM(model=config.ollama_model_name, base_url=config.ollama_server_uri, temperature=0.1)
+        return OllamaClientLLM(client=self.ollama_client, model=self.ollama_model_name, temperature=0.1)
 
     # non-public methods
-    @staticmethod
-    def _fuzzy_substring_match(substring: str, text: str, max_distance: int) -> bool:
-        sub_len = len(substring)
-        for i in range(len(text) - sub_len + 1):
-            if distance(substring, text[i:i + sub_len]) <= max_distance:
-                return True
+    def _query_llm(self, prompt: 'PromptValue', parser: 'PydanticOutputParser', retry_parser: 'RetryWithErrorOutputParser') -> BaseModel:
+        from langchain_core.exceptions import OutputParserException
+
+        if self.llm_cache is not None:
+            if (llm_response := self.llm_cache.lookup(self.model.model, self.model.temperature, prompt.to_string())) is not None:
+                tracer.count('llm.cache_hits', component='agent')
+                return parser.parse(llm_response)
+        llm_response = self.model.invoke(prompt)
+        try:
+            output = parser.parse(llm_response)
+        except OutputParserException:
+            # the retry parser asks the llm to fix the response, and its calls are traced as children of this span
+            tracer.count('agent.parse_retries', output=parser.pydantic_object.__name__)
+            with tracer.span('agent.retry_parse', output=parser.pydantic_object.__name__):
+                output = retry_parser.parse_with_prompt(llm_response, prompt)
+        if self.llm_cache is not None:
+            self.llm_cache.update(self.model.model, self.model.temperature, prompt.to_string(), output.model_dump_json())
 
-        return False
+        return output
 
     # public methods
+    @tracer.traced('agent.build_base_question_object')
     def build_base_question_object(self, question: str, ingredients: IngredientsList, techniques: TechniquesList) -> BaseQuestion:
 
+        from langchain.prompts import PromptTemplate
+        from langchain.output_parsers import PydanticOutputParser, RetryWithErrorOutputParser
+
         # initialize output parser
         parser = PydanticOutputParser(pydantic_object=BaseQuestion)
         retry_parser = RetryWithErrorOutputParser.from_llm(parser=parser, llm=self.model, max_retries=6)
@@ -79,21 +121,23 @@ class QueryAgent:
                 'techniques': techniques.model_dump_json(),
             }
         )
-        llm_response = self.model.invoke(prompt)
-        question_object = retry_parser.parse_with_prompt(llm_response, prompt)
+        question_object = self._query_llm(prompt=prompt, parser=parser, retry_parser=retry_parser)
 
         return question_object
 
-    def find_restaurants(self, question: str, restaurants: List[Restaurant]) -> List[Restaurant]:
-        return [r for r in restaurants if self._fuzzy_substring_match(r.name.lower(), question.lower(), max_distance=3)]
+    @staticmethod
+    def find_restaurants(entities_hits: List[EntityHit], restaurants: List[Restaurant]) -> List[Restaurant]:
+        restaurants_names = {h.name for h in entities_hits if h.entity_type == EntityType.RESTAURANT}
+
+        return [r for r in restaurants if r.name in restaurants_names]
 
     @staticmethod
-    def find_planets(question: str, planets_distances:  Dict[Planet, Dict[Planet, int]]) -> List[Planet]:
-        # TODO (Low): Make this method more robust (planet name extraction, distance extraction and type casting).
+    def find_planets(question: str, entities_hits: List[EntityHit], planets_distances:  Dict[Planet, Dict[Planet, int]]) -> List[Planet]:
+        # TODO (Low): Make this method more robust (distance extraction and type casting).
         target_planet = None
-        question_words = [w.strip('').strip(',').strip('.').lower() for w in question.split(' ')]
+        planets_names = {h.name for h in entities_hits if h.entity_type == EntityType.PLANET}
         for p in planets_distances.keys():
-            if p.value.lower() in question_words:
+            if p.value in planets_names:
                 target_planet = p
                 break
         if not target_planet:
@@ -106,8 +150,13 @@ class QueryAgent:
 
         return planets_list
 
+    @tracer.traced('agent.find_licenses')
     def find_licenses(self, question: str, licenses: List[Tuple[LicenseName, LicenseCode]]) -> LicensesList:
 
+        from langchain.prompts import PromptTemplate
+        from langchain.output_parsers import PydanticOutputParser, RetryWithErrorOutputParser
+        from langchain_core.exceptions import OutputParserException
+
         # initialize output parser
         parser = PydanticOutputParser(pydantic_object=LicensesList)
         retry_parser = RetryWithErrorOutputParser.from_llm(parser=parser, llm=self.model, max_retries=3)
@@ -140,25 +189,28 @@ class QueryAgent:
                 'licenses': json.dumps({l[0].value: l[1].value for l in licenses})
             }
         )
-        llm_response = self.model.invoke(prompt)
         try:
-            licenses_list = retry_parser.parse_with_prompt(llm_response, prompt)
+            licenses_list = self._query_llm(prompt=prompt, parser=parser, retry_parser=retry_parser)
         except OutputParserException:
             licenses_list = LicensesList(items=[])
 
         return licenses_list
 
     @staticmethod
-    def find_orders(question: str) -> Dict[str, bool]:
-        question_words = [re.sub(r"[^a-zA-Z0-9\s]", "", w).strip('\n').strip().lower() for w in question.split(' ')]
+    def find_orders(entities_hits: List[EntityHit]) -> Dict[str, bool]:
+        orders_names = {h.name for h in entities_hits if h.entity_type == EntityType.ORDER}
         return {
-            'andromeda_flag': Order.ANDROMEDA.name.lower() in question_words,
-            'armonisti_flag': Order.ARMONISTI.name.lower() in question_words,
-            'naturalisti_flag': Order.NATURALISTI.name.lower() in question_words
+            'andromeda_flag': Order.ANDROMEDA.name in orders_names,
+            'armonisti_flag': Order.ARMONISTI.name in orders_names,
+            'naturalisti_flag': Order.NATURALISTI.name in orders_names
         }
 
+    @tracer.traced('agent.understand_operators')
     def understand_operators(self, question: str, question_object: Question) -> QuestionLogics:
 
+        from langchain.prompts import PromptTemplate
+        from langchain.output_parsers import PydanticOutputParser, RetryWithErrorOutputParser
+
         # initialize output parser
         parser = PydanticOutputParser(pydantic_object=QuestionLogics)
         retry_parser = RetryWithErrorOutputParser.from_llm(parser=parser, llm=self.model, max_retries=6)
@@ -196,7 +248,12 @@ class QueryAgent:
                 'question_object': question_object.model_dump_json(),
             }
         )
-        llm_response = self.model.invoke(prompt)
-        question_object = retry_parser.parse_with_prompt(llm_response, prompt)
+        question_object = self._query_llm(prompt=prompt, parser=parser, retry_parser=retry_parser)
 
         return question_object
+
+    def close(self) -> None:
+        if self.owns_ollama_client:
+            self.ollama_client.close()
+
+        return
@@ -0,0 +1,52 @@
+# external modules import
+import time
+
+
+# class definition
+class CircuitOpenError(RuntimeError):
+    """
+    This exception is raised when a call is rejected because the circuit breaker is open.
+    """
+
+
+class CircuitBreaker:
+    """
+    This class implements a consecutive-failures circuit breaker. Once the failures reach the given threshold, the
+    circuit opens and calls are rejected until the recovery timeout expires; then a single trial call is let through,
+    which closes the circuit if it succeeds or keeps it open for another recovery timeout if it fails.
+    """
+
+    # constructor
+    def __init__(self, failure_threshold: int, recovery_timeout: float):
+
+        # initialize breaker state
+        self.failure_threshold = failure_threshold
+        self.recovery_timeout = recovery_timeout
+        self.failures = 0
+        self.opened_at: float | None = None
+
+    # public methods
+    def check(self) -> None:
+        if self.opened_at is None:
+            return
+        if time.monotonic() - self.opened_at < self.recovery_timeout:
+            raise CircuitOpenError(f'Circuit open after {self.failures} consecutive failures.')
+        self.opened_at = time.monotonic()
+
+        return
+
+    def record_success(self) -> None:
+        self.failures = 0
+        self.opened_at = None
+
+        return
+
+    def record_failure(self) -> None:
+        self.failures += 1
+        if self.failures >= self.failure_threshold:
+            self.opened_at = time.monotonic()
+
+        return
+
+    def is_open(self) -> bool:
+        return self.opened_at is not None
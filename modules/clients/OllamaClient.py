@@ -0,0 +1,126 @@
+# external modules import
+import httpx
+import random
+import asyncio
+import threading
+from loguru import logger
+from typing import List, Dict, Tuple
+
+# internal modules import
+from ..configs import OCConfig
+from ..telemetry import tracer
+from .CircuitBreaker import CircuitBreaker, CircuitOpenError
+
+
+# class definition
+class OllamaClient:
+    """
+    This class implements a shared client for the Ollama Server, meant to be used by every LLM-based component. Requests
+    run on a private event loop over a pooled asynchronous HTTP connection, with a bounded number of concurrent calls,
+    per-call timeouts and exponential backoff with jitter on transient failures, while a circuit breaker stops hammering
+    the server when it keeps failing. Both blocking and awaitable entry points are provided.
+    """
+
+    # transient response statuses, worth retrying
+    RETRYABLE_STATUSES = {408, 429, 500, 502, 503, 504}
+
+    # constructor
+    def __init__(self, config: OCConfig):
+
+        # initialize retry policy and circuit breaker, which are only ever touched from the event loop thread
+        self.config = config
+        self.circuit_breaker = CircuitBreaker(failure_threshold=config.failure_threshold, recovery_timeout=config.recovery_timeout)
+        self.stats_counters = {'requests': 0, 'retries': 0, 'failures': 0, 'rejections': 0}
+
+        # start private event loop, and create the connection pool and the concurrency limit on it
+        self.loop = asyncio.new_event_loop()
+        self.thread = threading.Thread(target=self.loop.run_forever, name='ollama-client', daemon=True)
+        self.thread.start()
+        self.http_client, self.semaphore = asyncio.run_coroutine_threadsafe(self._initialize(), self.loop).result()
+
+    # context manager methods
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    # non-public methods
+    async def _initialize(self) -> Tuple[httpx.AsyncClient, asyncio.Semaphore]:
+        http_client = httpx.AsyncClient(
+            base_url=self.config.ollama_server_uri,
+            timeout=httpx.Timeout(self.config.request_timeout, connect=self.config.connect_timeout),
+            limits=httpx.Limits(max_connections=self.config.max_connections, max_keepalive_connections=self.config.max_connections)
+        )
+
+        return http_client, asyncio.Semaphore(self.config.max_concurrency)
+
+    def _compute_backoff(self, attempt: int) -> float:
+        # full jitter, so that concurrent callers failing together do not retry together
+        return random.uniform(0, min(self.config.backoff_max, self.config.backoff_base * 2 ** attempt))
+
+    async def _generate(self, model: str, prompt: str, temperature: float | None, stop: List[str] | None) -> str:
+        payload = {'model': model, 'prompt': prompt, 'stream': False, 'options': {}}
+        if temperature is not None:
+            payload['options']['temperature'] = temperature
+        if stop is not None:
+            payload['options']['stop'] = stop
+        attempt = 0
+        while True:
+            try:
+                self.circuit_breaker.check()
+            except CircuitOpenError:
+                self.stats_counters['rejections'] += 1
+                tracer.count('llm.rejections', model=model)
+                raise
+            try:
+                self.stats_counters['requests'] += 1
+                tracer.count('llm.requests', model=model)
+                async with self.semaphore:
+                    response = await self.http_client.post('/api/generate', json=payload)
+                response.raise_for_status()
+                self.circuit_breaker.record_success()
+                response_json = response.json()
+                tracer.count('llm.prompt_tokens', response_json.get('prompt_eval_count', 0), model=model)
+                tracer.count('llm.completion_tokens', response_json.get('eval_count', 0), model=model)
+
+                return response_json['response']
+            except (httpx.TransportError, httpx.HTTPStatusError) as e:
+                if isinstance(e, httpx.HTTPStatusError) and e.response.status_code not in self.RETRYABLE_STATUSES:
+                    raise
+                self.stats_counters['failures'] += 1
+                tracer.count('llm.failures', model=model)
+                self.circuit_breaker.record_failure()
+                if attempt >= self.config.max_retries or self.circuit_breaker.is_open():
+                    raise
+                delay = self._compute_backoff(attempt=attempt)
+                logger.warning(f'Ollama Request Failed ({e!r}), Retrying In {delay:.2f}s.')
+                self.stats_counters['retries'] += 1
+                tracer.count('llm.retries', model=model)
+                attempt += 1
+                await asyncio.sleep(delay)
+
+    async def _close(self) -> None:
+        await self.http_client.aclose()
+
+        return
+
+    # public methods
+    def generate(self, model: str, prompt: str, temperature: float | None = None, stop: List[str] | None = None) -> str:
+        return asyncio.run_coroutine_threadsafe(self._generate(model, prompt, temperature, stop), self.loop).result()
+
+    async def agenerate(self, model: str, prompt: str, temperature: float | None = None, stop: List[str] | None = None) -> str:
+        return await asyncio.wrap_future(asyncio.run_coroutine_threadsafe(self._generate(model, prompt, temperature, stop), self.loop))
+
+    def stats(self) -> Dict[str, int]:
+        return {**self.stats_counters, 'circuit_open': int(self.circuit_breaker.is_open())}
+
+    def close(self) -> None:
+        if self.loop.is_closed():
+            return
+        asyncio.run_coroutine_threadsafe(self._close(), self.loop).result()
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self.thread.join()
+        self.loop.close()
+
+        return
@@ -0,0 +1,40 @@
+# external modules import
+from typing import Any, List, Dict
+from pydantic import ConfigDict
+from langchain_core.language_models.llms import LLM
+from langchain_core.callbacks import CallbackManagerForLLMRun, AsyncCallbackManagerForLLMRun
+
+# internal modules import
+from ..telemetry import tracer
+from .OllamaClient import OllamaClient
+
+
+# class definition
+class OllamaClientLLM(LLM):
+    """
+    This class adapts the shared Ollama client to the LangChain LLM interface, so that prompts, output parsers and retry
+    parsers keep working unchanged while every model call goes through the client.
+    """
+
+    # fields
+    model_config = ConfigDict(arbitrary_types_allowed=True)
+    client: OllamaClient
+    model: str
+    temperature: float | None = None
+
+    # non-public methods
+    @property
+    def _llm_type(self) -> str:
+        return 'ollama-client'
+
+    @property
+    def _identifying_params(self) -> Dict[str, Any]:
+        return {'model': self.model, 'temperature': self.temperature}
+
+    def _call(self, prompt: str, stop: List[str] | None = None, run_manager: CallbackManagerForLLMRun | None = None, **kwargs: Any) -> str:
+        with tracer.span('llm.call', model=self.model):
+            return self.client.generate(model=self.model, prompt=prompt, temperature=self.temperature, stop=stop)
+
+    async def _acall(self, prompt: str, stop: List[str] | None = None, run_manager: AsyncCallbackManagerForLLMRun | None = None, **kwargs: Any) -> str:
+        with tracer.span('llm.call', model=self.model):
+            return await self.client.agenerate(model=self.model, prompt=prompt, temperature=self.temperature, stop=stop)
@@ -0,0 +1,13 @@
+# internal modules import
+from ..LazyPackage import LazyPackage
+
+# exported names, so that the langchain adapter is only imported when used
+LazyPackage.install(
+    module_name=__name__,
+    exports={
+        'CircuitBreaker': '.CircuitBreaker',
+        'CircuitOpenError': '.CircuitBreaker',
+        'OllamaClient': '.OllamaClient',
+        'OllamaClientLLM': '.OllamaClientLLM'
+    }
+)
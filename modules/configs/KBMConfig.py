@@ -10,3 +10,6 @@ class KBMConfig:
     code_path: Path
     dishes_codes_path: Path
     kb_path: Path
+    snapshot_path: Path | None = None
+    manifest_path: Path | None = None
+    info_cache_path: Path | None = None
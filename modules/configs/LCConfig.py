@@ -0,0 +1,11 @@
+# external modules import
+from pathlib import Path
+from dataclasses import dataclass
+
+
+# class definition
+@dataclass
+class LCConfig:
+    cache_path: Path
+    max_size: int = 256 * 1024 * 1024
+    bypass: bool = False
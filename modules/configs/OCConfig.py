@@ -0,0 +1,17 @@
+# external modules import
+from dataclasses import dataclass
+
+
+# class definition
+@dataclass
+class OCConfig:
+    ollama_server_uri: str
+    max_concurrency: int = 4
+    max_connections: int = 8
+    connect_timeout: float = 5.0
+    request_timeout: float = 120.0
+    max_retries: int = 4
+    backoff_base: float = 0.5
+    backoff_max: float = 30.0
+    failure_threshold: int = 5
+    recovery_timeout: float = 30.0
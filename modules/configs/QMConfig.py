@@ -8,3 +8,8 @@ from dataclasses import dataclass
 class QMConfig:
     kb_path: Path
     planet_distances_path: Path
+    snapshot_path: Path | None = None
+    fast_path_threshold: float | None = 1.0
+    candidates_number: int | None = 20
+    max_llm_workers: int = 4
+    answers_cache_size: int | None = 4096
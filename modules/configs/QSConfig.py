@@ -0,0 +1,11 @@
+# external modules import
+from dataclasses import dataclass
+
+
+# class definition
+@dataclass
+class QSConfig:
+    host: str = '127.0.0.1'
+    port: int = 8765
+    max_workers: int = 4
+    poll_interval: float | None = 2.0
@@ -2,3 +2,6 @@ from .LBPConfig import LBPConfig
 from .KBMConfig import KBMConfig
 from .QMConfig import QMConfig
 from .QAConfig import QAConfig
+from .LCConfig import LCConfig
+from .OCConfig import OCConfig
+from .QSConfig import QSConfig
@@ -0,0 +1,11 @@
+# external modules import
+from enum import Enum
+
+
+# enumerate definition
+class EntityType(Enum):
+    RESTAURANT = 'restaurant'
+    PLANET = 'planet'
+    ORDER = 'order'
+    INGREDIENT = 'ingredient'
+    TECHNIQUE = 'technique'
@@ -6,3 +6,4 @@ from .TechniqueCategory import TechniqueCategory
 from .TechniqueSubcategory import TechniqueSubcategory
 from .IngredientCategory import IngredientCategory
 from .LogicalOperator import LogicalOperator
+from .EntityType import EntityType
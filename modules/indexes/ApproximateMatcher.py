@@ -0,0 +1,79 @@
+# external modules import
+import re
+from Levenshtein import distance
+from typing import List, Dict, Tuple
+
+
+# class definition
+class ApproximateMatcher:
+    """
+    This class implements a multi-pattern approximate substring matcher. A pattern matches a text if at least one of
+    the text windows with the same length of the pattern lies within a given Levenshtein distance from it.
+    Every pattern is split into max_distance + 1 pieces, at least one of which must appear unchanged in any matching
+    window (pigeonhole principle): the text is scanned once for all the pieces, and only the windows around each hit are
+    verified with the actual distance, giving the same results of sliding every pattern over the whole text.
+    """
+
+    # constructor
+    def __init__(self, patterns: List[str], max_distance: int):
+
+        # initialize patterns and pieces lookup tables
+        self.patterns = patterns
+        self.max_distance = max_distance
+        self.short_patterns: List[int] = []
+        pieces: Dict[int, Dict[str, List[Tuple[int, int]]]] = {}
+        for pattern_id, pattern in enumerate(patterns):
+            if len(pattern) <= max_distance:
+                self.short_patterns.append(pattern_id)
+                continue
+            for piece_offset, piece in self._split_pattern(pattern=pattern, pieces_number=max_distance + 1):
+                pieces.setdefault(len(piece), {}).setdefault(piece, []).append((pattern_id, piece_offset))
+        self.pieces = pieces
+        self.pieces_regexes = {
+            piece_length: re.compile('(?=(' + '|'.join(re.escape(p) for p in pieces_table) + '))')
+            for piece_length, pieces_table in pieces.items()
+        }
+
+    # non-public methods
+    @staticmethod
+    def _split_pattern(pattern: str, pieces_number: int) -> List[Tuple[int, str]]:
+        pieces, piece_offset = [], 0
+        for piece_number in range(pieces_number):
+            piece_length = len(pattern) // pieces_number + (1 if piece_number < len(pattern) % pieces_number else 0)
+            pieces.append((piece_offset, pattern[piece_offset:piece_offset + piece_length]))
+            piece_offset += piece_length
+
+        return pieces
+
+    # public methods
+    def find(self, text: str) -> List[Tuple[int, int]]:
+
+        # patterns not longer than the maximum distance match any window of the same length
+        matches = {pattern_id: (0, 0) for pattern_id in self.short_patterns if len(self.patterns[pattern_id]) <= len(text)}
+
+        # verify the windows around every piece hit, keeping the closest window of every matching pattern
+        verified_windows = set()
+        for piece_length, pieces_regex in self.pieces_regexes.items():
+            pieces_table = self.pieces[piece_length]
+            for hit in pieces_regex.finditer(text):
+                for pattern_id, piece_offset in pieces_table[hit.group(1)]:
+                    if matches.get(pattern_id, (1, 0))[0] == 0:
+                        continue
+                    pattern = self.patterns[pattern_id]
+                    first_start = max(hit.start() - piece_offset - self.max_distance, 0)
+                    last_start = min(hit.start() - piece_offset + self.max_distance, len(text) - len(pattern))
+                    for window_start in range(first_start, last_start + 1):
+                        if (pattern_id, window_start) in verified_windows:
+                            continue
+                        verified_windows.add((pattern_id, window_start))
+                        window = text[window_start:window_start + len(pattern)]
+                        window_distance = distance(pattern, window, score_cutoff=self.max_distance)
+                        if window_distance <= self.max_distance and window_distance < matches.get(pattern_id, (self.max_distance + 1, 0))[0]:
+                            matches[pattern_id] = (window_distance, window_start)
+                            if window_distance == 0:
+                                break
+
+        return [(pattern_id, window_start) for pattern_id, (_, window_start) in sorted(matches.items())]
+
+    def search(self, text: str) -> List[int]:
+        return [pattern_id for pattern_id, _ in self.find(text=text)]
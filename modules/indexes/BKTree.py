@@ -0,0 +1,48 @@
+# external modules import
+from Levenshtein import distance
+from typing import List, Dict, Tuple, Hashable
+
+
+# class definition
+class BKTree:
+    """
+    This class implements a Burkhard-Keller tree, that retrieves all the words of a vocabulary within a given
+    Levenshtein distance from a query word, without comparing the query against the whole vocabulary.
+    """
+
+    # constructor
+    def __init__(self):
+
+        # initialize tree root and words payloads
+        self.root: Tuple[str, Dict[int, Tuple]] | None = None
+        self.values: Dict[str, List[Tuple[int, Hashable]]] = {}
+        self.size = 0
+
+    # public methods
+    def add(self, word: str, value: Hashable = None) -> None:
+        self.values.setdefault(word, []).append((self.size, word if value is None else value))
+        self.size += 1
+        if len(self.values[word]) > 1:
+            return
+        if self.root is None:
+            self.root = (word, {})
+            return
+        node = self.root
+        while (d := distance(word, node[0])) in node[1]:
+            node = node[1][d]
+        node[1][d] = (word, {})
+
+        return
+
+    def search(self, word: str, max_distance: int) -> List[Hashable]:
+        matches, nodes = [], [self.root] if self.root is not None else []
+        while nodes:
+            node_word, children = nodes.pop()
+            d = distance(word, node_word)
+            if d <= max_distance:
+                matches.extend(self.values[node_word])
+            for child_distance in range(max(d - max_distance, 1), d + max_distance + 1):
+                if child_distance in children:
+                    nodes.append(children[child_distance])
+
+        return [value for _, value in sorted(matches)]
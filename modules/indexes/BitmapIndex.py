@@ -0,0 +1,102 @@
+# external modules import
+from typing import List, Dict, Tuple, Hashable
+
+# internal modules import
+from .InvertedIndex import InvertedIndex
+from ..enums import Planet, LicenseCode, Order
+from ..storage import KBStore
+from ..templates import Restaurant, License
+
+
+# class definition
+class BitmapIndex:
+    """
+    This class implements a bitmap index over the Knowledge Base. Every dish is identified by its row id, and every
+    constraint is resolved to an integer bitmap whose set bits are the rows of the dishes satisfying it.
+    """
+
+    # constructor
+    def __init__(self, knowledge_base: KBStore):
+
+        # initialize rows mapping
+        self.size = len(knowledge_base)
+        self.dishes_codes = knowledge_base.codes.tolist()
+        self.all_dishes = (1 << self.size) - 1
+
+        # initialize indexes
+        self.ingredients = InvertedIndex(size=self.size)
+        self.techniques = InvertedIndex(size=self.size)
+        planets: Dict[Planet, bytearray] = {}
+        restaurants: Dict[Tuple[str, Planet], bytearray] = {}
+        licenses: Dict[Tuple[LicenseCode, int], bytearray] = {}
+        orders: Dict[Order, bytearray] = {}
+
+        # populate indexes, reading the dishes columns directly
+        for row_id in range(self.size):
+            for i in knowledge_base.dish_ingredients(row_id):
+                self.ingredients.add(name=i.name, row_id=row_id)
+            for t in knowledge_base.dish_techniques(row_id):
+                self.techniques.add(name=t.name, row_id=row_id)
+            restaurant = knowledge_base.restaurants[knowledge_base.restaurants_ids[row_id]]
+            self._set_bit(planets, restaurant.planet, row_id)
+            self._set_bit(restaurants, (restaurant.name, restaurant.planet), row_id)
+            for l in knowledge_base.chefs[knowledge_base.chefs_ids[row_id]].licenses.items:
+                self._set_bit(licenses, (l.code, l.level), row_id)
+            for order_id, order in enumerate(Order):
+                if knowledge_base.orders_flags[row_id] >> order_id & 1:
+                    self._set_bit(orders, order, row_id)
+
+        # freeze bitmaps
+        self.planets = {k: int.from_bytes(v, 'little') for k, v in planets.items()}
+        self.restaurants = {k: int.from_bytes(v, 'little') for k, v in restaurants.items()}
+        self.licenses = {k: int.from_bytes(v, 'little') for k, v in licenses.items()}
+        self.orders = {k: int.from_bytes(v, 'little') for k, v in orders.items()}
+
+        # count bitmaps cardinalities, used to estimate constraints selectivities
+        self.planets_cardinalities = {k: v.bit_count() for k, v in self.planets.items()}
+        self.restaurants_cardinalities = {k: v.bit_count() for k, v in self.restaurants.items()}
+        self.licenses_cardinalities = {k: v.bit_count() for k, v in self.licenses.items()}
+        self.orders_cardinalities = {k: v.bit_count() for k, v in self.orders.items()}
+
+    # non-public methods
+    def _set_bit(self, bitmaps: Dict[Hashable, bytearray], key: Hashable, row_id: int) -> None:
+        if key not in bitmaps:
+            bitmaps[key] = bytearray((self.size + 7) // 8)
+        bitmaps[key][row_id >> 3] |= 1 << (row_id & 7)
+
+        return
+
+    # public methods
+    def planets_mask(self, planets: List[Planet]) -> int:
+        bitmap = 0
+        for planet in planets:
+            bitmap |= self.planets.get(planet, 0)
+
+        return bitmap
+
+    def restaurants_mask(self, restaurants: List[Restaurant]) -> int:
+        bitmap = 0
+        for restaurant in restaurants:
+            bitmap |= self.restaurants.get((restaurant.name, restaurant.planet), 0)
+
+        return bitmap
+
+    def license_mask(self, license_: License) -> int:
+        bitmap = 0
+        for (code, level), rows in self.licenses.items():
+            if code == license_.code and level >= license_.level:
+                bitmap |= rows
+
+        return bitmap
+
+    def order_mask(self, order: Order) -> int:
+        return self.orders.get(order, 0)
+
+    def decode(self, bitmap: int) -> List[int]:
+        dishes_codes, bits = [], bin(bitmap)[:1:-1]
+        row_id = bits.find('1')
+        while row_id != -1:
+            dishes_codes.append(self.dishes_codes[row_id])
+            row_id = bits.find('1', row_id + 1)
+
+        return dishes_codes
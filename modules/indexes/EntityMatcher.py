@@ -0,0 +1,105 @@
+# external modules import
+from collections import deque
+from typing import List, Dict, Tuple
+
+# internal modules import
+from ..enums import EntityType
+from ..templates import EntityHit
+from .ApproximateMatcher import ApproximateMatcher
+
+
+# class definition
+class EntityMatcher:
+    """
+    This class implements a compiled matcher that finds the occurrences of all the known entities inside a text.
+    Entity names are matched ignoring case and apostrophe variants: the exact ones are compiled into a single
+    Aho-Corasick automaton, which finds every occurrence in one scan of the text and only accepts those delimited by
+    non-alphanumeric characters, while the entity types that tolerate typos are looked up as substrings with an
+    approximate matcher.
+    """
+
+    # constructor
+    def __init__(self, entities: Dict[EntityType, List[str]], max_distances: Dict[EntityType, int] | None = None):
+
+        # initialize automaton tables, with the root state in position 0
+        self.names: List[Tuple[EntityType, str]] = []
+        self.lengths: List[int] = []
+        self.goto: List[Dict[str, int]] = [{}]
+        self.fail: List[int] = [0]
+        self.outputs: List[List[int]] = [[]]
+
+        # add entities names, splitting exact and approximate ones
+        max_distances = max_distances or {}
+        approximate_names: Dict[int, List[Tuple[EntityType, str]]] = {}
+        for entity_type, names in entities.items():
+            for name in dict.fromkeys(n for n in names if n):
+                if max_distances.get(entity_type, 0) > 0:
+                    approximate_names.setdefault(max_distances[entity_type], []).append((entity_type, name))
+                else:
+                    self._add_name(entity_type=entity_type, name=name)
+        self._build_fail_links()
+
+        # build one approximate matcher for every tolerated distance
+        self.approximate_matchers = [
+            (names, ApproximateMatcher(patterns=[self._normalize(n) for _, n in names], max_distance=max_distance))
+            for max_distance, names in approximate_names.items()
+        ]
+
+    # non-public methods
+    @staticmethod
+    def _normalize(text: str) -> str:
+        return text.lower().replace('’', "'")
+
+    def _add_name(self, entity_type: EntityType, name: str) -> None:
+        state = 0
+        for char in self._normalize(name):
+            if char not in self.goto[state]:
+                self.goto[state][char] = len(self.goto)
+                self.goto.append({})
+                self.fail.append(0)
+                self.outputs.append([])
+            state = self.goto[state][char]
+        self.outputs[state].append(len(self.names))
+        self.names.append((entity_type, name))
+        self.lengths.append(len(self._normalize(name)))
+
+        return
+
+    def _build_fail_links(self) -> None:
+        states_queue = deque(self.goto[0].values())
+        while states_queue:
+            state = states_queue.popleft()
+            for char, next_state in self.goto[state].items():
+                states_queue.append(next_state)
+                fail_state = self.fail[state]
+                while fail_state and char not in self.goto[fail_state]:
+                    fail_state = self.fail[fail_state]
+                self.fail[next_state] = self.goto[fail_state].get(char, 0)
+                self.outputs[next_state] = self.outputs[next_state] + self.outputs[self.fail[next_state]]
+
+        return
+
+    # public methods
+    def search(self, text: str) -> List[EntityHit]:
+        text = self._normalize(text)
+        hits = []
+
+        # scan the text once with the automaton, keeping whole-word occurrences only
+        state = 0
+        for position, char in enumerate(text):
+            while state and char not in self.goto[state]:
+                state = self.fail[state]
+            state = self.goto[state].get(char, 0)
+            for name_id in self.outputs[state]:
+                entity_type, name = self.names[name_id]
+                start, end = position + 1 - self.lengths[name_id], position + 1
+                if (start == 0 or not text[start - 1].isalnum()) and (end == len(text) or not text[end].isalnum()):
+                    hits.append(EntityHit(entity_type=entity_type, name=name, start=start, end=end))
+
+        # look up the approximate entities
+        for names, approximate_matcher in self.approximate_matchers:
+            for name_id, start in approximate_matcher.find(text=text):
+                entity_type, name = names[name_id]
+                hits.append(EntityHit(entity_type=entity_type, name=name, start=start, end=start + len(self._normalize(name))))
+
+        return sorted(hits, key=lambda h: (h.start, h.end))
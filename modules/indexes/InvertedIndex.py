@@ -0,0 +1,81 @@
+# external modules import
+import threading
+from array import array
+from typing import Dict
+from collections import OrderedDict
+from Levenshtein import distance
+
+# internal modules import
+from .BKTree import BKTree
+
+
+# class definition
+class InvertedIndex:
+    """
+    This class implements an inverted index that maps entity names (e.g., ingredients or techniques) to the rows of the
+    dishes containing them. Postings are stored sparsely, as sorted arrays of row ids, and are turned into integer
+    bitmaps only when looked up, keeping the bitmaps of the most recently used names in a bounded cache.
+    """
+
+    # constructor
+    def __init__(self, size: int, masks_cache_bytes: int = 32 * 2 ** 20):
+
+        # initialize postings and names fuzzy index
+        self.size = size
+        self.postings: Dict[str, array] = {}
+        self.names_tree = BKTree()
+        self.entries_number = 0
+
+        # initialize bitmaps cache, from the least to the most recently used name, holding as many bitmaps as the memory
+        # budget allows
+        self.masks_cache_size = max(1, masks_cache_bytes // max(1, (size + 7) // 8))
+        self.masks_lock = threading.Lock()
+        self.masks: OrderedDict[str, int] = OrderedDict()
+
+    # non-public methods
+    def _build_mask(self, name: str) -> int:
+        with self.masks_lock:
+            if (mask := self.masks.get(name)) is not None:
+                self.masks.move_to_end(name)
+                return mask
+
+        # build the bitmap outside the lock, since concurrent builds of the same name produce the same bitmap anyway
+        bitmap = bytearray((self.size + 7) // 8)
+        for row_id in self.postings[name]:
+            bitmap[row_id >> 3] |= 1 << (row_id & 7)
+        mask = int.from_bytes(bitmap, 'little')
+        with self.masks_lock:
+            self.masks[name] = mask
+            while len(self.masks) > self.masks_cache_size:
+                self.masks.popitem(last=False)
+
+        return mask
+
+    # public methods
+    def add(self, name: str, row_id: int) -> None:
+        # rows are added in increasing order, hence a repeated name within the same dish is the last posting
+        if name not in self.postings:
+            self.postings[name] = array('I')
+            self.names_tree.add(word=name.lower(), value=name)
+        elif self.postings[name][-1] == row_id:
+            return
+        self.postings[name].append(row_id)
+        self.entries_number += 1
+
+        return
+
+    def estimate_cardinality(self, name: str) -> int:
+        # unknown names are usually spelling variants of known ones, hence they get the average cardinality
+        if name not in self.postings:
+            return self.entries_number // max(1, len(self.postings))
+
+        return len(self.postings[name])
+
+    def lookup(self, name: str, max_distance: int, ignore_case: bool = True) -> int:
+        bitmap = 0
+        # lowercasing never increases the edit distance, so the fuzzy search is also a safe case-sensitive pre-filter
+        for n in self.names_tree.search(word=name.lower(), max_distance=max_distance):
+            if ignore_case or distance(n, name) <= max_distance:
+                bitmap |= self._build_mask(name=n)
+
+        return bitmap
@@ -0,0 +1,41 @@
+# external modules import
+from typing import List, Dict, Set
+
+
+# class definition
+class NGramIndex:
+    """
+    This class implements a character n-grams inverted index over a list of names, used to retrieve the names that are
+    most likely mentioned in a text. Every name is scored by the fraction of its n-grams that also appear in the text,
+    so that names quoted verbatim get the maximum score, while misspelled or partial mentions still rank high.
+    """
+
+    # constructor
+    def __init__(self, names: List[str], n: int = 3):
+
+        # initialize names n-grams and postings
+        self.n = n
+        self.names = names
+        self.names_sizes: List[int] = []
+        self.postings: Dict[str, List[int]] = {}
+        for name_id, name in enumerate(names):
+            name_ngrams = self._extract_ngrams(text=name)
+            self.names_sizes.append(len(name_ngrams))
+            for ngram in name_ngrams:
+                self.postings.setdefault(ngram, []).append(name_id)
+
+    # non-public methods
+    def _extract_ngrams(self, text: str) -> Set[str]:
+        text = ' ' + text.lower().replace('’', "'") + ' '
+
+        return {text[i:i + self.n] for i in range(len(text) - self.n + 1)}
+
+    # public methods
+    def search(self, text: str, top_k: int) -> List[int]:
+        matches: Dict[int, int] = {}
+        for ngram in self._extract_ngrams(text=text):
+            for name_id in self.postings.get(ngram, []):
+                matches[name_id] = matches.get(name_id, 0) + 1
+        ranking = sorted(matches, key=lambda name_id: (-matches[name_id] / self.names_sizes[name_id], name_id))
+
+        return ranking[:top_k]
@@ -0,0 +1,71 @@
+# external modules import
+from pydantic import BaseModel
+from typing import List, Dict
+
+# internal modules import
+from .BKTree import BKTree
+
+
+# class definition
+class Vocabulary:
+    """
+    This class implements a canonical vocabulary of named entities (e.g., ingredients or techniques). Every distinct
+    name gets an integer id, a single shared entry and an occurrence count, and names that are within a given
+    Levenshtein distance from each other are grouped into clusters of fuzzy variants, represented by the most frequent
+    one.
+    """
+
+    # constructor
+    def __init__(self):
+
+        # initialize entries tables
+        self.entries: List[BaseModel] = []
+        self.ids: Dict[str, int] = {}
+        self.counts: List[int] = []
+        self.clusters: List[int] = []
+
+    # non-public methods
+    @staticmethod
+    def _find_root(parents: List[int], entry_id: int) -> int:
+        while parents[entry_id] != entry_id:
+            parents[entry_id] = parents[parents[entry_id]]
+            entry_id = parents[entry_id]
+
+        return entry_id
+
+    # public methods
+    def add(self, entry: BaseModel, count: int = 1) -> BaseModel:
+        if (entry_id := self.ids.get(entry.name)) is None:
+            entry_id = self.ids[entry.name] = len(self.entries)
+            self.entries.append(entry)
+            self.counts.append(0)
+            self.clusters.append(entry_id)
+        self.counts[entry_id] += count
+
+        return self.entries[entry_id]
+
+    def cluster(self, max_distance: int) -> None:
+
+        # link every name to the names within the maximum distance, ignoring case, which is scaled down for short names
+        # (one edit every 8 characters) so that distinct short names, such as 'Sale' and 'Sake', are not merged
+        names_tree = BKTree()
+        for entry_id, entry in enumerate(self.entries):
+            names_tree.add(word=entry.name.lower(), value=entry_id)
+        parents = list(range(len(self.entries)))
+        for entry_id, entry in enumerate(self.entries):
+            for variant_id in names_tree.search(word=entry.name.lower(), max_distance=min(max_distance, len(entry.name) // 8)):
+                root_id, variant_root_id = self._find_root(parents, entry_id), self._find_root(parents, variant_id)
+                parents[max(root_id, variant_root_id)] = min(root_id, variant_root_id)
+
+        # represent every cluster with its most frequent name
+        representatives: Dict[int, int] = {}
+        for entry_id in range(len(self.entries)):
+            root_id = self._find_root(parents, entry_id)
+            if root_id not in representatives or self.counts[entry_id] > self.counts[representatives[root_id]]:
+                representatives[root_id] = entry_id
+        self.clusters = [representatives[self._find_root(parents, entry_id)] for entry_id in range(len(self.entries))]
+
+        return
+
+    def variants(self, entry_id: int) -> List[int]:
+        return [variant_id for variant_id, cluster_id in enumerate(self.clusters) if cluster_id == self.clusters[entry_id]]
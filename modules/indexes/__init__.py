@@ -0,0 +1,7 @@
+from .BKTree import BKTree
+from .InvertedIndex import InvertedIndex
+from .BitmapIndex import BitmapIndex
+from .ApproximateMatcher import ApproximateMatcher
+from .EntityMatcher import EntityMatcher
+from .NGramIndex import NGramIndex
+from .Vocabulary import Vocabulary
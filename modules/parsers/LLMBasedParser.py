@@ -1,15 +1,20 @@
 # external modules import
 import re
 import time
+import random
 import functools
 from loguru import logger
-from langchain_ollama.llms import OllamaLLM
 from langchain.prompts import PromptTemplate
+from langchain_core.prompt_values import PromptValue
 from langchain.output_parsers import PydanticOutputParser
 from langchain_core.exceptions import OutputParserException
+from langchain_core.output_parsers import BaseOutputParser
 
 # internal modules import
-from ..configs import LBPConfig
+from ..configs import LBPConfig, OCConfig
+from ..clients import OllamaClient, OllamaClientLLM
+from ..storage import LLMCache
+from ..telemetry import tracer
 from ..templates import LicensesList, IngredientsList
 
 
@@ -17,10 +22,23 @@ from ..templates import LicensesList, IngredientsList
 class LLMBasedParser:
 
     # constructor
-    def __init__(self, config: LBPConfig):
+    def __init__(self, config: LBPConfig, llm_cache: LLMCache | None = None, ollama_client: OllamaClient | None = None):
 
-        # initialize llm object
-        self.model = OllamaLLM(model=config.ollama_model_name, base_url=config.ollama_server_uri, temperature=0.1)
+        # initialize llm and cache objects, going through the shared ollama client when provided (otherwise a private
+        # one is created, and closed together with the parser)
+        self.owns_ollama_client = ollama_client is None
+        if ollama_client is None:
+            ollama_client = OllamaClient(config=OCConfig(ollama_server_uri=config.ollama_server_uri))
+        self.ollama_client = ollama_client
+        self.model = OllamaClientLLM(client=ollama_client, model=config.ollama_model_name, temperature=0.1)
+        self.llm_cache = llm_cache
+
+    # context manager methods
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
 
     # decorators
     @staticmethod
@@ -33,13 +51,15 @@ class LLMBasedParser:
                 attempts = 0
                 while True:
                     try:
-                        return func(self, *args, **kwargs)
+                        with tracer.span(f'parser.{func.__name__}', attempt=attempts):
+                            return func(self, *args, **kwargs)
                     except OutputParserException as e:
                         logger.warning(f'{func.__name__} Execution Failed.')
                         attempts += 1
                         if attempts < max_retries_:
                             logger.warning(f'Retrying {func.__name__} Execution.')
-                            time.sleep(delay_)
+                            tracer.count('parser.retries', method=func.__name__)
+                            time.sleep(random.uniform(0, delay_ * 2 ** (attempts - 1)))
                         else:
                             logger.warning(f'Giving Up {func.__name__} Execution.')
                             raise e
@@ -48,6 +68,19 @@ class LLMBasedParser:
 
         return decorator
 
+    # non-public methods
+    def _query_llm(self, prompt: PromptValue, parser: BaseOutputParser | None = None):
+        if self.llm_cache is not None:
+            if (llm_response := self.llm_cache.lookup(self.model.model, self.model.temperature, prompt.to_string())) is not None:
+                tracer.count('llm.cache_hits', component='parser')
+                return parser.parse(llm_response) if parser is not None else llm_response
+        llm_response = self.model.invoke(prompt)
+        output = parser.parse(llm_response) if parser is not None else llm_response
+        if self.llm_cache is not None:
+            self.llm_cache.update(self.model.model, self.model.temperature, prompt.to_string(), llm_response)
+
+        return output
+
     # public methods
     @retry_on_exception(max_retries=5, delay=1)
     def extract_chef_name(self, input_text: str) -> str:
@@ -65,10 +98,12 @@ class LLMBasedParser:
         )
 
         # query llm
-        llm_response = (prompt | self.model).invoke(
-            {
-                'input_text': input_text
-            }
+        llm_response = self._query_llm(
+            prompt=prompt.invoke(
+                {
+                    'input_text': input_text
+                }
+            )
         )
 
         # response cleaning
@@ -107,11 +142,14 @@ class LLMBasedParser:
         )
 
         # query llm
-        licenses_list = (prompt | self.model | parser).invoke(
-            {
-                'input_text': input_text,
-                'additional_info': additional_info
-            }
+        licenses_list = self._query_llm(
+            prompt=prompt.invoke(
+                {
+                    'input_text': input_text,
+                    'additional_info': additional_info
+                }
+            ),
+            parser=parser
         )
 
         return licenses_list
@@ -143,10 +181,13 @@ class LLMBasedParser:
         )
 
         # query llm
-        licenses_list = (prompt | self.model | parser).invoke(
-            {
-                'input_text': input_text,
-            }
+        licenses_list = self._query_llm(
+            prompt=prompt.invoke(
+                {
+                    'input_text': input_text,
+                }
+            ),
+            parser=parser
         )
 
         return licenses_list
@@ -175,10 +216,19 @@ class LLMBasedParser:
         )
 
         # query llm
-        ingredients_list = (prompt | self.model | parser).invoke(
-            {
-                'input_text': input_text
-            }
+        ingredients_list = self._query_llm(
+            prompt=prompt.invoke(
+                {
+                    'input_text': input_text
+                }
+            ),
+            parser=parser
         )
 
         return ingredients_list
+
+    def close(self) -> None:
+        if self.owns_ollama_client:
+            self.ollama_client.close()
+
+        return
@@ -1,9 +1,11 @@
 # external modules import
 import re
+import functools
 from Levenshtein import distance
 from typing import List, Dict, Tuple
 
 # internal modules import
+from ..indexes import BKTree, ApproximateMatcher
 from ..enums import Planet, TechniqueCategory, TechniqueSubcategory
 from ..templates import Ingredient, IngredientsList, Technique, TechniquesList
 
@@ -13,13 +15,18 @@ class RuleBasedParser:
 
     # non-public methods
     @staticmethod
-    def _fuzzy_substring_match(substring: str, text: str, max_distance: int) -> bool:
-        sub_len = len(substring)
-        for i in range(len(text) - sub_len + 1):
-            if distance(substring, text[i:i + sub_len]) <= max_distance:
-                return True
+    @functools.lru_cache(maxsize=8)
+    def _build_techniques_tree(techniques_names: Tuple[str, ...]) -> BKTree:
+        techniques_tree = BKTree()
+        for tn in techniques_names:
+            techniques_tree.add(word=tn.lower(), value=tn)
 
-        return False
+        return techniques_tree
+
+    @staticmethod
+    @functools.lru_cache(maxsize=8)
+    def _build_techniques_matcher(techniques_names: Tuple[str, ...]) -> ApproximateMatcher:
+        return ApproximateMatcher(patterns=[tn.lower() for tn in techniques_names], max_distance=4)
 
     # public methods
     @staticmethod
@@ -50,21 +57,22 @@ class RuleBasedParser:
 
         return IngredientsList(items=[Ingredient(name=x) for x in ingredients_list])
 
-    @staticmethod
-    def extract_dish_techniques_v1(input_text: List[str], additional_info: Dict[str, Tuple[str, str]]) -> TechniquesList:
+    @classmethod
+    def extract_dish_techniques_v1(cls, input_text: List[str], additional_info: Dict[str, Tuple[str, str]]) -> TechniquesList:
         techniques_list, start_flag = [], False
+        techniques_tree = cls._build_techniques_tree(techniques_names=tuple(additional_info.keys()))
         for line in input_text:
             if start_flag:
                 technique_name = re.sub(r'[\r\n]+', '', line).strip().lower()
-                for tn, tc in additional_info.items():
-                    if distance(technique_name, tn.lower()) <= 2:
-                        techniques_list.append(
-                            Technique(
-                                name=tn,
-                                category=TechniqueCategory(tc[0]),
-                                subcategory=TechniqueSubcategory(tc[1])
-                            )
+                for tn in techniques_tree.search(word=technique_name, max_distance=2):
+                    tc = additional_info[tn]
+                    techniques_list.append(
+                        Technique(
+                            name=tn,
+                            category=TechniqueCategory(tc[0]),
+                            subcategory=TechniqueSubcategory(tc[1])
                         )
+                    )
             if distance(line.lower(), 'tecniche') <= 1 or distance(line.lower(), 'techniques') <= 1:
                 start_flag = True
 
@@ -74,14 +82,16 @@ class RuleBasedParser:
     def extract_dish_techniques_v2(cls, input_text: List[str], additional_info: Dict[str, Tuple[str, str]]) -> TechniquesList:
         techniques_list = []
         input_str = '\n'.join(input_text).lower()
-        for tn, tc in additional_info.items():
-            if cls._fuzzy_substring_match(substring=tn.lower(), text=input_str, max_distance=4):
-                techniques_list.append(
-                    Technique(
-                        name=tn,
-                        category=TechniqueCategory(tc[0]),
-                        subcategory=TechniqueSubcategory(tc[1])
-                    )
+        techniques_names = tuple(additional_info.keys())
+        techniques_matcher = cls._build_techniques_matcher(techniques_names=techniques_names)
+        for technique_id in techniques_matcher.search(text=input_str):
+            tc = additional_info[(tn := techniques_names[technique_id])]
+            techniques_list.append(
+                Technique(
+                    name=tn,
+                    category=TechniqueCategory(tc[0]),
+                    subcategory=TechniqueSubcategory(tc[1])
                 )
+            )
 
         return TechniquesList(items=techniques_list)
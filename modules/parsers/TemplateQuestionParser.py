@@ -0,0 +1,193 @@
+# external modules import
+import re
+from typing import List, Dict, Tuple
+
+# internal modules import
+from ..enums import EntityType, LicenseName, LicenseCode, LogicalOperator
+from ..templates import EntityHit, BaseQuestion, Ingredient, Technique, TechniquesList, License, QuestionLogics
+
+
+# class definition
+class TemplateQuestionParser:
+    """
+    This class implements a deterministic question parser for template-like questions. Ingredients and techniques are
+    taken from the entities found in the question, and their polarity and logical operators are derived from the words
+    that surround them. Every parse comes with a confidence score, that drops whenever the question contains constructs
+    the parser does not understand, so that it can be handed over to the LLM-based agent.
+    """
+
+    # words that make the following entities disallowed, until a new clause begins
+    NEGATION_REGEX = re.compile(r'\b(?:non|senza|evit\w*|esclud\w*|tranne|eccetto)\b')
+
+    # words that begin a new clause: a "ma", or a comma not followed by another entity of the same list
+    CLAUSE_REGEX = re.compile(r'\bma\b|,')
+    ARTICLE_REGEX = re.compile(r"\s*(?:(?:il|lo|la|i|gli|le|e|o)\s+|l['’]\s*)?")
+
+    # connectors between entities and mentions of techniques groups
+    DISJUNCTION_REGEX = re.compile(r'\b(?:o|oppure)\b')
+    TECHNIQUE_MENTION_REGEX = re.compile(r"\btecnic[ahe]+\b(?:\s+(?:di|del|della|dello|dell'|dell’|delle|dei))?\s*")
+    QUANTIFIER_REGEX = re.compile(r'\balmeno\s+\d+\s+ingredient')
+
+    # licenses requirements, with the minimum level as a function of the matched one
+    LICENSE_REGEXES = [
+        (re.compile(
+            r'licenz[ae]\s+(?P<license>[^\s,?]+)\s+(?:(?:di|con\s+un)\s+)?(?:almeno\s+)?grado\s+(?:minimo\s+di\s+)?'
+            r'(?P<level>\d+)(?:\s+o\s+superiore)?', re.IGNORECASE
+        ), 0),
+        (re.compile(r'licenz[ae]\s+(?P<license>[^\s,?]+)\s+superiore\s+a\s+(?P<level>\d+)', re.IGNORECASE), 1),
+        (re.compile(r'licenz[ae]\s+(?P<license>[^\s,?]+)\s+(?P<level>non)\s+base', re.IGNORECASE), 1)
+    ]
+    LICENSE_MENTION_REGEX = re.compile(r'\blicenz[ae]\b', re.IGNORECASE)
+
+    # words that do not refer to any entity nor constraint, i.e., italian stopwords and the vocabulary of the templates
+    WORD_REGEX = re.compile(r'[^\W\d_]+')
+    NEUTRAL_WORDS = frozenset({
+        # articles, prepositions, pronouns and conjunctions
+        'a', 'ad', 'al', 'all', 'alla', 'allo', 'ai', 'agli', 'alle', 'da', 'dal', 'dall', 'dallo', 'dalla', 'dai',
+        'dagli', 'dalle', 'di', 'd', 'del', 'dell', 'dello', 'della', 'dei', 'degli', 'delle', 'in', 'nel', 'nell',
+        'nello', 'nella', 'nei', 'negli', 'nelle', 'su', 'sul', 'sull', 'sullo', 'sulla', 'sui', 'sugli', 'sulle',
+        'con', 'col', 'coi', 'per', 'tra', 'fra', 'il', 'lo', 'la', 'l', 'i', 'gli', 'le', 'un', 'uno', 'una',
+        'e', 'ed', 'o', 'oppure', 'ma', 'però', 'sia', 'né', 'anche', 'che', 'chi', 'cui', 'come', 'quale', 'quali',
+        'quanto', 'quanti', 'dove', 'quando', 'se', 'si', 'ci', 'vi', 'ne', 'mi', 'ti', 'li', 'loro', 'io', 'tu',
+        'lui', 'lei', 'noi', 'voi', 'esso', 'essi', 'questo', 'questa', 'questi', 'queste', 'quest', 'quello',
+        'quella', 'quelli', 'quelle', 'quei', 'quegli', 'quell', 'non', 'senza', 'almeno', 'entro',
+        # auxiliary and modal verbs
+        'è', 'sono', 'essere', 'stato', 'stata', 'stati', 'state', 'viene', 'vengono', 'venire', 'ha', 'hanno',
+        'avere', 'può', 'possono', 'posso', 'possiamo', 'puoi', 'potete', 'devo', 'deve', 'devono', 'dovrei',
+        # verbs of the template questions
+        'include', 'includono', 'includa', 'includano', 'incluso', 'inclusi', 'contiene', 'contengono', 'contenga',
+        'contengano', 'utilizza', 'utilizzano', 'utilizzando', 'utilizzare', 'utilizzati', 'usa', 'usano', 'usando',
+        'usare', 'usati', 'uso', 'impiega', 'impiegano', 'impiegando', 'impiegare', 'preparato', 'preparati',
+        'preparare', 'preparazione', 'cucinato', 'cucinati', 'creato', 'creati', 'servito', 'serviti', 'servono',
+        'disponibili', 'richiede', 'richiedono', 'necessita', 'necessitano', 'adatti', 'evita', 'evitano', 'evitando',
+        'escludono', 'escludendo', 'eccetto', 'tranne',
+        # nouns of the template questions, the entities they introduce being matched on their own
+        'piatto', 'piatti', 'ingrediente', 'ingredienti', 'tecnica', 'tecniche', 'ristorante', 'ristoranti', 'chef',
+        'pianeta', 'pianeti', 'galassia', 'ordine', 'anni', 'luce', 'distanza'
+    })
+
+    # constructor
+    def __init__(self, techniques: TechniquesList):
+
+        # initialize techniques lookup table
+        self.techniques: Dict[str, Technique] = {}
+        for t in techniques.items:
+            self.techniques.setdefault(t.name, t)
+
+    # non-public methods
+    @staticmethod
+    def _select_hits(entities_hits: List[EntityHit]) -> List[EntityHit] | None:
+        # ingredients and techniques contained in longer ones are dropped, while partially overlapping ones are ambiguous
+        selected_hits = []
+        for h in sorted(entities_hits, key=lambda x: (x.start, -x.end)):
+            if h.entity_type not in [EntityType.INGREDIENT, EntityType.TECHNIQUE]:
+                continue
+            if selected_hits and h.start < selected_hits[-1].end:
+                if h.end <= selected_hits[-1].end and (h.start, h.end) != (selected_hits[-1].start, selected_hits[-1].end):
+                    continue
+                return None
+            selected_hits.append(h)
+
+        return selected_hits
+
+    @classmethod
+    def _parse_licenses(cls, question: str) -> Tuple[List[License], List[Tuple[int, int]]] | None:
+        licenses, spans = [], []
+        for license_regex, level_offset in cls.LICENSE_REGEXES:
+            for match in license_regex.finditer(question):
+                license_name = None
+                for ln in LicenseName:
+                    if match.group('license').lower() in [LicenseCode[ln.name].value.lower(), ln.value.lower()]:
+                        license_name = ln
+                        break
+                if license_name is None:
+                    return None
+                level = 0 if match.group('level').lower() == 'non' else int(match.group('level'))
+                licenses.append(License(name=license_name, code=LicenseCode[license_name.name], level=level + level_offset))
+                spans.append(match.span())
+        if len(licenses) != len(cls.LICENSE_MENTION_REGEX.findall(question)):
+            return None
+
+        return licenses, spans
+
+    @classmethod
+    def _find_negations(cls, question: str, selected_hits: List[EntityHit]) -> List[Tuple[int, bool]]:
+        hits_starts = {h.start for h in selected_hits}
+        events = [(m.start(), True) for m in cls.NEGATION_REGEX.finditer(question)]
+        for match in cls.CLAUSE_REGEX.finditer(question):
+            if match.group() == ',' and cls.ARTICLE_REGEX.match(question, match.end()).end() in hits_starts:
+                continue
+            events.append((match.start(), False))
+
+        return sorted(events)
+
+    @classmethod
+    def _compute_confidence(cls, question: str, covered_spans: List[Tuple[int, int]]) -> float:
+        words = [m for m in cls.WORD_REGEX.finditer(question) if m.group() not in cls.NEUTRAL_WORDS]
+        if not words:
+            return 1.0
+        covered_words = [m for m in words if any(s <= m.start() and m.end() <= e for s, e in covered_spans)]
+
+        return len(covered_words) / len(words)
+
+    # public methods
+    def parse(self, question: str, entities_hits: List[EntityHit]) -> Tuple[BaseQuestion, List[License], QuestionLogics, float]:
+        lowered_question = question.lower()
+        empty_output = BaseQuestion(), [], QuestionLogics(), 0.0
+
+        # reject questions with unsupported constructs, as well as those whose lowering moves the entities offsets
+        if len(lowered_question) != len(question):
+            return empty_output
+        if len(entities_hits) == 0 or self.QUANTIFIER_REGEX.search(lowered_question):
+            return empty_output
+        selected_hits = self._select_hits(entities_hits=entities_hits)
+        licenses_output = self._parse_licenses(question=question)
+        if selected_hits is None or licenses_output is None or len(licenses_output[0]) > 1:
+            return empty_output
+        licenses, licenses_spans = licenses_output
+        hits_starts = {h.start for h in selected_hits if h.entity_type == EntityType.TECHNIQUE}
+        for match in self.TECHNIQUE_MENTION_REGEX.finditer(lowered_question):
+            if self.ARTICLE_REGEX.match(lowered_question, match.end()).end() not in hits_starts:
+                return empty_output
+
+        # split ingredients and techniques between desired and disallowed, ignoring words inside licenses requirements
+        masked_question = lowered_question
+        for s, e in licenses_spans:
+            masked_question = masked_question[:s] + ' ' * (e - s) + masked_question[e:]
+        events, event_id, negation_flag = self._find_negations(question=masked_question, selected_hits=selected_hits), 0, False
+        desired_hits, disallowed_hits = [], []
+        for h in selected_hits:
+            while event_id < len(events) and events[event_id][0] < h.start:
+                negation_flag = events[event_id][1]
+                event_id += 1
+            (disallowed_hits if negation_flag else desired_hits).append(h)
+
+        # derive the logical operators connecting the desired entities
+        operators: Dict[EntityType, set] = {EntityType.INGREDIENT: set(), EntityType.TECHNIQUE: set()}
+        for previous_hit, next_hit in zip(desired_hits, desired_hits[1:]):
+            disjunction_flag = self.DISJUNCTION_REGEX.search(lowered_question, previous_hit.end, next_hit.start) is not None
+            if previous_hit.entity_type != next_hit.entity_type:
+                if disjunction_flag:
+                    return empty_output
+                continue
+            operators[previous_hit.entity_type].add(LogicalOperator.OR if disjunction_flag else LogicalOperator.AND)
+        if any(len(o) > 1 for o in operators.values()):
+            return empty_output
+
+        # build output objects
+        base_question = BaseQuestion(
+            desired_ingredients=[Ingredient(name=h.name) for h in desired_hits if h.entity_type == EntityType.INGREDIENT],
+            disallowed_ingredients=[Ingredient(name=h.name) for h in disallowed_hits if h.entity_type == EntityType.INGREDIENT],
+            desired_techniques=[self.techniques[h.name] for h in desired_hits if h.entity_type == EntityType.TECHNIQUE],
+            disallowed_techniques=[self.techniques[h.name] for h in disallowed_hits if h.entity_type == EntityType.TECHNIQUE]
+        )
+        question_logics = QuestionLogics(
+            desired_ingredients_lo=next(iter(operators[EntityType.INGREDIENT]), None),
+            desired_techniques_lo=next(iter(operators[EntityType.TECHNIQUE]), None)
+        )
+        confidence = self._compute_confidence(
+            question=lowered_question,
+            covered_spans=[(h.start, h.end) for h in entities_hits] + licenses_spans
+        )
+
+        return base_question, licenses, question_logics, confidence
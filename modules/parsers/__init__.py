@@ -1,2 +1,12 @@
-from .LLMBasedParser import LLMBasedParser
-from .RuleBasedParser import RuleBasedParser
+# internal modules import
+from ..LazyPackage import LazyPackage
+
+# exported names, so that the rule-based and template-based parsers do not import the llm stack
+LazyPackage.install(
+    module_name=__name__,
+    exports={
+        'LLMBasedParser': '.LLMBasedParser',
+        'RuleBasedParser': '.RuleBasedParser',
+        'TemplateQuestionParser': '.TemplateQuestionParser'
+    }
+)
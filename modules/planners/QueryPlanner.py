@@ -0,0 +1,226 @@
+# external modules import
+import math
+import time
+from enum import Enum
+from typing import List, Any
+
+# internal modules import
+from ..indexes import BitmapIndex, InvertedIndex
+from ..telemetry import tracer
+from ..enums import LogicalOperator, Order
+from ..templates import Question, QuestionLogics, License, PlanStep
+
+
+# class definition
+class QueryPlanner:
+    """
+    This class plans and executes the constraints of a question over the bitmap index. Every constraint is turned into
+    one or more steps, whose cardinality is estimated from the index statistics and whose cost depends on the kind of
+    lookup: exact masks are fetched from a dictionary, while names are matched through fuzzy searches that grow with
+    the vocabulary size. Steps are executed by increasing cost per discarded dish, and the execution stops as soon as
+    no dish is left.
+    """
+
+    # relative costs of combining a precomputed bitmap and of a names comparison during fuzzy searches, the latter being
+    # roughly proportional to the square root of the vocabulary size when searching within a distance of 2
+    BITMAP_COST = 1.0
+    LICENSE_KEY_COST = 0.125
+    FUZZY_SEARCH_COST = 5.0
+
+    # constructor
+    def __init__(self, dishes_index: BitmapIndex):
+
+        # initialize index object
+        self.dishes_index = dishes_index
+
+    # non-public methods
+    def _fuzzy_cost(self, index: InvertedIndex, items_number: int) -> float:
+        return items_number * (self.BITMAP_COST + self.FUZZY_SEARCH_COST * math.sqrt(len(index.postings)))
+
+    def _plan_names(self, constraint: str, index: InvertedIndex, items: List, logical_operator: LogicalOperator | None, negated: bool) -> List[PlanStep]:
+        if len(items) == 0:
+            return []
+
+        # conjunctions and negations are split into a step per name, so that the most selective ones can run first
+        if negated or logical_operator == LogicalOperator.AND:
+            steps = []
+            for item in items:
+                cardinality = index.estimate_cardinality(name=item.name)
+                steps.append(
+                    PlanStep(
+                        constraint=constraint,
+                        items=[item],
+                        negated=negated,
+                        estimated_cardinality=self.dishes_index.size - cardinality if negated else cardinality,
+                        estimated_cost=self._fuzzy_cost(index=index, items_number=1)
+                    )
+                )
+
+            return steps
+
+        return [
+            PlanStep(
+                constraint=constraint,
+                items=items,
+                logical_operator=LogicalOperator.OR,
+                estimated_cardinality=min(self.dishes_index.size, sum(index.estimate_cardinality(name=i.name) for i in items)),
+                estimated_cost=self._fuzzy_cost(index=index, items_number=len(items))
+            )
+        ]
+
+    def _compute_mask(self, step: PlanStep) -> int:
+        if step.constraint in ('desired_ingredients', 'disallowed_ingredients', 'desired_techniques', 'disallowed_techniques'):
+            index = self.dishes_index.ingredients if step.constraint.endswith('ingredients') else self.dishes_index.techniques
+            # disallowed techniques are the only names matched case-sensitively
+            ignore_case = step.constraint != 'disallowed_techniques'
+            mask = 0
+            for item in step.items:
+                mask |= index.lookup(name=item.name, max_distance=2, ignore_case=ignore_case)
+
+            return self.dishes_index.all_dishes & ~mask if step.negated else mask
+        if step.constraint == 'planets':
+            return self.dishes_index.planets_mask(planets=step.items)
+        if step.constraint == 'restaurants':
+            return self.dishes_index.restaurants_mask(restaurants=step.items)
+        if step.constraint == 'licenses':
+            return self.dishes_index.license_mask(license_=step.items[0])
+        if step.constraint == 'orders':
+            mask = 0
+            for order in step.items:
+                mask |= self.dishes_index.order_mask(order=order)
+
+            return mask
+        raise ValueError(f'Unknown constraint: {step.constraint}')
+
+    @staticmethod
+    def _describe_item(item: Any) -> str:
+        if isinstance(item, License):
+            return f'{item.code.value} >= {item.level}'
+        if isinstance(item, Order):
+            return item.name.title()
+        if isinstance(item, Enum):
+            return str(item.value)
+
+        return item.name
+
+    # public methods
+    @staticmethod
+    def canonicalize(question_object: Question, question_logics: QuestionLogics) -> List:
+        # only what the steps depend on is kept: names are matched case-insensitively (but disallowed techniques), items
+        # order and duplicates do not matter, and logical operators only matter when combining more than one name
+        def names(items: List, ignore_case: bool = True) -> List[str]:
+            return sorted({i.name.lower() if ignore_case else i.name for i in items})
+
+        def operator(items: List[str], logical_operator: LogicalOperator | None) -> str:
+            return LogicalOperator.AND.value if logical_operator == LogicalOperator.AND and len(items) > 1 else LogicalOperator.OR.value
+
+        # licenses of the same code are combined in conjunction, hence only the highest required level matters
+        licenses_levels = {}
+        for license_ in question_object.chef_licenses:
+            licenses_levels[license_.code.value] = max(licenses_levels.get(license_.code.value, license_.level), license_.level)
+
+        return [
+            (desired_ingredients := names(question_object.desired_ingredients)),
+            operator(desired_ingredients, question_logics.desired_ingredients_lo),
+            names(question_object.disallowed_ingredients),
+            (desired_techniques := names(question_object.desired_techniques)),
+            operator(desired_techniques, question_logics.desired_techniques_lo),
+            names(question_object.disallowed_techniques, ignore_case=False),
+            sorted({p.value for p in question_object.planets}),
+            sorted({(r.name, r.planet.value) for r in question_object.restaurants}),
+            sorted(licenses_levels.items()),
+            [question_object.andromeda_flag, question_object.armonisti_flag, question_object.naturalisti_flag]
+        ]
+
+    def plan(self, question_object: Question, question_logics: QuestionLogics) -> List[PlanStep]:
+        steps = []
+
+        # ingredients and techniques constraints, resolved through fuzzy searches
+        steps += self._plan_names('desired_ingredients', self.dishes_index.ingredients, question_object.desired_ingredients, question_logics.desired_ingredients_lo, False)
+        steps += self._plan_names('disallowed_ingredients', self.dishes_index.ingredients, question_object.disallowed_ingredients, None, True)
+        steps += self._plan_names('desired_techniques', self.dishes_index.techniques, question_object.desired_techniques, question_logics.desired_techniques_lo, False)
+        steps += self._plan_names('disallowed_techniques', self.dishes_index.techniques, question_object.disallowed_techniques, None, True)
+
+        # planets, restaurants and orders constraints, resolved through exact masks
+        if len(question_object.planets) > 0:
+            steps.append(
+                PlanStep(
+                    constraint='planets',
+                    items=question_object.planets,
+                    logical_operator=LogicalOperator.OR,
+                    estimated_cardinality=sum(self.dishes_index.planets_cardinalities.get(p, 0) for p in question_object.planets),
+                    estimated_cost=self.BITMAP_COST * len(question_object.planets)
+                )
+            )
+        if len(question_object.restaurants) > 0:
+            steps.append(
+                PlanStep(
+                    constraint='restaurants',
+                    items=question_object.restaurants,
+                    logical_operator=LogicalOperator.OR,
+                    estimated_cardinality=sum(self.dishes_index.restaurants_cardinalities.get((r.name, r.planet), 0) for r in question_object.restaurants),
+                    estimated_cost=self.BITMAP_COST * len(question_object.restaurants)
+                )
+            )
+        orders = [o for o, f in zip([Order.ANDROMEDA, Order.ARMONISTI, Order.NATURALISTI], [question_object.andromeda_flag, question_object.armonisti_flag, question_object.naturalisti_flag]) if f]
+        if len(orders) > 0:
+            steps.append(
+                PlanStep(
+                    constraint='orders',
+                    items=orders,
+                    logical_operator=LogicalOperator.OR,
+                    estimated_cardinality=min(self.dishes_index.size, sum(self.dishes_index.orders_cardinalities.get(o, 0) for o in orders)),
+                    estimated_cost=self.BITMAP_COST * len(orders)
+                )
+            )
+
+        # licenses constraints, resolved by combining the masks of every sufficient level
+        for license_ in question_object.chef_licenses:
+            matching_keys = [k for k in self.dishes_index.licenses_cardinalities if k[0] == license_.code and k[1] >= license_.level]
+            steps.append(
+                PlanStep(
+                    constraint='licenses',
+                    items=[license_],
+                    estimated_cardinality=min(self.dishes_index.size, sum(self.dishes_index.licenses_cardinalities[k] for k in matching_keys)),
+                    estimated_cost=self.LICENSE_KEY_COST * len(self.dishes_index.licenses) + self.BITMAP_COST * len(matching_keys)
+                )
+            )
+
+        # order steps by rank, i.e., the cost paid for every discarded dish, so that cheap and selective steps run first
+        def rank(step: PlanStep) -> float:
+            discarded_fraction = 1 - step.estimated_cardinality / max(1, self.dishes_index.size)
+            return step.estimated_cost / discarded_fraction if discarded_fraction > 0 else math.inf
+
+        return sorted(steps, key=rank)
+
+    def execute(self, plan: List[PlanStep], collect_stats: bool = False) -> int:
+        # statistics are only collected on demand, since counting bits is linear in the knowledge base size
+        collect_stats = collect_stats or tracer.enabled
+        output_dishes = self.dishes_index.all_dishes
+        for step in plan:
+            if output_dishes == 0:
+                step.skipped = True
+                tracer.count('query.skipped_steps', constraint=step.constraint)
+                continue
+            start_time = time.perf_counter() if collect_stats else 0.0
+            output_dishes &= self._compute_mask(step=step)
+            if collect_stats:
+                step.elapsed_ms = 1000 * (time.perf_counter() - start_time)
+                step.cardinality = output_dishes.bit_count()
+                tracer.observe('query.filter_cardinality', step.cardinality, filter=step.constraint)
+
+        return output_dishes
+
+    @classmethod
+    def explain(cls, plan: List[PlanStep]) -> str:
+        lines = [f"{'#':>2}  {'constraint':<24}{'items':<48}{'est. dishes':>12}{'est. cost':>11}{'dishes':>9}{'time ms':>10}"]
+        for step_number, step in enumerate(plan, start=1):
+            items = ('not ' if step.negated else '') + f' {step.logical_operator.value} '.join(cls._describe_item(i) for i in step.items)
+            items = items if len(items) <= 46 else items[:43] + '...'
+            observed = ('skipped', '') if step.skipped else (
+                str(step.cardinality) if step.cardinality is not None else '-',
+                f'{step.elapsed_ms:.3f}' if step.elapsed_ms is not None else '-'
+            )
+            lines.append(f'{step_number:>2}  {step.constraint:<24}{items:<48}{step.estimated_cardinality:>12}{step.estimated_cost:>11.1f}{observed[0]:>9}{observed[1]:>10}')
+
+        return '\n'.join(lines)
@@ -0,0 +1 @@
+from .QueryPlanner import QueryPlanner
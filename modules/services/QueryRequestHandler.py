@@ -0,0 +1,91 @@
+# external modules import
+import json
+from loguru import logger
+from typing import Dict, Any
+from http.server import BaseHTTPRequestHandler
+
+# internal modules import
+from ..telemetry import tracer
+
+
+# class definition
+class QueryRequestHandler(BaseHTTPRequestHandler):
+    """
+    This class handles the requests to the query service, exchanging JSON documents. Questions are answered through
+    POST /answer, /answers (batches) and /explain, the Knowledge Base is reloaded on demand through POST /reload, while
+    GET /health, /stats and /metrics (tracing metrics, in the Prometheus text format) expose the service state.
+    """
+
+    # keep connections alive, so that clients sending many requests do not reconnect every time
+    protocol_version = 'HTTP/1.1'
+
+    # non-public methods
+    def _send(self, status: int, body: bytes, content_type: str) -> None:
+        self.send_response(status)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+        return
+
+    def _send_json(self, status: int, document: Dict) -> None:
+        self._send(status=status, body=json.dumps(document).encode('utf-8'), content_type='application/json')
+
+        return
+
+    def _read_json(self) -> Dict[str, Any]:
+        document = json.loads(self.rfile.read(int(self.headers.get('Content-Length', 0))) or b'{}')
+        if not isinstance(document, dict):
+            raise ValueError('The request body must be a JSON object.')
+
+        return document
+
+    # public methods
+    def do_GET(self) -> None:
+        query_service = self.server.query_service
+        if self.path == '/health':
+            self._send_json(status=200, document=query_service.health())
+        elif self.path == '/stats':
+            self._send_json(status=200, document=query_service.stats())
+        elif self.path == '/metrics':
+            self._send(status=200, body=tracer.format_prometheus().encode('utf-8'), content_type='text/plain; version=0.0.4')
+        else:
+            self._send_json(status=404, document={'error': f'Unknown endpoint: {self.path}'})
+
+        return
+
+    def do_POST(self) -> None:
+        query_service = self.server.query_service
+        try:
+            document = self._read_json()
+        except ValueError as e:
+            self._send_json(status=400, document={'error': f'Invalid request body: {e}'})
+            return
+        try:
+            if self.path == '/answer' and isinstance(document.get('question'), str):
+                self._send_json(status=200, document=query_service.answer(question=document['question']).model_dump())
+            elif self.path == '/answers' and isinstance(document.get('questions'), list):
+                answers = query_service.answer_batch(questions=[str(q) for q in document['questions']])
+                self._send_json(
+                    status=200,
+                    document={'answers': [{'error': repr(a)} if isinstance(a, Exception) else a.model_dump() for a in answers]}
+                )
+            elif self.path == '/explain' and isinstance(document.get('question'), str):
+                self._send_json(status=200, document={'plan': query_service.explain(question=document['question'])})
+            elif self.path == '/reload':
+                self._send_json(status=200, document=query_service.reload(force=bool(document.get('force', False))))
+            elif self.path in ('/answer', '/answers', '/explain'):
+                self._send_json(status=400, document={'error': 'Missing question(s) in the request body.'})
+            else:
+                self._send_json(status=404, document={'error': f'Unknown endpoint: {self.path}'})
+        except Exception as e:
+            logger.error(f'{self.path} Request Failed: {e!r}')
+            self._send_json(status=500, document={'error': repr(e)})
+
+        return
+
+    def log_message(self, format: str, *args: Any) -> None:
+        logger.debug(f'{self.address_string()} - {format % args}')
+
+        return
@@ -0,0 +1,196 @@
+# external modules import
+import time
+import threading
+import contextlib
+from pathlib import Path
+from loguru import logger
+from http.server import ThreadingHTTPServer
+from typing import List, Dict, Tuple, Iterator
+from concurrent.futures import ThreadPoolExecutor
+
+# internal modules import
+from ..configs import QSConfig, QMConfig
+from ..agents import QueryAgent
+from ..templates import Answer
+from ..QueryManager import QueryManager
+from ..telemetry import tracer
+from .QueryRequestHandler import QueryRequestHandler
+
+
+# class definition
+class QueryService:
+    """
+    This class implements a long-running query service, which keeps the Knowledge Base and its indexes resident and
+    answers questions over a local HTTP server. The Knowledge Base folder is polled for changes, and a new query manager
+    is built in the background and then swapped in with a single reference assignment, so that requests never wait for
+    a reload; the replaced query manager is closed as soon as the requests that were using it are done.
+    """
+
+    # constructor
+    def __init__(self, config: QSConfig, qm_config: QMConfig, query_agent: QueryAgent):
+
+        # initialize settings and counters
+        self.config = config
+        self.qm_config = qm_config
+        self.query_agent = query_agent
+        self.started_at = time.time()
+        self.reloads_number = 0
+
+        # load knowledge base, keeping track of the requests using every query manager
+        self.lock = threading.Lock()
+        self.reload_lock = threading.Lock()
+        self.kb_fingerprint = self._compute_fingerprint()
+        self.query_manager = QueryManager(config=qm_config, query_agent=query_agent)
+        self.active_requests: Dict[QueryManager, int] = {self.query_manager: 0}
+
+        # initialize batch executor, knowledge base watcher and http server
+        self.batch_executor = ThreadPoolExecutor(max_workers=config.max_workers, thread_name_prefix='qs-batch')
+        self.stop_event = threading.Event()
+        self.watcher = threading.Thread(target=self._watch_knowledge_base, name='qs-watcher', daemon=True)
+        self.http_server = ThreadingHTTPServer((config.host, config.port), QueryRequestHandler)
+        self.http_server.query_service = self
+        self.serving = False
+
+    # non-public methods
+    def _compute_fingerprint(self) -> Tuple:
+        # the json descriptors are always part of the fingerprint, since editing them makes the query manager discard a
+        # snapshot that is older than them
+        fingerprint = tuple(sorted((p.name, p.stat().st_mtime_ns, p.stat().st_size) for p in Path(self.qm_config.kb_path).glob('*.json')))
+        if self.qm_config.snapshot_path is not None and self.qm_config.snapshot_path.exists():
+            stat = self.qm_config.snapshot_path.stat()
+            fingerprint += (self.qm_config.snapshot_path.name, stat.st_mtime_ns, stat.st_size),
+
+        return fingerprint
+
+    def _watch_knowledge_base(self) -> None:
+        # a change is only picked up once it stays the same for a whole poll interval, so that partially written
+        # knowledge bases are never loaded
+        pending_fingerprint = None
+        while not self.stop_event.wait(self.config.poll_interval):
+            try:
+                fingerprint = self._compute_fingerprint()
+            except OSError:
+                continue
+            if fingerprint == self.kb_fingerprint:
+                pending_fingerprint = None
+            elif fingerprint != pending_fingerprint:
+                pending_fingerprint = fingerprint
+            else:
+                logger.info('Knowledge Base Change Detected.')
+                self.reload(fingerprint=fingerprint)
+                pending_fingerprint = None
+
+        return
+
+    @contextlib.contextmanager
+    def _acquire_query_manager(self) -> Iterator[QueryManager]:
+        with self.lock:
+            query_manager = self.query_manager
+            self.active_requests[query_manager] += 1
+        try:
+            yield query_manager
+        finally:
+            with self.lock:
+                self.active_requests[query_manager] -= 1
+                retired_flag = query_manager is not self.query_manager and self.active_requests[query_manager] == 0
+                if retired_flag:
+                    del self.active_requests[query_manager]
+            if retired_flag:
+                query_manager.close()
+
+    # public methods
+    def reload(self, fingerprint: Tuple | None = None, force: bool = False) -> Dict:
+        with self.reload_lock:
+            fingerprint = fingerprint if fingerprint is not None else self._compute_fingerprint()
+            start_time = time.perf_counter()
+            try:
+                query_manager = QueryManager(config=self.qm_config, query_agent=self.query_agent)
+            except Exception as e:
+                logger.error(f'Knowledge Base Reload Failed, Keeping The Current One: {e!r}')
+                return {'reloaded': False, 'error': repr(e)}
+            self.kb_fingerprint = fingerprint
+
+            # keep the current query manager, and its answers cache, when the content did not actually change
+            if query_manager.kb_version == self.query_manager.kb_version and not force:
+                query_manager.close()
+                logger.info('Knowledge Base Unchanged, Reload Skipped.')
+                return {'reloaded': False, 'kb_version': query_manager.kb_version}
+
+            # swap query managers, closing the replaced one right away if no request is using it
+            with self.lock:
+                retired_query_manager, self.query_manager = self.query_manager, query_manager
+                self.active_requests[query_manager] = 0
+                retired_flag = self.active_requests[retired_query_manager] == 0
+                if retired_flag:
+                    del self.active_requests[retired_query_manager]
+                self.reloads_number += 1
+            if retired_flag:
+                retired_query_manager.close()
+            logger.info(f'Knowledge Base Reloaded In {time.perf_counter() - start_time:.2f}s (version {query_manager.kb_version}).')
+
+        return {'reloaded': True, 'kb_version': query_manager.kb_version, 'dishes': len(query_manager.knowledge_base)}
+
+    def answer(self, question: str) -> Answer:
+        with self._acquire_query_manager() as query_manager:
+            return query_manager.answer_question(question=question)
+
+    def answer_batch(self, questions: List[str]) -> List[Answer | Exception]:
+        # every question of the batch is answered by the same query manager, even if a reload happens meanwhile
+        with self._acquire_query_manager() as query_manager:
+            futures = [self.batch_executor.submit(tracer.bind(query_manager.answer_question), question=q) for q in questions]
+            answers = []
+            for future in futures:
+                try:
+                    answers.append(future.result())
+                except Exception as e:
+                    logger.error(f'Question Answering Failed: {e!r}')
+                    answers.append(e)
+
+        return answers
+
+    def explain(self, question: str) -> str:
+        with self._acquire_query_manager() as query_manager:
+            return query_manager.explain(question=question)
+
+    def health(self) -> Dict:
+        query_manager = self.query_manager
+
+        return {
+            'status': 'ok',
+            'kb_version': query_manager.kb_version,
+            'dishes': len(query_manager.knowledge_base),
+            'reloads': self.reloads_number,
+            'uptime_s': round(time.time() - self.started_at, 3)
+        }
+
+    def stats(self) -> Dict:
+        with self.lock:
+            query_manager, active_requests = self.query_manager, sum(self.active_requests.values())
+
+        return {
+            'fast_path': query_manager.fast_path_stats(),
+            'answers_cache': query_manager.answers_cache_stats(),
+            'active_requests': active_requests
+        }
+
+    def serve_forever(self) -> None:
+        if self.config.poll_interval is not None:
+            self.watcher.start()
+        logger.info(f'Query Service Listening On http://{self.config.host}:{self.http_server.server_port}.')
+        self.serving = True
+        try:
+            self.http_server.serve_forever()
+        finally:
+            self.serving = False
+
+        return
+
+    def close(self) -> None:
+        self.stop_event.set()
+        if self.serving:
+            self.http_server.shutdown()
+        self.http_server.server_close()
+        self.batch_executor.shutdown(wait=True)
+        self.query_manager.close()
+
+        return
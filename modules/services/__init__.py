@@ -0,0 +1,2 @@
+from .QueryRequestHandler import QueryRequestHandler
+from .QueryService import QueryService
@@ -0,0 +1,81 @@
+# external modules import
+import json
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import List, Dict, Tuple, Any
+
+
+# class definition
+class AnswersCache:
+    """
+    This class implements an in-memory cache of answers, keyed by the canonical form of the parsed constraints of a
+    question and by the version of the Knowledge Base that answered it. Entries are evicted in least-recently-used order
+    once their number exceeds the limit, and they are all dropped when a different Knowledge Base version is set.
+    """
+
+    # constructor
+    def __init__(self, max_size: int):
+
+        # initialize cache settings and counters
+        self.max_size = max_size
+        self.hits, self.misses, self.evictions = 0, 0, 0
+
+        # initialize entries, from the least to the most recently used one
+        self.lock = threading.Lock()
+        self.version: str | None = None
+        self.entries: OrderedDict[str, Tuple[int, ...]] = OrderedDict()
+
+    # non-public methods
+    @staticmethod
+    def _build_key(version: str | None, constraints: Any) -> str:
+        return hashlib.sha256(json.dumps([version, constraints], separators=(',', ':')).encode('utf-8')).hexdigest()
+
+    # public methods
+    def set_version(self, version: str) -> None:
+        with self.lock:
+            if version != self.version:
+                self.entries.clear()
+                self.version = version
+
+        return
+
+    def lookup(self, constraints: Any) -> List[int] | None:
+        # keys are built while holding the lock, so that they never mix up the version of a concurrent set_version
+        with self.lock:
+            key = self._build_key(self.version, constraints)
+            dishes_codes = self.entries.get(key)
+            if dishes_codes is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            self.entries.move_to_end(key)
+
+        return list(dishes_codes)
+
+    def update(self, constraints: Any, dishes_codes: List[int]) -> None:
+        with self.lock:
+            key = self._build_key(self.version, constraints)
+            self.entries[key] = tuple(dishes_codes)
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.max_size:
+                self.entries.popitem(last=False)
+                self.evictions += 1
+
+        return
+
+    def clear(self) -> None:
+        with self.lock:
+            self.entries.clear()
+
+        return
+
+    def stats(self) -> Dict[str, float]:
+        with self.lock:
+            return {
+                'entries': len(self.entries),
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'hit_rate': self.hits / (self.hits + self.misses) if self.hits + self.misses > 0 else 0.0
+            }
@@ -0,0 +1,86 @@
+# external modules import
+import os
+import json
+import threading
+from pathlib import Path
+from typing import Dict
+
+# internal modules import
+from ..templates import Answer
+
+
+# class definition
+class AnswersJournal:
+    """
+    This class implements an append-only checkpoint of the answers given so far, written as one JSON line per question
+    and flushed to disk as soon as each answer is available. The first line holds a key identifying the run (e.g., the
+    hash of the questions and of the Knowledge Base), so that an interrupted run can be resumed while stale answers are
+    discarded.
+    """
+
+    # constructor
+    def __init__(self, file_path: Path, key: str, resume: bool = True):
+
+        # load the answers of the previous run, when compatible
+        self.file_path = file_path
+        self.key = key
+        self.answers = self._load_answers() if resume else {}
+
+        # atomically rewrite the journal with the valid answers only, dropping any line truncated by a crash
+        self.file_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.file_path.with_name(self.file_path.name + '.tmp')
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            f.write(json.dumps({'key': self.key}) + '\n')
+            for question_number, answer in self.answers.items():
+                f.write(json.dumps({'question_number': question_number, 'dishes_codes': answer.dishes_codes}) + '\n')
+        tmp_path.replace(self.file_path)
+
+        # keep the journal open for appending
+        self.lock = threading.Lock()
+        self.file = open(self.file_path, 'a', encoding='utf-8')
+
+    # context manager methods
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    # non-public methods
+    def _load_answers(self) -> Dict[int, Answer]:
+        answers = {}
+        if not self.file_path.exists():
+            return answers
+        with open(self.file_path, 'r', encoding='utf-8') as f:
+            for line_number, line in enumerate(f):
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError:
+                    break
+                if line_number == 0:
+                    if record.get('key') != self.key:
+                        break
+                    continue
+                answers[record['question_number']] = Answer(dishes_codes=record['dishes_codes'])
+
+        return answers
+
+    def _sync(self) -> None:
+        self.file.flush()
+        os.fsync(self.file.fileno())
+
+        return
+
+    # public methods
+    def append(self, question_number: int, answer: Answer) -> None:
+        with self.lock:
+            self.answers[question_number] = answer
+            self.file.write(json.dumps({'question_number': question_number, 'dishes_codes': answer.dishes_codes}) + '\n')
+            self._sync()
+
+        return
+
+    def close(self) -> None:
+        self.file.close()
+
+        return
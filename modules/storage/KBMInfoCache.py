@@ -0,0 +1,36 @@
+# external modules import
+import json
+from pathlib import Path
+from typing import Dict
+
+
+# class definition
+class KBMInfoCache:
+    """
+    This class implements a persistent cache of the information extracted from the Cooking Manual and the Galactic
+    Code, keyed by the hash of their content, so that the documents are read only when they change.
+    """
+
+    # constructor
+    def __init__(self, file_path: Path):
+
+        # initialize cache path
+        self.file_path = file_path
+
+    # public methods
+    def lookup(self, key: str) -> Dict | None:
+        if not self.file_path.exists():
+            return None
+        with open(self.file_path, 'r', encoding='utf-8') as f:
+            cache_content = json.load(f)
+
+        return cache_content['info'] if cache_content.get('key') == key else None
+
+    def update(self, key: str, info: Dict) -> None:
+        self.file_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.file_path.with_name(self.file_path.name + '.tmp')
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({'key': key, 'info': info}, f, indent=4, ensure_ascii=False)
+        tmp_path.replace(self.file_path)
+
+        return
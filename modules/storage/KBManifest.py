@@ -0,0 +1,57 @@
+# external modules import
+import json
+import hashlib
+from pathlib import Path
+from typing import List, Dict
+
+
+# class definition
+class KBManifest:
+    """
+    This class implements the manifest of the Knowledge Base, that records, for every processed menu, the hash of its
+    content, the version of the parser that processed it and the codes of the dishes it produced.
+    """
+
+    # constructor
+    def __init__(self, file_path: Path):
+
+        # load manifest content
+        self.file_path = file_path
+        self.menus: Dict[str, Dict] = {}
+        if file_path.exists():
+            with open(file_path, 'r', encoding='utf-8') as f:
+                self.menus = json.load(f)['menus']
+
+    # public methods
+    @staticmethod
+    def hash_files(files_paths: List[Path]) -> str:
+        files_hash = hashlib.blake2b(digest_size=16)
+        for file_path in files_paths:
+            with open(file_path, 'rb') as f:
+                files_hash.update(f.read())
+
+        return files_hash.hexdigest()
+
+    def is_valid(self, menu_name: str, input_hash: str, parser_version: str) -> bool:
+        menu_entry = self.menus.get(menu_name)
+
+        return menu_entry is not None and menu_entry['input_hash'] == input_hash and menu_entry['parser_version'] == parser_version
+
+    def owners(self, dish_code: int) -> List[str]:
+        return [menu_name for menu_name, menu_entry in self.menus.items() if dish_code in menu_entry['dishes_codes']]
+
+    def update(self, menu_name: str, input_hash: str, parser_version: str, dishes_codes: List[int]) -> None:
+        self.menus[menu_name] = {'input_hash': input_hash, 'parser_version': parser_version, 'dishes_codes': dishes_codes}
+
+        return
+
+    def remove(self, menu_name: str) -> List[int]:
+        return self.menus.pop(menu_name, {}).get('dishes_codes', [])
+
+    def memorize(self) -> None:
+        tmp_path = self.file_path.with_name(self.file_path.name + '.tmp')
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({'menus': self.menus}, f, indent=4, ensure_ascii=False)
+        tmp_path.replace(self.file_path)
+
+        return
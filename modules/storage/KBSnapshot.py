@@ -0,0 +1,279 @@
+# external modules import
+import os
+import sys
+import mmap
+import struct
+import hashlib
+from array import array
+from pathlib import Path
+from typing import List, Dict, Tuple
+
+# internal modules import
+from ..enums import Planet, LicenseName, LicenseCode, TechniqueCategory, TechniqueSubcategory
+from ..templates import AugmentedDish, Restaurant, Chef, License, LicensesList, Ingredient, Technique
+from .KBStore import KBStore
+
+
+# class definition
+class KBSnapshot:
+    """
+    This class implements a compact, single-file snapshot of the Knowledge Base. The file contains a fixed header, an
+    interned strings table and fixed-size records for restaurants, chefs, licenses, ingredients, techniques and dishes,
+    so that it can be memory-mapped and decoded without any JSON parsing or validation. Ingredients and techniques are
+    stored once each, and dishes reference them by id.
+    """
+
+    # file layout
+    MAGIC = b'HPKBSNAP'
+    VERSION = 2
+    HEADER = struct.Struct('<8sIIIIIIIIIII16s')
+    RESTAURANT = struct.Struct('<II')
+    LICENSE = struct.Struct('<IIi')
+    CHEF = struct.Struct('<III')
+    INGREDIENT = struct.Struct('<I')
+    TECHNIQUE = struct.Struct('<III')
+    DISH = struct.Struct('<iIIIIIIII')
+    REFERENCE = struct.Struct('<I')
+
+    # enumerates lookup tables
+    PLANETS = list(Planet)
+    LICENSES_NAMES = list(LicenseName)
+    LICENSES_CODES = list(LicenseCode)
+    TECHNIQUES_CATEGORIES = list(TechniqueCategory)
+    TECHNIQUES_SUBCATEGORIES = list(TechniqueSubcategory)
+
+    # constructor
+    def __init__(self, file_path: Path):
+
+        # memory map snapshot file, releasing it when the file is not a complete snapshot
+        self.file, self.buffer = None, None
+        try:
+            self.file = open(file_path, 'rb')
+            self.buffer = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ)
+
+            # read header
+            (
+                magic, version, self.strings_number, self.restaurants_number, self.chefs_number, self.licenses_number,
+                self.dishes_number, self.ingredients_number, self.techniques_number, self.ingredients_references_number,
+                self.techniques_references_number, self.strings_size, digest
+            ) = self.HEADER.unpack_from(self.buffer, 0)
+            if magic != self.MAGIC or version != self.VERSION:
+                raise ValueError('unexpected magic number or format version')
+            if len(self.buffer) != self._compute_size():
+                raise ValueError('file size does not match the header')
+            self.version = digest.hex()
+        except (ValueError, OSError, struct.error) as e:
+            self.close()
+            raise ValueError(f'{file_path} is not a valid Knowledge Base snapshot ({e}).') from e
+
+    # context manager methods
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    # non-public methods
+    @staticmethod
+    def _intern(strings: Dict[str, int], string: str) -> int:
+        if string not in strings:
+            strings[string] = len(strings)
+
+        return strings[string]
+
+    def _compute_size(self) -> int:
+        return (
+            self.HEADER.size + 4 * (self.strings_number + 1) + self.strings_size +
+            self.RESTAURANT.size * self.restaurants_number + self.LICENSE.size * self.licenses_number +
+            self.CHEF.size * self.chefs_number + self.INGREDIENT.size * self.ingredients_number +
+            self.TECHNIQUE.size * self.techniques_number + self.DISH.size * self.dishes_number +
+            self.REFERENCE.size * (self.ingredients_references_number + self.techniques_references_number)
+        )
+
+    def _unpack_records(self, record: struct.Struct, offset: int, records_number: int) -> Tuple[List[Tuple], int]:
+        end = offset + record.size * records_number
+
+        return list(record.iter_unpack(self.buffer[offset:end])), end
+
+    def _unpack_array(self, typecode: str, offset: int, items_number: int) -> array:
+        # the snapshot is little-endian, while arrays use the native byte order
+        values = array(typecode, self.buffer[offset:offset + 4 * items_number])
+        if sys.byteorder == 'big':
+            values.byteswap()
+
+        return values
+
+    def _decode_store(self) -> KBStore:
+
+        # decode strings table, which is kept encoded since only the entities names are needed right away
+        offset = self.HEADER.size
+        strings_offsets = self._unpack_array('I', offset, self.strings_number + 1)
+        offset += 4 * (self.strings_number + 1)
+        strings_blob = self.buffer[offset:offset + strings_offsets[-1]]
+        offset += self.strings_size
+
+        # decode entities records tables
+        restaurants_records, offset = self._unpack_records(self.RESTAURANT, offset, self.restaurants_number)
+        licenses_records, offset = self._unpack_records(self.LICENSE, offset, self.licenses_number)
+        chefs_records, offset = self._unpack_records(self.CHEF, offset, self.chefs_number)
+        ingredients_records, offset = self._unpack_records(self.INGREDIENT, offset, self.ingredients_number)
+        techniques_records, offset = self._unpack_records(self.TECHNIQUE, offset, self.techniques_number)
+
+        # build shared entities, skipping validation since the snapshot content has been validated at writing time
+        def string(string_id: int) -> str:
+            return strings_blob[strings_offsets[string_id]:strings_offsets[string_id + 1]].decode('utf-8')
+
+        restaurants = [Restaurant.model_construct(name=string(n), planet=self.PLANETS[p]) for n, p in restaurants_records]
+        licenses = [
+            License.model_construct(name=self.LICENSES_NAMES[n], code=self.LICENSES_CODES[c], level=l)
+            for n, c, l in licenses_records
+        ]
+        chefs = [
+            Chef.model_construct(name=string(n), licenses=LicensesList.model_construct(items=licenses[s:s + c]))
+            for n, s, c in chefs_records
+        ]
+        ingredients = [Ingredient.model_construct(name=string(n)) for n, in ingredients_records]
+        techniques = [
+            Technique.model_construct(name=string(n), category=self.TECHNIQUES_CATEGORIES[c], subcategory=self.TECHNIQUES_SUBCATEGORIES[s])
+            for n, c, s in techniques_records
+        ]
+
+        # decode dishes records as columns, whose references ranges are contiguous since dishes are written in order
+        fields_number = self.DISH.size // 4
+        dishes_records = self._unpack_array('I', offset, fields_number * self.dishes_number)
+        offset += self.DISH.size * self.dishes_number
+        ingredients_offsets, techniques_offsets = dishes_records[4::fields_number], dishes_records[6::fields_number]
+        ingredients_offsets.append(self.ingredients_references_number)
+        techniques_offsets.append(self.techniques_references_number)
+        ingredients_references = self._unpack_array('I', offset, self.ingredients_references_number)
+        offset += self.REFERENCE.size * self.ingredients_references_number
+        techniques_references = self._unpack_array('I', offset, self.techniques_references_number)
+
+        return KBStore(
+            strings_blob=strings_blob,
+            strings_offsets=strings_offsets,
+            restaurants=restaurants,
+            chefs=chefs,
+            ingredients=ingredients,
+            techniques=techniques,
+            codes=array('i', dishes_records[0::fields_number].tobytes()),
+            names=dishes_records[1::fields_number],
+            restaurants_ids=dishes_records[2::fields_number],
+            chefs_ids=dishes_records[3::fields_number],
+            orders_flags=bytearray(dishes_records[8::fields_number].tolist()),
+            ingredients_offsets=ingredients_offsets,
+            ingredients_references=ingredients_references,
+            techniques_offsets=techniques_offsets,
+            techniques_references=techniques_references
+        )
+
+    # public methods
+    @classmethod
+    def write(cls, file_path: Path, knowledge_base: List[AugmentedDish]) -> None:
+
+        # intern strings and deduplicate shared entities
+        strings, restaurants, chefs, ingredients, techniques = {}, {}, {}, {}, {}
+        restaurants_records, chefs_records, licenses_records = [], [], []
+        ingredients_records, techniques_records, dishes_records = [], [], []
+        ingredients_references, techniques_references = [], []
+        for ad in sorted(knowledge_base, key=lambda x: x.dish.code):
+            restaurant_key = (ad.restaurant.name, ad.restaurant.planet)
+            if restaurant_key not in restaurants:
+                restaurants[restaurant_key] = len(restaurants_records)
+                restaurants_records.append((cls._intern(strings, ad.restaurant.name), cls.PLANETS.index(ad.restaurant.planet)))
+            chef_key = (ad.chef.name, tuple((l.name, l.code, l.level) for l in ad.chef.licenses.items))
+            if chef_key not in chefs:
+                chefs[chef_key] = len(chefs_records)
+                chefs_records.append((cls._intern(strings, ad.chef.name), len(licenses_records), len(ad.chef.licenses.items)))
+                for l in ad.chef.licenses.items:
+                    licenses_records.append((cls.LICENSES_NAMES.index(l.name), cls.LICENSES_CODES.index(l.code), l.level))
+            dishes_records.append(
+                (
+                    ad.dish.code,
+                    cls._intern(strings, ad.dish.name),
+                    restaurants[restaurant_key],
+                    chefs[chef_key],
+                    len(ingredients_references),
+                    len(ad.dish.ingredients.items),
+                    len(techniques_references),
+                    len(ad.dish.techniques.items),
+                    ad.dish.andromeda_flag | ad.dish.armonisti_flag << 1 | ad.dish.naturalisti_flag << 2
+                )
+            )
+            for i in ad.dish.ingredients.items:
+                if i.name not in ingredients:
+                    ingredients[i.name] = len(ingredients_records)
+                    ingredients_records.append((cls._intern(strings, i.name),))
+                ingredients_references.append((ingredients[i.name],))
+            for t in ad.dish.techniques.items:
+                technique_key = (t.name, t.category, t.subcategory)
+                if technique_key not in techniques:
+                    techniques[technique_key] = len(techniques_records)
+                    techniques_records.append(
+                        (cls._intern(strings, t.name), cls.TECHNIQUES_CATEGORIES.index(t.category), cls.TECHNIQUES_SUBCATEGORIES.index(t.subcategory))
+                    )
+                techniques_references.append((techniques[technique_key],))
+
+        # serialize strings table
+        encoded_strings = [s.encode('utf-8') for s in strings]
+        strings_offsets = [0]
+        for s in encoded_strings:
+            strings_offsets.append(strings_offsets[-1] + len(s))
+        strings_blob = b''.join(encoded_strings)
+        strings_blob += b'\x00' * (-len(strings_blob) % 4)
+
+        # serialize body
+        body = b''.join(
+            [
+                struct.pack(f'<{len(strings_offsets)}I', *strings_offsets),
+                strings_blob,
+                b''.join(cls.RESTAURANT.pack(*r) for r in restaurants_records),
+                b''.join(cls.LICENSE.pack(*r) for r in licenses_records),
+                b''.join(cls.CHEF.pack(*r) for r in chefs_records),
+                b''.join(cls.INGREDIENT.pack(*r) for r in ingredients_records),
+                b''.join(cls.TECHNIQUE.pack(*r) for r in techniques_records),
+                b''.join(cls.DISH.pack(*r) for r in dishes_records),
+                b''.join(cls.REFERENCE.pack(*r) for r in ingredients_references),
+                b''.join(cls.REFERENCE.pack(*r) for r in techniques_references)
+            ]
+        )
+        header = cls.HEADER.pack(
+            cls.MAGIC, cls.VERSION, len(encoded_strings), len(restaurants_records), len(chefs_records),
+            len(licenses_records), len(dishes_records), len(ingredients_records), len(techniques_records),
+            len(ingredients_references), len(techniques_references), len(strings_blob), hashlib.blake2b(body, digest_size=16).digest()
+        )
+
+        # write snapshot atomically
+        tmp_path = file_path.with_name(file_path.name + '.tmp')
+        with open(tmp_path, 'wb') as f:
+            f.write(header + body)
+        tmp_path.replace(file_path)
+
+        return
+
+    def is_stale(self, descriptors_paths: List[Path]) -> bool:
+        # the snapshot is written after the json descriptors it compacts, so it is stale when any of them is newer or
+        # when their number differs (e.g., after dishes have been removed); without descriptors it is the only source
+        if len(descriptors_paths) == 0:
+            return False
+        snapshot_mtime = os.fstat(self.file.fileno()).st_mtime_ns
+
+        return len(descriptors_paths) != self.dishes_number or any(p.stat().st_mtime_ns > snapshot_mtime for p in descriptors_paths)
+
+    def load_store(self) -> KBStore:
+        # the header has been checked already, so any decoding error means that the body is corrupted
+        try:
+            return self._decode_store()
+        except (struct.error, IndexError, UnicodeDecodeError) as e:
+            raise ValueError(f'{self.file.name} is not a valid Knowledge Base snapshot ({e}).') from e
+
+    def load(self) -> List[AugmentedDish]:
+        return self.load_store().to_dishes()
+
+    def close(self) -> None:
+        if self.buffer is not None:
+            self.buffer.close()
+        if self.file is not None:
+            self.file.close()
+
+        return
@@ -0,0 +1,142 @@
+# external modules import
+from array import array
+from typing import List, Dict, Iterator
+
+# internal modules import
+from ..templates import AugmentedDish, Restaurant, Chef, Ingredient, IngredientsList, Technique, TechniquesList, Dish
+
+
+# class definition
+class KBStore:
+    """
+    This class implements the compact, in-memory representation of the Knowledge Base used at query time. Restaurants,
+    chefs, ingredients and techniques (the latter identified by name, category and subcategory, since different
+    techniques may share a name) are stored once each and shared by reference, while dishes are stored as
+    array-backed columns (row ids follow the order of the dishes), with their names kept in an interned strings table
+    and their ingredients and techniques as ranges of references. Dishes are converted to and from the AugmentedDish
+    template only at the boundaries.
+    """
+
+    # constructor
+    def __init__(
+            self,
+            strings_blob: bytes,
+            strings_offsets: array,
+            restaurants: List[Restaurant],
+            chefs: List[Chef],
+            ingredients: List[Ingredient],
+            techniques: List[Technique],
+            codes: array,
+            names: array,
+            restaurants_ids: array,
+            chefs_ids: array,
+            orders_flags: bytearray,
+            ingredients_offsets: array,
+            ingredients_references: array,
+            techniques_offsets: array,
+            techniques_references: array
+    ):
+
+        # initialize interned strings table
+        self.strings_blob = strings_blob
+        self.strings_offsets = strings_offsets
+
+        # initialize shared entities tables
+        self.restaurants = restaurants
+        self.chefs = chefs
+        self.ingredients = ingredients
+        self.techniques = techniques
+
+        # initialize dishes columns, where the references of the i-th dish are between the i-th and (i+1)-th offsets
+        self.codes = codes
+        self.names = names
+        self.restaurants_ids = restaurants_ids
+        self.chefs_ids = chefs_ids
+        self.orders_flags = orders_flags
+        self.ingredients_offsets = ingredients_offsets
+        self.ingredients_references = ingredients_references
+        self.techniques_offsets = techniques_offsets
+        self.techniques_references = techniques_references
+
+    # container methods
+    def __len__(self) -> int:
+        return len(self.codes)
+
+    def __getitem__(self, row_id: int) -> AugmentedDish:
+        return AugmentedDish.model_construct(
+            restaurant=self.restaurants[self.restaurants_ids[row_id]],
+            chef=self.chefs[self.chefs_ids[row_id]],
+            dish=Dish.model_construct(
+                code=self.codes[row_id],
+                name=self.string(self.names[row_id]),
+                ingredients=IngredientsList.model_construct(items=self.dish_ingredients(row_id)),
+                techniques=TechniquesList.model_construct(items=self.dish_techniques(row_id)),
+                andromeda_flag=bool(self.orders_flags[row_id] & 1),
+                armonisti_flag=bool(self.orders_flags[row_id] & 2),
+                naturalisti_flag=bool(self.orders_flags[row_id] & 4)
+            )
+        )
+
+    def __iter__(self) -> Iterator[AugmentedDish]:
+        for row_id in range(len(self)):
+            yield self[row_id]
+
+    # public methods
+    @classmethod
+    def from_dishes(cls, knowledge_base: List[AugmentedDish]) -> 'KBStore':
+
+        # deduplicate shared entities, keeping the first occurrence of each of them
+        strings: Dict[str, int] = {}
+        restaurants, chefs, ingredients, techniques = {}, {}, {}, {}
+        codes, names, restaurants_ids, chefs_ids, orders_flags = array('i'), array('I'), array('I'), array('I'), bytearray()
+        ingredients_offsets, ingredients_references = array('I', [0]), array('I')
+        techniques_offsets, techniques_references = array('I', [0]), array('I')
+        for ad in knowledge_base:
+            codes.append(ad.dish.code)
+            names.append(strings.setdefault(ad.dish.name, len(strings)))
+            restaurants_ids.append(restaurants.setdefault((ad.restaurant.name, ad.restaurant.planet), (len(restaurants), ad.restaurant))[0])
+            chef_key = (ad.chef.name, tuple((l.name, l.code, l.level) for l in ad.chef.licenses.items))
+            chefs_ids.append(chefs.setdefault(chef_key, (len(chefs), ad.chef))[0])
+            orders_flags.append(ad.dish.andromeda_flag | ad.dish.armonisti_flag << 1 | ad.dish.naturalisti_flag << 2)
+            for i in ad.dish.ingredients.items:
+                ingredients_references.append(ingredients.setdefault(i.name, (len(ingredients), i))[0])
+            ingredients_offsets.append(len(ingredients_references))
+            for t in ad.dish.techniques.items:
+                techniques_references.append(techniques.setdefault((t.name, t.category, t.subcategory), (len(techniques), t))[0])
+            techniques_offsets.append(len(techniques_references))
+
+        # build interned strings table
+        encoded_strings = [s.encode('utf-8') for s in strings]
+        strings_offsets = array('I', [0])
+        for s in encoded_strings:
+            strings_offsets.append(strings_offsets[-1] + len(s))
+
+        return cls(
+            strings_blob=b''.join(encoded_strings),
+            strings_offsets=strings_offsets,
+            restaurants=[r for _, r in restaurants.values()],
+            chefs=[c for _, c in chefs.values()],
+            ingredients=[i for _, i in ingredients.values()],
+            techniques=[t for _, t in techniques.values()],
+            codes=codes,
+            names=names,
+            restaurants_ids=restaurants_ids,
+            chefs_ids=chefs_ids,
+            orders_flags=orders_flags,
+            ingredients_offsets=ingredients_offsets,
+            ingredients_references=ingredients_references,
+            techniques_offsets=techniques_offsets,
+            techniques_references=techniques_references
+        )
+
+    def to_dishes(self) -> List[AugmentedDish]:
+        return list(self)
+
+    def string(self, string_id: int) -> str:
+        return self.strings_blob[self.strings_offsets[string_id]:self.strings_offsets[string_id + 1]].decode('utf-8')
+
+    def dish_ingredients(self, row_id: int) -> List[Ingredient]:
+        return [self.ingredients[r] for r in self.ingredients_references[self.ingredients_offsets[row_id]:self.ingredients_offsets[row_id + 1]]]
+
+    def dish_techniques(self, row_id: int) -> List[Technique]:
+        return [self.techniques[r] for r in self.techniques_references[self.techniques_offsets[row_id]:self.techniques_offsets[row_id + 1]]]
@@ -0,0 +1,89 @@
+# external modules import
+import time
+import json
+import sqlite3
+import hashlib
+import threading
+from typing import Dict
+
+# internal modules import
+from ..configs import LCConfig
+
+
+# class definition
+class LLMCache:
+    """
+    This class implements a persistent cache of LLM responses, keyed by model name, temperature and rendered prompt.
+    Entries are evicted in least-recently-used order once the total size of the stored responses exceeds the limit.
+    """
+
+    # constructor
+    def __init__(self, config: LCConfig):
+
+        # initialize cache settings and counters
+        self.max_size = config.max_size
+        self.bypass = config.bypass
+        self.hits, self.misses = 0, 0
+
+        # open cache database
+        self.lock = threading.Lock()
+        self.connection = sqlite3.connect(config.cache_path, check_same_thread=False)
+        with self.lock, self.connection:
+            self.connection.execute(
+                'CREATE TABLE IF NOT EXISTS llm_cache ('
+                'key TEXT PRIMARY KEY, response TEXT NOT NULL, size INTEGER NOT NULL, last_access REAL NOT NULL)'
+            )
+            self.connection.execute('CREATE INDEX IF NOT EXISTS llm_cache_last_access ON llm_cache (last_access)')
+
+    # non-public methods
+    @staticmethod
+    def _build_key(model_name: str, temperature: float | None, prompt: str) -> str:
+        return hashlib.sha256(json.dumps([model_name, temperature, prompt]).encode('utf-8')).hexdigest()
+
+    def _evict(self) -> None:
+        cache_size = self.connection.execute('SELECT COALESCE(SUM(size), 0) FROM llm_cache').fetchone()[0]
+        if cache_size <= self.max_size:
+            return
+        evicted_keys = []
+        for key, size in self.connection.execute('SELECT key, size FROM llm_cache ORDER BY last_access'):
+            evicted_keys.append((key,))
+            cache_size -= size
+            if cache_size <= self.max_size:
+                break
+        self.connection.executemany('DELETE FROM llm_cache WHERE key = ?', evicted_keys)
+
+        return
+
+    # public methods
+    def lookup(self, model_name: str, temperature: float | None, prompt: str) -> str | None:
+        if self.bypass:
+            return None
+        key = self._build_key(model_name, temperature, prompt)
+        with self.lock, self.connection:
+            row = self.connection.execute('SELECT response FROM llm_cache WHERE key = ?', (key,)).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            self.connection.execute('UPDATE llm_cache SET last_access = ? WHERE key = ?', (time.time(), key))
+
+        return row[0]
+
+    def update(self, model_name: str, temperature: float | None, prompt: str, response: str) -> None:
+        if self.bypass:
+            return
+        key = self._build_key(model_name, temperature, prompt)
+        with self.lock, self.connection:
+            self.connection.execute(
+                'INSERT OR REPLACE INTO llm_cache (key, response, size, last_access) VALUES (?, ?, ?, ?)',
+                (key, response, len(response.encode('utf-8')), time.time())
+            )
+            self._evict()
+
+        return
+
+    def stats(self) -> Dict[str, int]:
+        with self.lock:
+            entries, size = self.connection.execute('SELECT COUNT(*), COALESCE(SUM(size), 0) FROM llm_cache').fetchone()
+
+        return {'hits': self.hits, 'misses': self.misses, 'entries': entries, 'size': size}
@@ -0,0 +1,7 @@
+from .KBSnapshot import KBSnapshot
+from .LLMCache import LLMCache
+from .KBManifest import KBManifest
+from .KBMInfoCache import KBMInfoCache
+from .AnswersJournal import AnswersJournal
+from .AnswersCache import AnswersCache
+from .KBStore import KBStore
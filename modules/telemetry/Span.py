@@ -0,0 +1,52 @@
+# external modules import
+import time
+from typing import Any, Dict
+
+
+# class definition
+class Span:
+    """
+    This class implements a timed span of the pipeline, linked to the span that was active when it started. A span with
+    no tracer does nothing, and it is what a disabled tracer hands out, so that instrumented code never checks whether
+    tracing is enabled.
+    """
+
+    # attributes
+    __slots__ = ('tracer', 'name', 'attributes', 'span_id', 'parent_id', 'token', 'start_time', 'start', 'duration')
+
+    # constructor
+    def __init__(self, tracer: Any | None, name: str, attributes: Dict[str, Any]):
+
+        # initialize span fields
+        self.tracer = tracer
+        self.name = name
+        self.attributes = attributes
+        self.span_id, self.parent_id, self.token = None, None, None
+        self.start_time, self.start, self.duration = 0.0, 0.0, 0.0
+
+    # context manager methods
+    def __enter__(self):
+        if self.tracer is None:
+            return self
+        self.span_id = next(self.tracer.spans_ids)
+        self.parent_id = self.tracer.current_span_id.get()
+        self.token = self.tracer.current_span_id.set(self.span_id)
+        self.start_time, self.start = time.time(), time.perf_counter()
+
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        if self.tracer is None:
+            return
+        self.duration = time.perf_counter() - self.start
+        self.tracer.current_span_id.reset(self.token)
+        if exc_type is not None:
+            self.attributes['error'] = exc_type.__name__
+        self.tracer.record_span(span=self)
+
+    # public methods
+    def set(self, **attributes: Any) -> None:
+        if self.tracer is not None:
+            self.attributes.update(attributes)
+
+        return
@@ -0,0 +1,212 @@
+# external modules import
+import os
+import re
+import json
+import threading
+import functools
+import itertools
+import contextvars
+from pathlib import Path
+from typing import Any, Dict, List, Tuple, Callable
+
+# internal modules import
+from .Span import Span
+
+
+# class definition
+class Tracer:
+    """
+    This class implements a lightweight tracing surface for the whole pipeline: spans around each stage, counters (e.g.,
+    llm calls, retries and tokens) and observations (e.g., filters cardinalities). Spans can be streamed as JSON lines
+    while they end, and every metric is aggregated so that it can be exported in the Prometheus text format. While
+    disabled, instrumented code only pays for a flag check.
+    """
+
+    # prometheus metrics prefix
+    PREFIX = 'hackapizza'
+
+    # constructor
+    def __init__(self):
+
+        # initialize state
+        self.enabled = False
+        self.lock = threading.Lock()
+        self.sink = None
+        self.spans_ids = itertools.count(1)
+        self.current_span_id: contextvars.ContextVar[int | None] = contextvars.ContextVar('current_span_id', default=None)
+        self.null_span = Span(tracer=None, name='', attributes={})
+
+        # forked workers processes draw their spans ids from a range of their own, so that they never clash with those
+        # of the parent process
+        os.register_at_fork(after_in_child=self._reset_spans_ids)
+
+        # initialize aggregates, keyed by metric name and sorted labels
+        self.spans: Dict[str, List[float]] = {}
+        self.counters: Dict[Tuple[str, Tuple], float] = {}
+        self.observations: Dict[Tuple[str, Tuple], List[float]] = {}
+
+    # non-public methods
+    def _reset_spans_ids(self) -> None:
+        self.spans_ids = itertools.count((os.getpid() << 32) + 1)
+
+        return
+
+    @staticmethod
+    def _run_within(parent_id: int | None, func: Callable, *args: Any, **kwargs: Any) -> Any:
+        token = tracer.current_span_id.set(parent_id)
+        try:
+            return func(*args, **kwargs)
+        finally:
+            tracer.current_span_id.reset(token)
+
+    def _write(self, record: Dict) -> None:
+        # every record is written and flushed at once, so that lines from forked workers processes never interleave
+        if self.sink is not None:
+            self.sink.write(json.dumps(record, default=str) + '\n')
+            self.sink.flush()
+
+        return
+
+    @classmethod
+    def _format_metric(cls, name: str, labels: Tuple) -> str:
+        metric_name = cls.PREFIX + '_' + re.sub(r'[^a-zA-Z0-9_]', '_', name)
+        if len(labels) == 0:
+            return metric_name
+        labels_text = ','.join(f'{k}="{json.dumps(str(v))[1:-1]}"' for k, v in labels)
+
+        return f'{metric_name}{{{labels_text}}}'
+
+    # public methods
+    def enable(self, jsonl_path: Path | None = None) -> None:
+        with self.lock:
+            if jsonl_path is not None:
+                jsonl_path.parent.mkdir(parents=True, exist_ok=True)
+                self.sink = open(jsonl_path, 'a', encoding='utf-8')
+            self.enabled = True
+
+        return
+
+    def disable(self) -> None:
+        with self.lock:
+            self.enabled = False
+            if self.sink is not None:
+                self.sink.close()
+                self.sink = None
+
+        return
+
+    def reset(self) -> None:
+        with self.lock:
+            self.spans.clear()
+            self.counters.clear()
+            self.observations.clear()
+
+        return
+
+    def span(self, name: str, **attributes: Any) -> Span:
+        if not self.enabled:
+            return self.null_span
+
+        return Span(tracer=self, name=name, attributes=attributes)
+
+    def traced(self, name: str) -> Callable:
+        def decorator(func):
+            @functools.wraps(func)
+            def wrapper(*args, **kwargs):
+                with self.span(name):
+                    return func(*args, **kwargs)
+
+            return wrapper
+
+        return decorator
+
+    def bind(self, func: Callable) -> Callable:
+        # executors do not carry the current span over to their workers, hence the functions submitted to them are run
+        # within the span that was active when they were bound, both in worker threads and in worker processes
+        if not self.enabled:
+            return func
+
+        return functools.partial(Tracer._run_within, self.current_span_id.get(), func)
+
+    def record_span(self, span: Span) -> None:
+        with self.lock:
+            span_stats = self.spans.setdefault(span.name, [0, 0.0, 0.0])
+            span_stats[0] += 1
+            span_stats[1] += span.duration
+            span_stats[2] = max(span_stats[2], span.duration)
+            self._write(
+                {
+                    'type': 'span', 'name': span.name, 'span_id': span.span_id, 'parent_id': span.parent_id,
+                    'pid': os.getpid(), 'thread': threading.current_thread().name, 'start_time': span.start_time,
+                    'duration': span.duration, 'attributes': span.attributes
+                }
+            )
+
+        return
+
+    def count(self, name: str, value: float = 1, **labels: Any) -> None:
+        if not self.enabled:
+            return
+        key = (name, tuple(sorted(labels.items())))
+        with self.lock:
+            self.counters[key] = self.counters.get(key, 0) + value
+
+        return
+
+    def observe(self, name: str, value: float, **labels: Any) -> None:
+        if not self.enabled:
+            return
+        key = (name, tuple(sorted(labels.items())))
+        with self.lock:
+            observation_stats = self.observations.setdefault(key, [0, 0.0, value])
+            observation_stats[0] += 1
+            observation_stats[1] += value
+            observation_stats[2] = max(observation_stats[2], value)
+
+        return
+
+    def write_jsonl(self, file_path: Path) -> None:
+        with self.lock, open(file_path, 'a', encoding='utf-8') as f:
+            for name, (count, total, maximum) in self.spans.items():
+                f.write(json.dumps({'type': 'span_summary', 'name': name, 'count': count, 'sum': total, 'max': maximum}) + '\n')
+            for (name, labels), value in self.counters.items():
+                f.write(json.dumps({'type': 'counter', 'name': name, 'labels': dict(labels), 'value': value}, default=str) + '\n')
+            for (name, labels), (count, total, maximum) in self.observations.items():
+                f.write(json.dumps({'type': 'observation', 'name': name, 'labels': dict(labels), 'count': count, 'sum': total, 'max': maximum}, default=str) + '\n')
+
+        return
+
+    def format_prometheus(self) -> str:
+        # spans and observations are exported as summaries (count and sum), plus a gauge with their maximum value
+        with self.lock:
+            summaries = {'span_seconds': {(('span', n),): list(v) for n, v in self.spans.items()}}
+            for (name, labels), value in self.observations.items():
+                summaries.setdefault(name, {})[labels] = list(value)
+            counters = {}
+            for (name, labels), value in self.counters.items():
+                counters.setdefault(name, {})[labels] = value
+        lines = []
+        for name, series in sorted(counters.items()):
+            lines.append(f'# TYPE {self._format_metric(name + "_total", ())} counter')
+            lines += [f'{self._format_metric(name + "_total", labels)} {value}' for labels, value in sorted(series.items(), key=str)]
+        for name, series in sorted(summaries.items()):
+            if len(series) == 0:
+                continue
+            lines.append(f'# TYPE {self._format_metric(name, ())} summary')
+            for labels, (count, total, _) in sorted(series.items(), key=str):
+                lines += [f'{self._format_metric(name + "_count", labels)} {count}', f'{self._format_metric(name + "_sum", labels)} {total}']
+            lines.append(f'# TYPE {self._format_metric(name + "_max", ())} gauge')
+            lines += [f'{self._format_metric(name + "_max", labels)} {maximum}' for labels, (_, _, maximum) in sorted(series.items(), key=str)]
+
+        return '\n'.join(lines) + '\n'
+
+    def write_prometheus(self, file_path: Path) -> None:
+        tmp_path = file_path.with_name(file_path.name + '.tmp')
+        tmp_path.write_text(self.format_prometheus(), encoding='utf-8')
+        tmp_path.replace(file_path)
+
+        return
+
+
+# process-wide tracer, disabled until enabled by the entry point scripts
+tracer = Tracer()
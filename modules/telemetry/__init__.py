@@ -0,0 +1,2 @@
+from .Span import Span
+from .Tracer import Tracer, tracer
@@ -0,0 +1,16 @@
+# external modules import
+from pydantic import BaseModel, Field
+
+# internal modules import
+from ..enums import EntityType
+
+
+# template definition
+class EntityHit(BaseModel):
+    """
+    This class models an occurrence of a known entity inside a question.
+    """
+    entity_type: EntityType = Field(title='Entity Type', description='Type of the entity.')
+    name: str = Field(title='Entity Name', description='Name of the entity, as known by the system.')
+    start: int = Field(title='Span Start', description='Index of the first character of the occurrence in the question.')
+    end: int = Field(title='Span End', description='Index following the last character of the occurrence in the question.')
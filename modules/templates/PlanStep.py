@@ -0,0 +1,23 @@
+# external modules import
+from typing import List, Any
+from pydantic import BaseModel, Field
+
+# internal modules import
+from ..enums import LogicalOperator
+
+
+# template definition
+class PlanStep(BaseModel):
+    """
+    This class models a step of a query plan, i.e., a constraint whose mask is intersected with the dishes selected so
+    far, together with the statistics used to schedule it and, once executed, the observed ones.
+    """
+    constraint: str = Field(title='Constraint', description='Name of the constraint, as in the Question fields.')
+    items: List[Any] = Field(title='Items', description='Entities whose masks are combined by the step.')
+    logical_operator: LogicalOperator = Field(default=LogicalOperator.AND, title='Logical Operator', description='The logical operator that combines the items masks.')
+    negated: bool = Field(default=False, title='Negated', description='Whether the step keeps the dishes outside of the items masks.')
+    estimated_cardinality: int = Field(title='Estimated Cardinality', description='Estimated number of dishes satisfying the constraint.')
+    estimated_cost: float = Field(title='Estimated Cost', description='Estimated cost of computing the constraint mask, in relative units.')
+    cardinality: int | None = Field(default=None, title='Cardinality', description='Number of dishes selected after the step, once executed.')
+    elapsed_ms: float | None = Field(default=None, title='Elapsed Time', description='Time spent computing and intersecting the step mask, once executed.')
+    skipped: bool = Field(default=False, title='Skipped', description='Whether the step was skipped, since the dishes selected before it were already none.')
@@ -14,3 +14,5 @@ from .BaseQuestion import BaseQuestion
 from .Question import Question
 from .QuestionLogics import QuestionLogics
 from .Answer import Answer
+from .EntityHit import EntityHit
+from .PlanStep import PlanStep
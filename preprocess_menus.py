@@ -1,13 +1,22 @@
 # external modules import
+import os
+import time
 import pickle
 import pdfplumber
 from pathlib import Path
 from loguru import logger
+from typing import Tuple
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from docling.datamodel.base_models import InputFormat
 from docling.document_converter import DocumentConverter
 from docling_core.types.doc.document import DoclingDocument, TextItem, SectionHeaderItem, DocItemLabel
 
 
-# helper function
+# global variables
+document_converter: DocumentConverter | None = None
+
+
+# helper functions
 def create_docling_document(input_pdf_path) -> DoclingDocument:
     with pdfplumber.open(input_pdf_path) as pdf:
         doc = DoclingDocument(name=input_pdf_path.name)
@@ -23,17 +32,45 @@ def create_docling_document(input_pdf_path) -> DoclingDocument:
 
     return doc
 
+def initialize_document_converter() -> DocumentConverter:
+    # the converter (and its layout models) is created once per process and reused for every menu
+    global document_converter
+    if document_converter is None:
+        document_converter = DocumentConverter()
+        document_converter.initialize_pipeline(InputFormat.PDF)
+
+    return document_converter
+
+def convert_menu(menu_path: Path, output_menus_path: Path) -> Tuple[str, float]:
+    start_time = time.perf_counter()
+    # TODO (Low): make this check adaptive.
+    if menu_path.name.split('.')[0] in ['Datapizza', 'L Essenza delle Dune', 'Le Dimensioni del Gusto']:
+        menu = create_docling_document(menu_path)
+    else:
+        menu = initialize_document_converter().convert(menu_path).document
+    with open(output_menus_path / (menu_path.name[:-4] + '.pkl'), 'wb') as f:
+        pickle.dump(menu, f)
+
+    return menu_path.name[:-4], time.perf_counter() - start_time
+
 # main function definition
-def preprocess_menu(input_menus_path: Path, output_menus_path: Path) -> None:
-    for menu_path in input_menus_path.glob('*pdf'):
-        # TODO (Low): make this check adaptive.
-        if menu_path.name.split('.')[0] in ['Datapizza', 'L Essenza delle Dune', 'Le Dimensioni del Gusto']:
-            menu = create_docling_document(menu_path)
-        else:
-            menu = DocumentConverter().convert(menu_path).document
-        with open(output_menus_path / (menu_path.name[:-4] + '.pkl'), 'wb') as f:
-            pickle.dump(menu, f)
-        logger.info(f'{menu_path.name[:-4]} Menu Converted')
+def preprocess_menu(input_menus_path: Path, output_menus_path: Path, max_workers: int = 1) -> None:
+    menus_paths = sorted(input_menus_path.glob('*pdf'))
+    start_time = time.perf_counter()
+    if max_workers == 1:
+        for menu_path in menus_paths:
+            menu_name, conversion_time = convert_menu(menu_path=menu_path, output_menus_path=output_menus_path)
+            logger.info(f'{menu_name} Menu Converted ({conversion_time:.2f}s)')
+    else:
+        with ProcessPoolExecutor(max_workers=max_workers, initializer=initialize_document_converter) as executor:
+            futures = {executor.submit(convert_menu, menu_path=mp, output_menus_path=output_menus_path): mp for mp in menus_paths}
+            for future in as_completed(futures):
+                try:
+                    menu_name, conversion_time = future.result()
+                    logger.info(f'{menu_name} Menu Converted ({conversion_time:.2f}s)')
+                except Exception as e:
+                    logger.error(f'{futures[future].name[:-4]} Menu Conversion Failed: {e!r}')
+    logger.info(f'{len(menus_paths)} Menus Processed in {time.perf_counter() - start_time:.2f}s')
 
     return
 
@@ -42,5 +79,6 @@ def preprocess_menu(input_menus_path: Path, output_menus_path: Path) -> None:
 if __name__ == '__main__':
     preprocess_menu(
         input_menus_path=Path(__file__).parent / 'data' / 'raw' / 'menus',
-        output_menus_path=Path(__file__).parent / 'data' / 'processed' / 'menus'
+        output_menus_path=Path(__file__).parent / 'data' / 'processed' / 'menus',
+        max_workers=int(os.getenv('PREPROCESS_MAX_WORKERS', 1))
     )
@@ -3,24 +3,58 @@ import os
 from pathlib import Path
 from loguru import logger
 from dotenv import load_dotenv
+from concurrent.futures import ThreadPoolExecutor, as_completed
 
 # internal modules import
-from modules import QAConfig, QueryAgent, QMConfig, QueryManager
+from modules import QAConfig, QueryAgent, QMConfig, QueryManager, Answer, LCConfig, LLMCache, AnswersJournal, KBManifest, OCConfig, OllamaClient, tracer
 
 
-# function definition
-def query_knowledge_base(query_manager: QueryManager, questions_file_path: Path) -> None:
-    answers = {}
+# functions definition
+def answer_question(query_manager: QueryManager, question_number: int, question: str, answers_journal: AnswersJournal | None = None) -> Answer:
+    answer = query_manager.answer_question(question=question)
+    if answers_journal is not None:
+        answers_journal.append(question_number=question_number, answer=answer)
+
+    return answer
+
+
+def query_knowledge_base(
+        query_manager: QueryManager,
+        questions_file_path: Path,
+        answers_journal: AnswersJournal | None = None,
+        max_workers: int = 1
+) -> None:
     with open(questions_file_path, 'r', encoding='utf-8') as f:
-        for question_number, question in enumerate(f, start=1):
-            # if question_number != 30:
-            #     continue
-            answers[question_number] = query_manager.answer_question(question=question)
-            logger.info(f'Question: {question}')
+        questions = dict(enumerate(f, start=1))
+
+    # resume the answers checkpointed by a previous run, and checkpoint the new ones as soon as they are available
+    answers = {qn: a for qn, a in answers_journal.answers.items() if qn in questions} if answers_journal is not None else {}
+    if len(answers) > 0:
+        logger.info(f'Resuming From Checkpoint: {len(answers)}/{len(questions)} Questions Already Answered.')
+    # failed questions get the default answer, but they are left out of the journal so that the next run retries them
+    failed_questions_numbers = []
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        futures = {
+            executor.submit(tracer.bind(answer_question), query_manager=query_manager, question_number=qn, question=q, answers_journal=answers_journal): qn
+            for qn, q in questions.items() if qn not in answers
+        }
+        for future in as_completed(futures):
+            question_number = futures[future]
+            try:
+                answers[question_number] = future.result()
+            except Exception as e:
+                logger.error(f'Question {question_number} Failed: {e!r}')
+                failed_questions_numbers.append(question_number)
+                answers[question_number] = Answer(dishes_codes=[])
+                continue
+            logger.info(f'Question: {questions[question_number]}')
             logger.info(f'Answer: {answers[question_number].dishes_codes}')
-            if len(answers[question_number].dishes_codes) == 0:
-                logger.warning('No Dish Found, Setting 0 as Default!')
-                answers[question_number].dishes_codes.append(0)
+    if len(failed_questions_numbers) > 0:
+        logger.error(f'{len(failed_questions_numbers)} Questions Failed and Got the Default Answer, Run Again to Retry Them: {sorted(failed_questions_numbers)}')
+    for question_number, answer in answers.items():
+        if len(answer.dishes_codes) == 0:
+            logger.warning(f'Question {question_number}: No Dish Found, Setting 0 as Default!')
+            answer.dishes_codes.append(0)
     query_manager.memorize_answers(answers=answers)
 
     return
@@ -32,19 +66,67 @@ if __name__ == '__main__':
     # load environment variables
     load_dotenv()
 
+    # enable tracing, when any of its outputs is requested
+    trace_path_ = Path(os.environ['TRACE_PATH']) if os.getenv('TRACE_PATH') else None
+    prometheus_path_ = Path(os.environ['TRACE_PROMETHEUS_PATH']) if os.getenv('TRACE_PROMETHEUS_PATH') else None
+    if trace_path_ is not None or prometheus_path_ is not None:
+        tracer.enable(jsonl_path=trace_path_)
+
+    # create llm cache object
+    llm_cache_ = LLMCache(
+        config=LCConfig(
+            cache_path=Path(__file__).parent / 'data' / 'cache' / 'llm_cache.sqlite',
+            bypass=os.getenv('LLM_CACHE_BYPASS', 'false').lower() == 'true'
+        )
+    )
+
+    # create shared ollama client object
+    ollama_client_ = OllamaClient(
+        config=OCConfig(
+            ollama_server_uri=os.getenv('OLLAMA_SERVER_URI'),
+            max_concurrency=int(os.getenv('OLLAMA_MAX_CONCURRENCY', 4))
+        )
+    )
+
     # create query manager object
     query_manager_ = QueryManager(
         config=QMConfig(
             kb_path=Path(__file__).parent / 'data' / 'processed' / 'dishes',
-            planet_distances_path=Path(__file__).parent / 'data' / 'planets_distances.csv'
+            planet_distances_path=Path(__file__).parent / 'data' / 'planets_distances.csv',
+            snapshot_path=Path(__file__).parent / 'data' / 'processed' / 'dishes' / 'knowledge_base.kbs'
         ),
         query_agent=QueryAgent(
             config=QAConfig(
                 ollama_server_uri=os.getenv('OLLAMA_SERVER_URI'),
                 ollama_model_name=os.getenv('LBP_MODEL_NAME')
-            )
+            ),
+            llm_cache=llm_cache_,
+            ollama_client=ollama_client_
         )
     )
 
-    # execute questions submission pipeline
-    query_knowledge_base(query_manager=query_manager_, questions_file_path=Path(__file__).parent / 'data' / 'test_questions.csv')
+    # execute questions submission pipeline, checkpointing answers against the current questions and knowledge base
+    questions_file_path_ = Path(__file__).parent / 'data' / 'test_questions.csv'
+    with AnswersJournal(
+        file_path=Path(__file__).parent / 'data' / 'cache' / 'answers_journal.jsonl',
+        key=f'{KBManifest.hash_files([questions_file_path_])}-{query_manager_.kb_version}',
+        resume=os.getenv('QUERY_RESUME', 'true').lower() == 'true'
+    ) as answers_journal_:
+        query_knowledge_base(
+            query_manager=query_manager_,
+            questions_file_path=questions_file_path_,
+            answers_journal=answers_journal_,
+            max_workers=int(os.getenv('QUERY_MAX_WORKERS', 1))
+        )
+    logger.info(f'Fast Path Stats: {query_manager_.fast_path_stats()}')
+    logger.info(f'Answers Cache Stats: {query_manager_.answers_cache_stats()}')
+    logger.info(f'LLM Cache Stats: {llm_cache_.stats()}')
+    logger.info(f'Ollama Client Stats: {ollama_client_.stats()}')
+    ollama_client_.close()
+
+    # export tracing metrics
+    if trace_path_ is not None:
+        tracer.write_jsonl(trace_path_)
+    if prometheus_path_ is not None:
+        tracer.write_prometheus(prometheus_path_)
+    tracer.disable()
@@ -0,0 +1,78 @@
+# external modules import
+import os
+from pathlib import Path
+from loguru import logger
+from dotenv import load_dotenv
+
+# internal modules import
+from modules import QAConfig, QueryAgent, QMConfig, QSConfig, QueryService, LCConfig, LLMCache, OCConfig, OllamaClient, tracer
+
+
+# main-like execution
+if __name__ == '__main__':
+
+    # load environment variables
+    load_dotenv()
+
+    # enable tracing, whose metrics are exposed by the service as well, when any of its outputs is requested
+    trace_path_ = Path(os.environ['TRACE_PATH']) if os.getenv('TRACE_PATH') else None
+    prometheus_path_ = Path(os.environ['TRACE_PROMETHEUS_PATH']) if os.getenv('TRACE_PROMETHEUS_PATH') else None
+    if trace_path_ is not None or prometheus_path_ is not None:
+        tracer.enable(jsonl_path=trace_path_)
+
+    # create llm cache object
+    llm_cache_ = LLMCache(
+        config=LCConfig(
+            cache_path=Path(__file__).parent / 'data' / 'cache' / 'llm_cache.sqlite',
+            bypass=os.getenv('LLM_CACHE_BYPASS', 'false').lower() == 'true'
+        )
+    )
+
+    # create shared ollama client object
+    ollama_client_ = OllamaClient(
+        config=OCConfig(
+            ollama_server_uri=os.getenv('OLLAMA_SERVER_URI'),
+            max_concurrency=int(os.getenv('OLLAMA_MAX_CONCURRENCY', 4))
+        )
+    )
+
+    # create query service object, which keeps the knowledge base resident and reloads it when it changes
+    query_service_ = QueryService(
+        config=QSConfig(
+            host=os.getenv('QUERY_SERVICE_HOST', '127.0.0.1'),
+            port=int(os.getenv('QUERY_SERVICE_PORT', 8765)),
+            max_workers=int(os.getenv('QUERY_MAX_WORKERS', 4))
+        ),
+        qm_config=QMConfig(
+            kb_path=Path(__file__).parent / 'data' / 'processed' / 'dishes',
+            planet_distances_path=Path(__file__).parent / 'data' / 'planets_distances.csv',
+            snapshot_path=Path(__file__).parent / 'data' / 'processed' / 'dishes' / 'knowledge_base.kbs'
+        ),
+        query_agent=QueryAgent(
+            config=QAConfig(
+                ollama_server_uri=os.getenv('OLLAMA_SERVER_URI'),
+                ollama_model_name=os.getenv('LBP_MODEL_NAME')
+            ),
+            llm_cache=llm_cache_,
+            ollama_client=ollama_client_
+        )
+    )
+
+    # serve questions until interrupted
+    try:
+        query_service_.serve_forever()
+    except KeyboardInterrupt:
+        logger.info('Query Service Interrupted.')
+    finally:
+        query_service_.close()
+    logger.info(f'Query Service Stats: {query_service_.stats()}')
+    logger.info(f'LLM Cache Stats: {llm_cache_.stats()}')
+    logger.info(f'Ollama Client Stats: {ollama_client_.stats()}')
+    ollama_client_.close()
+
+    # export tracing metrics
+    if trace_path_ is not None:
+        tracer.write_jsonl(trace_path_)
+    if prometheus_path_ is not None:
+        tracer.write_prometheus(prometheus_path_)
+    tracer.disable()
@@ -3,14 +3,14 @@ import csv
 import json
 from pathlib import Path
 from loguru import logger
-from typing import List, Dict
+from typing import List, Dict, Tuple
 from dotenv import load_dotenv
 from langchain_openai import ChatOpenAI
 from langchain.prompts import PromptTemplate
 from langchain.output_parsers import PydanticOutputParser
 
 # internal modules import
-from modules import Planet, AugmentedDish, Answer
+from modules import Planet, AugmentedDish, Answer, KBManifest, AnswersJournal, QueryManager
 
 
 # class definition
@@ -24,13 +24,11 @@ class PowerfulQueryAgent:
 
     # public methods
     @staticmethod
-    def load_knowledge_base(file_path: Path) -> List[AugmentedDish]:
-        knowledge_base = []
-        for dish_path in file_path.glob('*.json'):
-            with open(dish_path, 'r', encoding='utf-8') as file:
-                knowledge_base.append(AugmentedDish(**json.load(file)))
+    def load_knowledge_base(file_path: Path) -> Tuple[List[AugmentedDish], str]:
+        # the snapshot is loaded unless it is corrupted or older than the json descriptors, as done by the query manager
+        knowledge_base, kb_version = QueryManager._load_knowledge_base(file_path=file_path, snapshot_path=file_path / 'knowledge_base.kbs')
 
-        return knowledge_base
+        return knowledge_base.to_dishes(), kb_version
 
     @staticmethod
     def load_planets_distances(file_path: Path) -> Dict[Planet, Dict[Planet, int]]:
@@ -46,10 +44,13 @@ class PowerfulQueryAgent:
 
     @staticmethod
     def memorize_answers(answers: Dict[int, Answer]) -> None:
-        with open(Path(__file__).parent.parent / 'data' / 'test_answers.csv', 'w', encoding='utf-8', newline='') as f:
+        answers_path = Path(__file__).parent.parent / 'data' / 'test_answers.csv'
+        tmp_path = answers_path.with_name(answers_path.name + '.tmp')
+        with open(tmp_path, 'w', encoding='utf-8', newline='') as f:
             f.write('row_id,result\n')
-            for k, v in answers.items():
+            for k, v in sorted(answers.items()):
                 f.write(','.join([str(k), f'\"{",".join([str(c) for c in v.dishes_codes])}\"']) + '\n')
+        tmp_path.replace(answers_path)
 
         return
 
@@ -102,10 +103,19 @@ if __name__ == '__main__':
     load_dotenv()
     answers = {}
     powerful_agent = PowerfulQueryAgent()
-    knowledge_base_ = powerful_agent.load_knowledge_base(Path(__file__).parent.parent / 'data' / 'processed' / 'dishes')
+    knowledge_base_, kb_version_ = powerful_agent.load_knowledge_base(Path(__file__).parent.parent / 'data' / 'processed' / 'dishes')
     planets_distances_ = powerful_agent.load_planets_distances(Path(__file__).parent.parent / 'data' / 'planets_distances.csv')
-    with open(Path(__file__).parent / 'data' / 'test_questions.csv', 'r', encoding='utf-8') as f:
-        for question_number, question_ in enumerate(f, start=1):
+    questions_file_path_ = Path(__file__).parent / 'data' / 'test_questions.csv'
+    with open(questions_file_path_, 'r', encoding='utf-8') as f:
+        questions_ = dict(enumerate(f, start=1))
+    with AnswersJournal(
+        file_path=Path(__file__).parent.parent / 'data' / 'cache' / 'powerful_answers_journal.jsonl',
+        key=f'{KBManifest.hash_files([questions_file_path_])}-{kb_version_}'
+    ) as answers_journal_:
+        for question_number, question_ in questions_.items():
+            if question_number in answers_journal_.answers:
+                answers[question_number] = answers_journal_.answers[question_number]
+                continue
             answers_1 = powerful_agent.answer_question(
                 question=question_,
                 knowledge_base=knowledge_base_[0:100],
@@ -122,9 +132,11 @@ if __name__ == '__main__':
                 planets_distances=planets_distances_
             )
             answers[question_number] = Answer(dishes_codes=(answers_1.dishes_codes + answers_2.dishes_codes + answers_3.dishes_codes))
+            answers_journal_.append(question_number=question_number, answer=answers[question_number])
             logger.info(f'Question: {question_}')
             logger.info(f'Answer: {answers[question_number].dishes_codes}')
-            if len(answers[question_number].dishes_codes) == 0:
-                logger.warning('No Dish Found, Setting 0 as Default!')
-                answers[question_number].dishes_codes.append(0)
+    for question_number, answer in answers.items():
+        if len(answer.dishes_codes) == 0:
+            logger.warning(f'Question {question_number}: No Dish Found, Setting 0 as Default!')
+            answer.dishes_codes.append(0)
     powerful_agent.memorize_answers(answers=answers)
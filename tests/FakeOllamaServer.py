@@ -0,0 +1,88 @@
+# external modules import
+import json
+import time
+import threading
+from typing import List, Dict, Callable
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+
+# class definition
+class FakeOllamaServer:
+    """
+    This class implements a local fake of the Ollama Server generate endpoint, running on a background thread. It can
+    delay its responses and fail the next requests with the given statuses, while recording the received payloads, the
+    number of requests served concurrently and the client connections they came from.
+    """
+
+    # constructor
+    def __init__(self, respond: Callable[[Dict], str] = lambda payload: 'ok', delay: float = 0.0):
+
+        # initialize behaviour and recorded state
+        self.respond = respond
+        self.delay = delay
+        self.failures: List[int] = []
+        self.payloads: List[Dict] = []
+        self.connections = set()
+        self.inflight, self.max_inflight = 0, 0
+        self.lock = threading.Lock()
+
+        # start http server on a free port
+        self.server = ThreadingHTTPServer(('127.0.0.1', 0), self._build_handler())
+        self.server.daemon_threads = True
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self.thread.start()
+
+    # context manager methods
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    # non-public methods
+    def _build_handler(self) -> type:
+        fake_server = self
+
+        class FakeOllamaHandler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+
+            def log_message(self, *args):
+                return
+
+            def _send(self, status: int, content: Dict) -> None:
+                body = json.dumps(content).encode('utf-8')
+                self.send_response(status)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def do_POST(self):
+                payload = json.loads(self.rfile.read(int(self.headers['Content-Length'])))
+                with fake_server.lock:
+                    fake_server.payloads.append(payload)
+                    fake_server.connections.add(self.client_address)
+                    fake_server.inflight += 1
+                    fake_server.max_inflight = max(fake_server.max_inflight, fake_server.inflight)
+                    status = fake_server.failures.pop(0) if fake_server.failures else 200
+                try:
+                    time.sleep(fake_server.delay)
+                    if status != 200:
+                        return self._send(status, {'error': 'fake failure'})
+                    self._send(200, {'model': payload['model'], 'response': fake_server.respond(payload), 'done': True, 'prompt_eval_count': 1, 'eval_count': 1})
+                finally:
+                    with fake_server.lock:
+                        fake_server.inflight -= 1
+
+        return FakeOllamaHandler
+
+    # public methods
+    @property
+    def uri(self) -> str:
+        return f'http://127.0.0.1:{self.server.server_address[1]}'
+
+    def close(self) -> None:
+        self.server.shutdown()
+        self.server.server_close()
+
+        return
@@ -0,0 +1,27 @@
+# external modules import
+import pytest
+from pathlib import Path
+from typing import List
+
+# internal modules import
+from modules import AugmentedDish, KBSnapshot
+from benchmarks.SyntheticKBGenerator import SyntheticKBGenerator
+
+
+# fixtures definition
+@pytest.fixture(scope='session')
+def knowledge_base() -> List[AugmentedDish]:
+    return SyntheticKBGenerator(seed=0).generate_knowledge_base(dishes_number=500)
+
+
+@pytest.fixture
+def snapshot_path(tmp_path: Path, knowledge_base: List[AugmentedDish]) -> Path:
+    file_path = tmp_path / 'knowledge_base.kbs'
+    KBSnapshot.write(file_path=file_path, knowledge_base=knowledge_base)
+
+    return file_path
+
+
+@pytest.fixture(scope='session')
+def planets_distances_path() -> Path:
+    return Path(__file__).parent.parent / 'data' / 'planets_distances.csv'
@@ -0,0 +1,51 @@
+# external modules import
+from pathlib import Path
+from typing import List
+
+# internal modules import
+from modules import AugmentedDish, AnswersCache, KBSnapshot, QMConfig, QueryManager
+
+
+# tests definition
+def test_entries_are_evicted_in_lru_order():
+    answers_cache = AnswersCache(max_size=2)
+    answers_cache.set_version(version='v1')
+    answers_cache.update(constraints=['a'], dishes_codes=[1])
+    answers_cache.update(constraints=['b'], dishes_codes=[2])
+    assert answers_cache.lookup(constraints=['a']) == [1]
+    answers_cache.update(constraints=['c'], dishes_codes=[3])
+    assert answers_cache.lookup(constraints=['b']) is None
+    assert answers_cache.lookup(constraints=['a']) == [1] and answers_cache.lookup(constraints=['c']) == [3]
+    assert answers_cache.stats()['evictions'] == 1
+
+
+def test_entries_are_invalidated_by_a_new_version():
+    answers_cache = AnswersCache(max_size=8)
+    answers_cache.set_version(version='v1')
+    answers_cache.update(constraints=['a'], dishes_codes=[1])
+    answers_cache.set_version(version='v1')
+    assert answers_cache.lookup(constraints=['a']) == [1]
+    answers_cache.set_version(version='v2')
+    assert answers_cache.lookup(constraints=['a']) is None
+    assert answers_cache.stats()['entries'] == 0
+
+
+def test_knowledge_base_versions_do_not_share_answers(tmp_path: Path, planets_distances_path: Path, knowledge_base: List[AugmentedDish]):
+    KBSnapshot.write(file_path=tmp_path / 'v1.kbs', knowledge_base=knowledge_base[:100])
+    KBSnapshot.write(file_path=tmp_path / 'v2.kbs', knowledge_base=knowledge_base[100:200])
+    query_managers = [
+        QueryManager(
+            config=QMConfig(kb_path=tmp_path, planet_distances_path=planets_distances_path, snapshot_path=tmp_path / f'{v}.kbs'),
+            query_agent=None
+        )
+        for v in ['v1', 'v2']
+    ]
+    for query_manager in query_managers:
+        query_manager.close()
+    assert query_managers[0].kb_version != query_managers[1].kb_version
+
+    # the cache of a Knowledge Base, moved to another one, drops the answers of the former
+    answers_cache = query_managers[0].answers_cache
+    answers_cache.update(constraints=['a'], dishes_codes=[knowledge_base[0].dish.code])
+    answers_cache.set_version(version=query_managers[1].kb_version)
+    assert answers_cache.lookup(constraints=['a']) is None
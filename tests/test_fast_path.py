@@ -0,0 +1,36 @@
+# external modules import
+from pathlib import Path
+from typing import List
+
+# internal modules import
+from modules import AugmentedDish, KBSnapshot, QMConfig, QueryManager
+from benchmarks.SyntheticKBGenerator import SyntheticKBGenerator
+from benchmarks.benchmark_query_manager import StubQueryAgent
+
+
+# tests definition
+def test_fast_path_parses_the_generated_workload(tmp_path: Path, planets_distances_path: Path, knowledge_base: List[AugmentedDish]):
+    questions = SyntheticKBGenerator(seed=1).generate_questions(knowledge_base=knowledge_base, questions_number=300)
+    workload = {
+        q: {'question_object': qo.model_dump(mode='json'), 'question_logics': ql.model_dump(mode='json')}
+        for q, qo, ql in questions
+    }
+    KBSnapshot.write(file_path=tmp_path / 'knowledge_base.kbs', knowledge_base=knowledge_base)
+    query_manager = QueryManager(
+        config=QMConfig(kb_path=tmp_path, planet_distances_path=planets_distances_path, snapshot_path=tmp_path / 'knowledge_base.kbs'),
+        query_agent=StubQueryAgent(workload=workload)
+    )
+
+    # questions taking the fast path must be parsed into the same constraints they were generated from
+    mismatches = []
+    for question, question_object, question_logics in questions:
+        fast_path_hits = query_manager.fast_path_stats()['hits']
+        parsed_question_object, parsed_question_logics = query_manager._parse_question(question=question)
+        if query_manager.fast_path_stats()['hits'] == fast_path_hits:
+            continue
+        if query_manager.query_planner.canonicalize(parsed_question_object, parsed_question_logics) != query_manager.query_planner.canonicalize(question_object, question_logics):
+            mismatches.append(question)
+    query_manager.close()
+
+    assert mismatches == []
+    assert query_manager.fast_path_stats()['hit_rate'] > 0.9
@@ -0,0 +1,57 @@
+# external modules import
+import os
+import pytest
+from pathlib import Path
+from typing import List
+
+# internal modules import
+from modules import AugmentedDish, KBSnapshot, QueryManager
+
+
+# tests definition
+def test_round_trip(snapshot_path: Path, knowledge_base: List[AugmentedDish]):
+    with KBSnapshot(snapshot_path) as snapshot:
+        assert [ad.model_dump() for ad in snapshot.load()] == [ad.model_dump() for ad in knowledge_base]
+
+
+@pytest.mark.parametrize('corruption', ['empty', 'header', 'truncated', 'extended', 'magic'])
+def test_invalid_snapshot_raises_value_error(snapshot_path: Path, corruption: str):
+    content = snapshot_path.read_bytes()
+    snapshot_path.write_bytes(
+        {
+            'empty': b'',
+            'header': content[:10],
+            'truncated': content[:-7],
+            'extended': content + b'\x00',
+            'magic': b'X' + content[1:]
+        }[corruption]
+    )
+    open_files_number = len(os.listdir('/proc/self/fd')) if os.path.isdir('/proc/self/fd') else None
+    with pytest.raises(ValueError):
+        KBSnapshot(snapshot_path)
+    if open_files_number is not None:
+        assert len(os.listdir('/proc/self/fd')) == open_files_number
+
+
+def test_corrupted_or_stale_snapshot_falls_back_to_descriptors(tmp_path: Path, snapshot_path: Path, knowledge_base: List[AugmentedDish]):
+    for ad in knowledge_base:
+        (tmp_path / f'{ad.dish.code}.json').write_text(ad.model_dump_json(), encoding='utf-8')
+    os.utime(snapshot_path)
+    with KBSnapshot(snapshot_path) as snapshot:
+        snapshot_version = snapshot.version
+
+    # fresh snapshot
+    store, version = QueryManager._load_knowledge_base(file_path=tmp_path, snapshot_path=snapshot_path)
+    assert len(store) == len(knowledge_base) and version == snapshot_version
+
+    # descriptor updated after the snapshot
+    dish_path = tmp_path / f'{knowledge_base[0].dish.code}.json'
+    os.utime(dish_path, ns=(os.stat(snapshot_path).st_mtime_ns + 10 ** 9,) * 2)
+    store, version = QueryManager._load_knowledge_base(file_path=tmp_path, snapshot_path=snapshot_path)
+    assert len(store) == len(knowledge_base) and version != snapshot_version
+
+    # corrupted snapshot
+    os.utime(dish_path, ns=(os.stat(snapshot_path).st_mtime_ns,) * 2)
+    snapshot_path.write_bytes(snapshot_path.read_bytes()[:-7])
+    store, version = QueryManager._load_knowledge_base(file_path=tmp_path, snapshot_path=snapshot_path)
+    assert len(store) == len(knowledge_base) and version != snapshot_version
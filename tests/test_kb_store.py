@@ -0,0 +1,44 @@
+# external modules import
+from pathlib import Path
+from typing import List
+
+# internal modules import
+from modules import AugmentedDish, Technique, TechniqueCategory, TechniqueSubcategory, KBSnapshot, KBStore
+
+
+# tests definition
+def test_round_trip(knowledge_base: List[AugmentedDish]):
+    dishes = [ad.model_copy(deep=True) for ad in knowledge_base]
+    technique = dishes[0].dish.techniques.items[0]
+    dishes[-1].dish.techniques.items = [
+        technique,
+        Technique(
+            name=technique.name,
+            category=next(c for c in TechniqueCategory if c != technique.category),
+            subcategory=next(s for s in TechniqueSubcategory if s != technique.subcategory)
+        )
+    ]
+    store = KBStore.from_dishes(dishes)
+
+    assert len(store) == len(dishes)
+    assert [ad.model_dump() for ad in store.to_dishes()] == [ad.model_dump() for ad in dishes]
+    assert len({(t.name, t.category, t.subcategory) for t in store.techniques}) == len(store.techniques)
+
+
+def test_entities_are_shared(knowledge_base: List[AugmentedDish]):
+    store = KBStore.from_dishes(knowledge_base)
+    dishes = store.to_dishes()
+
+    assert len({id(ad.restaurant) for ad in dishes}) == len(store.restaurants)
+    assert len({id(ad.chef) for ad in dishes}) == len(store.chefs)
+    assert len({id(i) for ad in dishes for i in ad.dish.ingredients.items}) == len(store.ingredients)
+
+
+def test_snapshot_store_matches_dishes_store(snapshot_path: Path, knowledge_base: List[AugmentedDish]):
+    with KBSnapshot(snapshot_path) as snapshot:
+        snapshot_store = snapshot.load_store()
+    dishes_store = KBStore.from_dishes(sorted(knowledge_base, key=lambda ad: ad.dish.code))
+
+    for column in ['codes', 'restaurants_ids', 'chefs_ids', 'orders_flags', 'ingredients_offsets', 'ingredients_references', 'techniques_offsets', 'techniques_references']:
+        assert getattr(snapshot_store, column) == getattr(dishes_store, column)
+    assert [snapshot_store.string(n) for n in snapshot_store.names] == [dishes_store.string(n) for n in dishes_store.names]
@@ -0,0 +1,118 @@
+# external modules import
+import time
+import httpx
+import pytest
+from concurrent.futures import ThreadPoolExecutor
+
+# internal modules import
+from modules import OCConfig, OllamaClient, CircuitBreaker, CircuitOpenError, QAConfig, QueryAgent, LBPConfig, LLMBasedParser
+from tests.FakeOllamaServer import FakeOllamaServer
+
+
+# fixtures definition
+@pytest.fixture
+def fake_server():
+    with FakeOllamaServer() as fake_server:
+        yield fake_server
+
+
+# tests definition
+def test_generate(fake_server: FakeOllamaServer):
+    fake_server.respond = lambda payload: payload['prompt'].upper()
+    with OllamaClient(config=OCConfig(ollama_server_uri=fake_server.uri)) as client:
+        assert client.generate(model='m', prompt='hello', temperature=0.1, stop=['\n']) == 'HELLO'
+    assert fake_server.payloads == [{'model': 'm', 'prompt': 'hello', 'stream': False, 'options': {'temperature': 0.1, 'stop': ['\n']}}]
+
+
+def test_connections_are_pooled(fake_server: FakeOllamaServer):
+    with OllamaClient(config=OCConfig(ollama_server_uri=fake_server.uri, max_connections=2)) as client:
+        for _ in range(20):
+            client.generate(model='m', prompt='hello')
+    assert len(fake_server.payloads) == 20
+    assert len(fake_server.connections) == 1
+
+
+def test_concurrency_is_bounded(fake_server: FakeOllamaServer):
+    fake_server.delay = 0.1
+    with OllamaClient(config=OCConfig(ollama_server_uri=fake_server.uri, max_concurrency=2)) as client:
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            list(executor.map(lambda _: client.generate(model='m', prompt='hello'), range(8)))
+    assert len(fake_server.payloads) == 8
+    assert fake_server.max_inflight == 2
+
+
+def test_transient_failures_are_retried(fake_server: FakeOllamaServer):
+    fake_server.failures = [503, 429]
+    with OllamaClient(config=OCConfig(ollama_server_uri=fake_server.uri, backoff_base=0.01)) as client:
+        assert client.generate(model='m', prompt='hello') == 'ok'
+        assert client.stats() == {'requests': 3, 'retries': 2, 'failures': 2, 'rejections': 0, 'circuit_open': 0}
+
+
+def test_permanent_failures_are_not_retried(fake_server: FakeOllamaServer):
+    fake_server.failures = [400]
+    with OllamaClient(config=OCConfig(ollama_server_uri=fake_server.uri, backoff_base=0.01)) as client:
+        with pytest.raises(httpx.HTTPStatusError):
+            client.generate(model='m', prompt='hello')
+    assert len(fake_server.payloads) == 1
+
+
+def test_backoff_has_full_jitter(fake_server: FakeOllamaServer):
+    with OllamaClient(config=OCConfig(ollama_server_uri=fake_server.uri, backoff_base=0.5, backoff_max=3.0)) as client:
+        for attempt, upper_bound in [(0, 0.5), (1, 1.0), (2, 2.0), (5, 3.0)]:
+            delays = [client._compute_backoff(attempt=attempt) for _ in range(200)]
+            assert all(0 <= d <= upper_bound for d in delays)
+            assert len(set(delays)) > 100 and max(delays) > upper_bound / 2
+
+
+def test_circuit_breaker_transitions():
+    circuit_breaker = CircuitBreaker(failure_threshold=2, recovery_timeout=0.1)
+
+    # closed, until the failures reach the threshold
+    circuit_breaker.record_failure()
+    circuit_breaker.check()
+    circuit_breaker.record_failure()
+    assert circuit_breaker.is_open()
+    with pytest.raises(CircuitOpenError):
+        circuit_breaker.check()
+
+    # half-open after the recovery timeout: a single trial call goes through, and its failure opens the circuit again
+    time.sleep(0.1)
+    circuit_breaker.check()
+    with pytest.raises(CircuitOpenError):
+        circuit_breaker.check()
+    circuit_breaker.record_failure()
+    with pytest.raises(CircuitOpenError):
+        circuit_breaker.check()
+
+    # closed again by a successful trial call
+    time.sleep(0.1)
+    circuit_breaker.check()
+    circuit_breaker.record_success()
+    assert not circuit_breaker.is_open()
+    circuit_breaker.check()
+
+
+def test_open_circuit_rejects_calls(fake_server: FakeOllamaServer):
+    fake_server.failures = [503] * 10
+    config = OCConfig(ollama_server_uri=fake_server.uri, backoff_base=0.01, max_retries=5, failure_threshold=2, recovery_timeout=60.0)
+    with OllamaClient(config=config) as client:
+        with pytest.raises(httpx.HTTPStatusError):
+            client.generate(model='m', prompt='hello')
+        with pytest.raises(CircuitOpenError):
+            client.generate(model='m', prompt='hello')
+        assert client.stats()['rejections'] == 1 and client.stats()['circuit_open'] == 1
+    assert len(fake_server.payloads) == 2
+
+
+def test_private_clients_are_closed_by_their_owners(fake_server: FakeOllamaServer):
+    with QueryAgent(config=QAConfig(ollama_server_uri=fake_server.uri, ollama_model_name='m')) as query_agent:
+        assert query_agent.model.invoke('hello') == 'ok'
+    assert query_agent.ollama_client.loop.is_closed()
+    with LLMBasedParser(config=LBPConfig(ollama_server_uri=fake_server.uri, ollama_model_name='m')) as parser:
+        assert parser.extract_chef_name(input_text='hello') == 'ok'
+    assert parser.ollama_client.loop.is_closed()
+
+    # shared clients are left to their creator
+    with OllamaClient(config=OCConfig(ollama_server_uri=fake_server.uri)) as client:
+        QueryAgent(config=QAConfig(ollama_server_uri=fake_server.uri, ollama_model_name='m'), ollama_client=client).close()
+        assert client.generate(model='m', prompt='hello') == 'ok'
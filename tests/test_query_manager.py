@@ -0,0 +1,27 @@
+# external modules import
+from pathlib import Path
+from typing import List
+
+# internal modules import
+from modules import AugmentedDish, Technique, TechniqueCategory, TechniqueSubcategory, KBSnapshot, QMConfig, QueryManager
+
+
+# tests definition
+def test_techniques_sharing_a_name_keep_their_category(tmp_path: Path, planets_distances_path: Path, knowledge_base: List[AugmentedDish]):
+    dishes = [ad.model_copy(deep=True) for ad in knowledge_base[:50]]
+    technique = dishes[0].dish.techniques.items[0]
+    dishes[-1].dish.techniques.items = [
+        Technique(
+            name=technique.name,
+            category=next(c for c in TechniqueCategory if c != technique.category),
+            subcategory=next(s for s in TechniqueSubcategory if s != technique.subcategory)
+        )
+    ]
+    KBSnapshot.write(file_path=tmp_path / 'knowledge_base.kbs', knowledge_base=dishes)
+    query_manager = QueryManager(
+        config=QMConfig(kb_path=tmp_path, planet_distances_path=planets_distances_path, snapshot_path=tmp_path / 'knowledge_base.kbs'),
+        query_agent=None
+    )
+    query_manager.close()
+
+    assert [ad.model_dump() for ad in query_manager.knowledge_base.to_dishes()] == [ad.model_dump() for ad in dishes]
@@ -0,0 +1,104 @@
+# external modules import
+import random
+import pytest
+from pathlib import Path
+from typing import List, Tuple
+from Levenshtein import distance
+
+# internal modules import
+from modules import (
+    AugmentedDish, KBSnapshot, QMConfig, QueryManager, Question, QuestionLogics, Ingredient, Technique, License,
+    LicenseName, LicenseCode, LogicalOperator, Planet
+)
+
+
+# fixtures definition
+@pytest.fixture(scope='module')
+def query_manager(tmp_path_factory: pytest.TempPathFactory, planets_distances_path: Path, knowledge_base: List[AugmentedDish]) -> QueryManager:
+    kb_path = tmp_path_factory.mktemp('kb')
+    KBSnapshot.write(file_path=kb_path / 'knowledge_base.kbs', knowledge_base=knowledge_base)
+    query_manager = QueryManager(
+        config=QMConfig(kb_path=kb_path, planet_distances_path=planets_distances_path, snapshot_path=kb_path / 'knowledge_base.kbs', answers_cache_size=None),
+        query_agent=None
+    )
+    yield query_manager
+    query_manager.close()
+
+
+# functions definition
+def generate_question(generator: random.Random, knowledge_base: List[AugmentedDish]) -> Tuple[Question, QuestionLogics]:
+    # names are picked from the knowledge base, and are sometimes misspelled to exercise the fuzzy matching
+    def pick_name(name: str) -> str:
+        return generator.choice([name, name, name.lower(), name.upper(), name[:-1], name[:-3]])
+
+    ingredients = sorted({i.name for ad in knowledge_base for i in ad.dish.ingredients.items})
+    techniques = sorted({(t.name, t.category, t.subcategory) for ad in knowledge_base for t in ad.dish.techniques.items})
+    restaurants = list({ad.restaurant.name: ad.restaurant for ad in knowledge_base}.values())
+    question_object = Question(
+        desired_ingredients=[Ingredient(name=pick_name(n)) for n in generator.sample(ingredients, generator.choice([0, 0, 1, 1, 2, 3]))],
+        disallowed_ingredients=[Ingredient(name=pick_name(n)) for n in generator.sample(ingredients, generator.choice([0, 0, 1, 2]))],
+        desired_techniques=[Technique(name=pick_name(n), category=c, subcategory=s) for n, c, s in generator.sample(techniques, generator.choice([0, 0, 1, 2]))],
+        disallowed_techniques=[Technique(name=pick_name(n), category=c, subcategory=s) for n, c, s in generator.sample(techniques, generator.choice([0, 0, 1]))],
+        planets=generator.sample(list(Planet), generator.choice([0, 0, 1, 3])),
+        restaurants=[r for r in restaurants if generator.random() < 0.15],
+        chef_licenses=[
+            License(name=ln, code=LicenseCode[ln.name], level=generator.randint(0, 6))
+            for ln in generator.sample(list(LicenseName), generator.choice([0, 0, 1, 2]))
+        ],
+        andromeda_flag=generator.random() < 0.2,
+        armonisti_flag=generator.random() < 0.2,
+        naturalisti_flag=generator.random() < 0.2
+    )
+    question_logics = QuestionLogics(
+        desired_ingredients_lo=generator.choice([None, LogicalOperator.AND, LogicalOperator.OR]),
+        desired_techniques_lo=generator.choice([None, LogicalOperator.AND, LogicalOperator.OR])
+    )
+
+    return question_object, question_logics
+
+
+def filter_dishes(knowledge_base: List[AugmentedDish], question_object: Question, question_logics: QuestionLogics) -> List[int]:
+    # reference implementation, checking every constraint against every dish
+    def matches(names: List[str], item: Ingredient | Technique, ignore_case: bool = True) -> bool:
+        if ignore_case:
+            return any(distance(n.lower(), item.name.lower()) <= 2 for n in names)
+
+        return any(distance(n, item.name) <= 2 for n in names)
+
+    def combine(results: List[bool], logical_operator: LogicalOperator | None) -> bool:
+        return all(results) if logical_operator == LogicalOperator.AND else any(results) or len(results) == 0
+
+    orders = [question_object.andromeda_flag, question_object.armonisti_flag, question_object.naturalisti_flag]
+    dishes_codes = []
+    for ad in knowledge_base:
+        ingredients, techniques = [i.name for i in ad.dish.ingredients.items], [t.name for t in ad.dish.techniques.items]
+        if not all([
+            combine([matches(ingredients, i) for i in question_object.desired_ingredients], question_logics.desired_ingredients_lo),
+            not any(matches(ingredients, i) for i in question_object.disallowed_ingredients),
+            combine([matches(techniques, t) for t in question_object.desired_techniques], question_logics.desired_techniques_lo),
+            not any(matches(techniques, t, ignore_case=False) for t in question_object.disallowed_techniques),
+            len(question_object.planets) == 0 or ad.restaurant.planet in question_object.planets,
+            len(question_object.restaurants) == 0 or (ad.restaurant.name, ad.restaurant.planet) in {(r.name, r.planet) for r in question_object.restaurants},
+            all(any(l.code == cl.code and l.level >= cl.level for l in ad.chef.licenses.items) for cl in question_object.chef_licenses),
+            not any(orders) or any(f and df for f, df in zip(orders, [ad.dish.andromeda_flag, ad.dish.armonisti_flag, ad.dish.naturalisti_flag]))
+        ]):
+            continue
+        dishes_codes.append(ad.dish.code)
+
+    return dishes_codes
+
+
+# tests definition
+def test_planned_answers_match_the_reference_filter(query_manager: QueryManager, knowledge_base: List[AugmentedDish]):
+    generator, mismatches, non_empty_answers = random.Random(0), [], 0
+    for question_number in range(600):
+        question_object, question_logics = generate_question(generator=generator, knowledge_base=knowledge_base)
+        plan = query_manager.query_planner.plan(question_object=question_object, question_logics=question_logics)
+        dishes_codes = query_manager.dishes_index.decode(bitmap=query_manager.query_planner.execute(plan=plan))
+        expected_dishes_codes = filter_dishes(knowledge_base=knowledge_base, question_object=question_object, question_logics=question_logics)
+        if sorted(dishes_codes) != sorted(expected_dishes_codes):
+            mismatches.append(question_number)
+        non_empty_answers += len(expected_dishes_codes) > 0
+
+    assert mismatches == []
+    assert non_empty_answers > 100
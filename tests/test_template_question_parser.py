@@ -0,0 +1,60 @@
+# external modules import
+import pytest
+from typing import Tuple
+
+# internal modules import
+from modules import (
+    EntityType, EntityMatcher, TemplateQuestionParser, Technique, TechniquesList, TechniqueCategory, TechniqueSubcategory,
+    LicenseName, LogicalOperator
+)
+
+
+# fixtures definition
+@pytest.fixture(scope='module')
+def matcher_and_parser() -> Tuple[EntityMatcher, TemplateQuestionParser]:
+    techniques_list = TechniquesList(items=[
+        Technique(name='Marinatura Psionica', category=TechniqueCategory.PREPARATION, subcategory=TechniqueSubcategory.MARINATURA)
+    ])
+    entity_matcher = EntityMatcher(entities={
+        EntityType.INGREDIENT: ['Farina di Nettuno', 'Funghi Orbitali'],
+        EntityType.TECHNIQUE: [t.name for t in techniques_list.items]
+    })
+
+    return entity_matcher, TemplateQuestionParser(techniques=techniques_list)
+
+
+def parse(matcher_and_parser: Tuple[EntityMatcher, TemplateQuestionParser], question: str) -> Tuple:
+    entity_matcher, parser = matcher_and_parser
+
+    return parser.parse(question=question, entities_hits=entity_matcher.search(text=question))
+
+
+# tests definition
+def test_template_questions_are_understood(matcher_and_parser):
+    base_question, licenses, question_logics, confidence = parse(
+        matcher_and_parser, 'Quali piatti includono Farina di Nettuno e Funghi Orbitali, ma non la tecnica di Marinatura Psionica?'
+    )
+    assert [i.name for i in base_question.desired_ingredients] == ['Farina di Nettuno', 'Funghi Orbitali']
+    assert [t.name for t in base_question.disallowed_techniques] == ['Marinatura Psionica']
+    assert question_logics.desired_ingredients_lo == LogicalOperator.AND
+    assert licenses == [] and confidence == 1.0
+
+
+@pytest.mark.parametrize('question', [
+    'Quali piatti includono Farina di Nettuno e Polvere di Stelle?',
+    'Quali piatti includono farina di nettuno e polvere di stelle?',
+    'quali piatti includono Farina di Nettuno ma sono serviti da uno chef gentile?',
+    'Quali piatti includono esclusivamente Farina di Nettuno?'
+])
+def test_unknown_words_lower_the_confidence(matcher_and_parser, question: str):
+    assert parse(matcher_and_parser, question)[3] < 1.0
+
+
+def test_licenses_are_matched_whatever_their_case(matcher_and_parser):
+    _, licenses, _, confidence = parse(matcher_and_parser, 'Quali piatti includono Funghi Orbitali e richiedono la Licenza ltk di GRADO 3?')
+    assert [(l.name, l.level) for l in licenses] == [(LicenseName.LIVELLO_DI_SVILUPPO_TECNOLOGICO, 3)]
+    assert confidence == 1.0
+
+
+def test_questions_changing_length_when_lowered_are_left_to_the_llm(matcher_and_parser):
+    assert parse(matcher_and_parser, 'Quali piatti includono Farina di Nettuno e İ Funghi Orbitali?')[3] == 0.0
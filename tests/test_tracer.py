@@ -0,0 +1,45 @@
+# external modules import
+import json
+import pytest
+import multiprocessing
+from pathlib import Path
+from typing import Iterator
+from concurrent.futures import Executor, ThreadPoolExecutor, ProcessPoolExecutor
+
+# internal modules import
+from modules import tracer
+
+
+# fixtures definition
+@pytest.fixture
+def traces_path(tmp_path: Path) -> Iterator[Path]:
+    jsonl_path = tmp_path / 'traces.jsonl'
+    tracer.enable(jsonl_path=jsonl_path)
+    yield jsonl_path
+    tracer.disable()
+    tracer.reset()
+
+
+# functions definition
+def traced_work() -> None:
+    with tracer.span('work'):
+        pass
+
+    return
+
+
+# tests definition
+@pytest.mark.parametrize('executor', [
+    ThreadPoolExecutor(max_workers=2),
+    ProcessPoolExecutor(max_workers=2, mp_context=multiprocessing.get_context('fork'))
+], ids=['threads', 'processes'])
+def test_spans_in_workers_keep_their_parent(traces_path: Path, executor: Executor):
+    with executor, tracer.span('batch') as parent_span:
+        for future in [executor.submit(tracer.bind(traced_work)) for _ in range(4)]:
+            future.result()
+    records = [json.loads(line) for line in traces_path.read_text(encoding='utf-8').splitlines()]
+    children = [r for r in records if r['name'] == 'work']
+
+    assert len(children) == 4
+    assert all(r['parent_id'] == parent_span.span_id for r in children)
+    assert len({r['span_id'] for r in records}) == len(records)